@@ -2,27 +2,36 @@ import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
+import gc
 import io
 import json
 from datetime import datetime
-import warnings
+import os
+import sys
 
 import plotly.graph_objects as go
 from docx import Document
 from docx.shared import Inches
 
-try:
-    warnings.simplefilter('ignore', np.exceptions.RankWarning)
-except AttributeError:
-    warnings.simplefilter('ignore', np.RankWarning)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import funcionesConsolidacion as fcon # motores explícito / implícito / Crank-Nicolson
 
 st.set_page_config(page_title="Consolidación 1D", layout="wide")
 st.title("Modelo de Consolidación 1D para carga extensa")
 
 # --- Función de Seguridad (Callback) ---
+def descartar_resultados():
+    # Suelta los resultados (y sus vistas del fichero de isócronas) antes de borrar el fichero
+    anteriores = st.session_state.pop('resultados', None)
+    ruta = anteriores.get('ruta_isocronas') if anteriores else None
+    del anteriores
+    gc.collect()
+    fcon.borrar_fichero_isocronas(ruta)
+
 def reset_estado():
     st.session_state.calculado = False
     st.session_state.docs_generados = False
+    descartar_resultados()
 
 # --- Inicializar memoria y parámetros por defecto ---
 if 'calculado' not in st.session_state:
@@ -33,7 +42,9 @@ if 'docs_generados' not in st.session_state:
 default_params = {
     'longitud': 10.0, 'Ti': 100.0, 'c': 0.05, 'mv': 0.0002, 
     'h': 1.0, 'k': 1.0, 'max_U_pct': 95.0, 'intervalo_dias_curvas': 10.0, 
-    'tipo_calculo': 1, 'metodo_numerico': "Explícito "
+    'tipo_calculo': 1, 'metodo_numerico': "Explícito ", 'pasos_lote': 1,
+    'paso_adaptativo': False, 'modo_isocronas': "Intervalo fijo", 'isocronas_decada': 5, 'max_isocronas': 200,
+    'isocronas_disco': False
 }
 
 for key, val in default_params.items():
@@ -66,9 +77,19 @@ mv = st.sidebar.number_input("Coef. compresibilidad vol. (mv) [m2/kN]", min_valu
 st.sidebar.header("Datos del Mallado y Visualización")
 h = st.sidebar.number_input("Incremento de x (h) [m]", min_value=0.01, step=0.1, key='h', on_change=reset_estado)
 k = st.sidebar.number_input("Incremento de t (k) [días]", min_value=0.01, step=0.5, key='k', on_change=reset_estado)
+pasos_lote = st.sidebar.number_input("Pasos de tiempo por registro", min_value=1, step=1, key='pasos_lote', on_change=reset_estado,
+                                     help="Se avanzan este número de pasos entre cada registro de U, asiento, caudal e isócrona. Con k pequeño acelera mucho el cálculo; la parada por U se comprueba solo en los registros.")
 max_U_pct = st.sidebar.slider("Máximo grado de consolidación a calcular [%]", min_value=10.0, max_value=99.9, key='max_U_pct', on_change=reset_estado)
 
-intervalo_dias_curvas = st.sidebar.number_input("Mostrar isócronas cada (días):", min_value=0.1, step=1.0, key='intervalo_dias_curvas', on_change=reset_estado)
+modo_isocronas = st.sidebar.radio("Registro de isócronas", options=["Intervalo fijo", "Logarítmico (por década)"], key='modo_isocronas', on_change=reset_estado)
+if modo_isocronas == "Intervalo fijo":
+    intervalo_dias_curvas = st.sidebar.number_input("Mostrar isócronas cada (días):", min_value=0.1, step=1.0, key='intervalo_dias_curvas', on_change=reset_estado)
+else:
+    isocronas_decada = st.sidebar.number_input("Isócronas por década de tiempo", min_value=1, step=1, key='isocronas_decada', on_change=reset_estado)
+max_isocronas = st.sidebar.number_input("Máximo de isócronas guardadas", min_value=10, step=50, key='max_isocronas', on_change=reset_estado,
+                                        help="Al alcanzarse se descarta una de cada dos isócronas y se duplica el espaciado, de modo que la memoria no crece con el número de pasos.")
+isocronas_disco = st.sidebar.checkbox("Guardar isócronas en disco", key='isocronas_disco', on_change=reset_estado,
+                                      help="Cada cálculo escribe sus isócronas en un fichero .npy temporal propio (columna 0 = tiempo) mapeado en memoria en lugar de mantenerlas en RAM; se borra al descartar los resultados o al cerrar la app.")
 
 tipo_calculo = st.sidebar.selectbox(
     "Tipos de condiciones de contorno", options=[1, 2, 3],
@@ -79,10 +100,16 @@ str_contorno = {1: "Doble Drenaje", 2: "Drenaje Superior", 3: "Drenaje Inferior"
 
 metodo_numerico = st.sidebar.radio(
     "Motor Numérico", 
-    options=["Explícito ", "Implícito"],
+    options=["Explícito ", "Implícito", "Crank-Nicolson"],
     key='metodo_numerico', on_change=reset_estado
 )
 
+paso_adaptativo = st.sidebar.checkbox(
+    "Paso de tiempo adaptativo (implícito)", key='paso_adaptativo', on_change=reset_estado,
+    help="Euler implícito extrapolado con paso variable: 'k' es solo el paso inicial. Crece en la cola lenta de la consolidación "
+         "y termina exactamente en el grado de consolidación máximo. Ignora el motor numérico y los pasos por registro."
+)
+
 perfil_actual = {key: st.session_state[key] for key in default_params.keys()}
 st.sidebar.download_button(
     label="💾 Guardar Configuración (.json)",
@@ -104,127 +131,49 @@ with tab_simulacion:
         permeabilidad = c * mv * 10  
         alfa = c * k / (h**2)
         
-        if metodo_numerico == "Explícito " and alfa > 0.5:
+        if metodo_numerico == "Explícito " and alfa > 0.5 and not paso_adaptativo:
             st.error(f"Error: El método explícito no es convergente para alfa={alfa:.3f} (debe ser ≤ 0.5). Reduce el incremento temporal 'k', aumenta 'h', o cambia al Método Implícito.")
             st.session_state.calculado = False
+            descartar_resultados()
         else:
-            nx = int(np.floor(longitud / h))
-            x = np.arange(0, longitud + h/2, h)
-            if len(x) != nx + 1: x = np.linspace(0, longitud, nx + 1)
-                
-            u0 = np.ones(nx + 1) * Ti
-            u = np.zeros(nx + 1)
-            
-            hist_t, hist_Q, hist_S, hist_U = [], [], [], []
-            hist_presiones_completas = [(0.0, np.copy(u0))] 
-            grado_consolidacion = 0.0
-            t = 0.0 
             progreso = st.progress(0)
-
-            # --- MOTOR IMPLÍCITO ---
-            if metodo_numerico == "Implícito ":
-                A = np.zeros((nx + 1, nx + 1))
-                for i in range(1, nx):
-                    A[i, i-1] = -alfa
-                    A[i, i]   = 1 + 2 * alfa
-                    A[i, i+1] = -alfa
-                
-                if tipo_calculo == 1:
-                    A[0, 0] = 1; A[nx, nx] = 1
-                    u0[0] = T0; u0[nx] = TL
-                elif tipo_calculo == 2:
-                    A[0, 0] = 1
-                    A[nx, nx-1] = -2 * alfa; A[nx, nx] = 1 + 2 * alfa
-                    u0[0] = T0
-                elif tipo_calculo == 3:
-                    A[0, 0] = 1 + 2 * alfa; A[0, 1] = -2 * alfa
-                    A[nx, nx] = 1
-                    u0[nx] = TL
-
-                A_inv = np.linalg.inv(A)
-
-                while grado_consolidacion <= max_U_pct / 100.0:
-                    t += k
-                    u = np.dot(A_inv, u0)
-                    
-                    if tipo_calculo == 1: u[0] = T0; u[nx] = TL
-                    elif tipo_calculo == 2: u[0] = T0
-                    elif tipo_calculo == 3: u[nx] = TL
-                        
-                    u0 = np.copy(u)
-                    hist_presiones_completas.append((t, np.copy(u0)))
-                    
-                    if tipo_calculo in [1, 2]: derivada = u0[1] / h 
-                    else: derivada = abs(u0[nx] - u0[nx-1]) / h 
-                    Q = permeabilidad * derivada
-                    
-                    uajuste = np.polyfit(x, u0, 2)
-                    sumasimpson = sum([((x[ix+1] - x[ix]) / 6.0) * (u0[ix+1] + u0[ix] + 4 * np.polyval(uajuste, (x[ix+1] + x[ix]) * 0.5)) for ix in range(len(x) - 1)])
-                    
-                    area_total = longitud * Ti
-                    grado_consolidacion = (area_total - sumasimpson) / area_total
-                    asiento = s_max * grado_consolidacion
-                    
-                    hist_t.append(t); hist_Q.append(Q); hist_S.append(asiento * 100); hist_U.append(grado_consolidacion * 100) 
-                    progreso.progress(min(1.0, grado_consolidacion / (max_U_pct / 100.0)))
-                    if t > 500000: break
-
-            # --- MOTOR EXPLÍCITO ---
+            n_nodos = fcon.malla_consolidacion(longitud, h)[0] + 1
+            # Cada cálculo escribe su propio fichero; el del cálculo anterior de esta sesión se borra al sustituirlo
+            descartar_resultados()
+            ruta_isocronas = fcon.fichero_isocronas() if isocronas_disco else None
+            if modo_isocronas == "Intervalo fijo":
+                historial = fcon.HistorialIsocronas(n_nodos, intervalo=intervalo_dias_curvas, n_max=max_isocronas, ruta=ruta_isocronas)
             else:
-                if tipo_calculo == 1: 
-                    u0[0] = (T0 + Ti) / 2; u0[nx] = (TL + Ti) / 2
-                    for i in range(1, nx): u[i] = alfa * (u0[i+1] + u0[i-1] - 2*u0[i]) + u0[i]
-                    u[0] = T0; u[nx] = TL
-                elif tipo_calculo == 2: 
-                    u0[0] = 0
-                    for i in range(1, nx): u[i] = alfa * (u0[i+1] + u0[i-1] - 2*u0[i]) + u0[i]
-                    u[nx] = alfa * (u0[nx-1] + u0[nx-1] - 2*u0[nx]) + u0[nx]
-                elif tipo_calculo == 3: 
-                    u0[0] = alfa * (2 * u0[1] - 2 * u0[0]) + u0[0]
-                    for i in range(1, nx): u[i] = alfa * (u0[i+1] + u0[i-1] - 2*u0[i]) + u0[i]
-                    u0[nx] = 0; u[nx] = 0
-
-                while grado_consolidacion <= max_U_pct / 100.0:
-                    t += k
-                    for i in range(1, nx): u[i] = alfa * (u0[i+1] + u0[i-1]) + (1 - 2*alfa) * u0[i]
-                    
-                    if tipo_calculo == 2: u[nx] = alfa * (u0[nx-1] + u0[nx-1] - 2*u0[nx]) + u0[nx]
-                    elif tipo_calculo == 3: u[0] = alfa * (2 * u0[1] - 2 * u0[0]) + u0[0]; u[nx] = 0
-                        
-                    u0 = np.copy(u)
-                    hist_presiones_completas.append((t, np.copy(u0)))
-                    
-                    if tipo_calculo in [1, 2]: derivada = u0[1] / h 
-                    else: derivada = abs(u0[nx] - u0[nx-1]) / h 
-                    Q = permeabilidad * derivada
-                    
-                    uajuste = np.polyfit(x, u0, 2)
-                    sumasimpson = sum([((x[ix+1] - x[ix]) / 6.0) * (u0[ix+1] + u0[ix] + 4 * np.polyval(uajuste, (x[ix+1] + x[ix]) * 0.5)) for ix in range(len(x) - 1)])
-                        
-                    area_total = longitud * Ti
-                    grado_consolidacion = (area_total - sumasimpson) / area_total
-                    asiento = s_max * grado_consolidacion
-                    
-                    hist_t.append(t); hist_Q.append(Q); hist_S.append(asiento * 100); hist_U.append(grado_consolidacion * 100) 
-                    progreso.progress(min(1.0, grado_consolidacion / (max_U_pct / 100.0)))
-                    if t > 500000: break
-                    
+                historial = fcon.HistorialIsocronas(n_nodos, por_decada=isocronas_decada, n_max=max_isocronas, ruta=ruta_isocronas)
+            if paso_adaptativo:
+                sim = fcon.simular_consolidacion_adaptativa(longitud, Ti, c, mv, h, k, max_U_pct, tipo_calculo,
+                                                            T0=T0, TL=TL, progreso=progreso.progress, historial=historial)
+            else:
+                sim = fcon.simular_consolidacion(longitud, Ti, c, mv, h, k, max_U_pct, tipo_calculo, metodo_numerico,
+                                                 T0=T0, TL=TL, progreso=progreso.progress, pasos_lote=pasos_lote, historial=historial)
+            t, hist_U, hist_S = sim['t'], sim['hist_U'], sim['hist_S']
+            hist_presiones_completas = sim['hist_presiones_completas']
+
             progreso.empty()
-            st.success(f"Cálculos completados exitosamente en {t:.1f} días usando el motor {metodo_numerico.split(' ')[0]}.")
+            if paso_adaptativo:
+                st.success(f"Cálculos completados exitosamente en {t:.1f} días con paso adaptativo: {sim['pasos']} pasos "
+                           f"({sim['rechazados']} rechazados, {sim['resoluciones']} sistemas resueltos con {sim['factorizaciones']} factorizaciones) en {sim['tiempo_cpu']:.2f} s.")
+            else:
+                st.success(f"Cálculos completados exitosamente en {t:.1f} días usando el motor {metodo_numerico.split(' ')[0]}.")
             st.info(f"Para un grado de consolidación de **{hist_U[-1]:.2f} %**, el asiento es **{hist_S[-1]:.2f} cm**.")
 
-            historial_isocronas = [(0.0, hist_presiones_completas[0][1])] 
-            tiempo_objetivo = intervalo_dias_curvas
-            for tiempo_pres, u0_pres in hist_presiones_completas[1:]:
-                if tiempo_pres >= tiempo_objetivo:
-                    historial_isocronas.append((tiempo_pres, u0_pres))
-                    tiempo_objetivo += intervalo_dias_curvas
+            # El registro ya guarda solo las isócronas pedidas; si se ha diezmado el intervalo real es mayor
+            historial_isocronas = hist_presiones_completas
+            if modo_isocronas == "Intervalo fijo":
+                str_isocronas = f"cada {historial.intervalo:g} días"
+            else:
+                str_isocronas = f"{1.0 / np.log10(historial.factor):.3g} por década"
 
             st.session_state.resultados = {
-                'hist_t': np.array(hist_t), 'hist_Q': np.array(hist_Q), 'hist_S': np.array(hist_S), 'hist_U': np.array(hist_U),
-                'x': x, 'historial_isocronas': historial_isocronas, 'hist_presiones_completas': hist_presiones_completas,
+                'hist_t': sim['hist_t'], 'hist_Q': sim['hist_Q'], 'hist_S': hist_S, 'hist_U': hist_U,
+                'x': sim['x'], 'historial_isocronas': historial_isocronas, 'hist_presiones_completas': hist_presiones_completas,
                 'c': c, 'longitud': longitud, 'Ti': Ti, 'mv': mv, 's_max': s_max, 'permeabilidad': permeabilidad, 
-                'str_contorno': str_contorno, 'intervalo_dias': intervalo_dias_curvas,
+                'str_contorno': str_contorno, 'str_isocronas': str_isocronas, 'ruta_isocronas': ruta_isocronas,
                 'fecha': datetime.now().strftime("%d_%m_%y_%H_%M_%S")
             }
             st.session_state.calculado = True
@@ -265,7 +214,7 @@ with tab_simulacion:
                     hoverinfo='name+x+y' # Al pasar el ratón se ve todo claro
                 ))
             fig_iso.update_layout(
-                title=f"Presión de poro (cada {res['intervalo_dias']} días)", 
+                title=f"Presión de poro ({res['str_isocronas']})", 
                 xaxis_title="Presión de poro [kPa]", 
                 yaxis_title="Profundidad [m]", 
                 yaxis=dict(autorange="reversed")
@@ -463,7 +412,15 @@ with tab_teoria:
     u_1^t \\ u_2^t \\ u_3^t \\ \vdots \\ u_n^t
     \end{bmatrix}
     """)
-    st.success("✅ **Incondicionalmente Estable:** Este método invierte la matriz $[A]$ en cada paso. Aunque consume ligeramente más memoria, permite dar pasos de tiempo $k$ gigantescos sin que el modelo colapse jamás, siendo ideal para consolidaciones a largo plazo.")
+    st.success("✅ **Incondicionalmente Estable:** La matriz $[A]$ es tridiagonal: se guarda solo en banda y se factoriza una única vez, de modo que cada paso cuesta $O(n)$ en tiempo y memoria. Permite dar pasos de tiempo $k$ gigantescos sin que el modelo colapse jamás, siendo ideal para consolidaciones a largo plazo y mallas finas de miles de nodos.")
+
+    st.markdown("#### C. Método de Crank-Nicolson")
+    st.write("""
+    Promedia la derivada espacial entre el instante presente y el futuro (θ = 0.5). Mantiene la misma matriz tridiagonal 
+    y es de segundo orden en el tiempo, por lo que con el mismo $k$ resulta más preciso que Euler implícito:
+    """)
+    st.latex(r" -\frac{\alpha}{2} u_{i-1}^{t+k} + (1+\alpha)u_i^{t+k} - \frac{\alpha}{2} u_{i+1}^{t+k} = \frac{\alpha}{2} u_{i-1}^t + (1-\alpha)u_i^t + \frac{\alpha}{2} u_{i+1}^t ")
+    st.info("⚠️ Con $\\alpha$ muy grande pueden aparecer oscilaciones amortiguadas junto a los contornos drenantes en los primeros pasos; en ese caso reduzca $k$ o use Euler implícito.")
 
     st.markdown("---")
     st.subheader("4. Cálculo Final (Grado de Consolidación y Asientos)")
@@ -474,8 +431,9 @@ with tab_teoria:
     """)
     st.latex(r" U(t) = 1 - \frac{\int_0^H u(x,t) \, dx}{\int_0^H u(x,0) \, dx} ")
     st.write("""
-    En el código, esta integral no se resuelve con trapecios simples, sino ajustando un polinomio de segundo grado 
-    (`polyfit`) entre nodos e integrando con la Regla de Simpson para obtener una precisión altísima.
+    En el código, esta integral se resuelve directamente sobre los valores nodales con la Regla de Simpson compuesta 
+    (Simpson 3/8 en los tres últimos intervalos si su número es impar), con un coste proporcional al número de nodos 
+    y error de cuarto orden en $h$.
 
     Finalmente, el asiento físico en centímetros para ese instante se obtiene escalando el asiento máximo esperado ($S_{max}$) 
     por el grado de consolidación:
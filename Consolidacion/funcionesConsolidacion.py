@@ -0,0 +1,481 @@
+# =============================================================================
+# LIBRERÍA: funcionesConsolidacion.py
+# Propósito: Motores de cálculo de la consolidación 1D de Terzaghi por diferencias
+#            finitas (consolidacion_streamlit_3.py)
+# =============================================================================
+
+# Listado de funciones (actualizar según se añaden funciones)
+
+    # malla_consolidacion, nodos x del estrato para un incremento h
+    # operador_difusion, segunda diferencia tridiagonal (inferior, diagonal, superior) con las filas de contorno
+    # aplicar_operador, producto del operador tridiagonal por un vector en O(nx)
+    # factorizar_tridiagonal, factoriza una vez la matriz en banda y devuelve el resolvedor O(nx) por paso
+    # integral_isocrona, área bajo la isócrona u(x) por Simpson compuesto o trapecios, O(nx) sin ajustes
+    # paso_explicito, paso de Euler explícito por slices escribiendo en un buffer ya reservado
+    # simular_consolidacion, integra u(x, t) con el motor explícito, implícito o Crank-Nicolson hasta max_U_pct
+    # simular_consolidacion_adaptativa, Euler implícito con paso variable que alcanza tiempos y grados U objetivo exactos
+    # HistorialIsocronas, registro preasignado (RAM o .npy mapeado) de isócronas en tiempos elegidos o escala logarítmica
+    # seleccionar_isocronas, isócronas del historial cada intervalo_dias
+    # fichero_isocronas / borrar_fichero_isocronas / limpiar_ficheros_isocronas, ficheros .npy temporales de
+    #               HistorialIsocronas: uno por cálculo, borrado al descartarlo y barrido al salir o si quedan antiguos
+
+import atexit
+import glob
+import os
+import tempfile
+import time
+
+import numpy as np
+try:
+    from scipy.sparse import diags # factorización LU dispersa; si no está se usa el algoritmo de Thomas
+    from scipy.sparse.linalg import splu
+except ImportError:
+    splu = None
+
+T_LIMITE = 500000.0 # días, corte de seguridad del bucle temporal
+THETA = {"Implícito": 1.0, "Crank-Nicolson": 0.5} # peso del instante futuro en cada motor en banda
+PREFIJO_ISOCRONAS = "isocronas_" # ficheros temporales de HistorialIsocronas
+ANTIGUEDAD_ISOCRONAS = 12 * 3600.0 # s; los ficheros más antiguos se consideran huérfanos de sesiones cerradas
+_FICHEROS_ISOCRONAS = set() # ficheros creados por este proceso aún sin borrar
+_BORRADOS_PENDIENTES = set() # ficheros descartados que no se pudieron borrar (mapeados en Windows)
+
+
+def malla_consolidacion(longitud, h):
+    nx = int(np.floor(longitud / h))
+    x = np.arange(0, longitud + h/2, h)
+    if len(x) != nx + 1: x = np.linspace(0, longitud, nx + 1)
+    return nx, x
+
+
+def operador_difusion(nx, tipo_calculo):
+    # Fila i: inf[i]·u[i-1] + diag[i]·u[i] + sup[i]·u[i+1]. Contorno drenante: fila nula (u impuesta);
+    # contorno impermeable: nodo fantasma u[-1] = u[1] (o u[nx+1] = u[nx-1])
+    inf = np.ones(nx + 1); diag = -2.0 * np.ones(nx + 1); sup = np.ones(nx + 1)
+    inf[0] = 0.0; sup[nx] = 0.0
+    if tipo_calculo in [1, 2]: inf[0] = diag[0] = sup[0] = 0.0
+    else: sup[0] = 2.0
+    if tipo_calculo in [1, 3]: inf[nx] = diag[nx] = sup[nx] = 0.0
+    else: inf[nx] = 2.0
+    return inf, diag, sup
+
+
+def aplicar_operador(inf, diag, sup, u):
+    r = diag * u
+    r[1:] += inf[1:] * u[:-1]
+    r[:-1] += sup[:-1] * u[1:]
+    return r
+
+
+def factorizar_tridiagonal(inf, diag, sup):
+    # Solo se guardan las tres bandas: memoria O(nx) y resolución O(nx) por paso con la factorización reutilizada
+    n = len(diag)
+    if splu is not None:
+        lu = splu(diags([inf[1:], diag, sup[:-1]], [-1, 0, 1], format='csc'))
+        return lu.solve
+
+    # Algoritmo de Thomas: eliminación hacia delante precalculada
+    inf_l = [float(v) for v in inf]
+    den = [0.0] * n; cp = [0.0] * n
+    den[0] = float(diag[0]); cp[0] = float(sup[0]) / den[0]
+    for i in range(1, n):
+        den[i] = float(diag[i]) - inf_l[i] * cp[i-1]
+        cp[i] = float(sup[i]) / den[i]
+
+    def resolver(d):
+        y = d.tolist()
+        y[0] /= den[0]
+        for i in range(1, n): y[i] = (y[i] - inf_l[i] * y[i-1]) / den[i]
+        for i in range(n - 2, -1, -1): y[i] -= cp[i] * y[i+1]
+        return np.array(y)
+    return resolver
+
+
+def integral_isocrona(x, u, regla="simpson"):
+    # Malla uniforme (malla_consolidacion). Simpson 1/3 compuesto; con nº impar de intervalos los tres
+    # últimos se integran con Simpson 3/8. "trapecio": regla de los trapecios
+    n = len(u) - 1
+    h = (x[-1] - x[0]) / n
+    if regla == "trapecio" or n < 2:
+        return h * (u.sum() - 0.5 * (u[0] + u[-1]))
+    m = n if n % 2 == 0 else n - 3
+    area = 0.0
+    if m > 0:
+        area = h / 3.0 * (u[0] + 4.0 * u[1:m:2].sum() + 2.0 * u[2:m-1:2].sum() + u[m])
+    if m < n:
+        area += 3.0 * h / 8.0 * (u[m] + 3.0 * u[m+1] + 3.0 * u[m+2] + u[m+3])
+    return area
+
+
+def paso_explicito(u0, u, alfa, tipo_calculo, T0=0.0, TL=0.0, tmp=None):
+    # Escribe en u el instante t + k a partir de u0 (sin reservar memoria si se pasa tmp de tamaño nx - 1)
+    nx = len(u0) - 1
+    if tmp is None: tmp = np.empty(nx - 1)
+    np.add(u0[2:], u0[:-2], out=u[1:nx])
+    u[1:nx] *= alfa
+    np.multiply(u0[1:nx], 1 - 2*alfa, out=tmp)
+    u[1:nx] += tmp
+
+    if tipo_calculo == 1: u[0] = T0; u[nx] = TL
+    elif tipo_calculo == 2: u[0] = 0.0; u[nx] = alfa * (u0[nx-1] + u0[nx-1] - 2*u0[nx]) + u0[nx]
+    elif tipo_calculo == 3: u[0] = alfa * (2 * u0[1] - 2 * u0[0]) + u0[0]; u[nx] = 0.0
+    return u
+
+
+def simular_consolidacion(longitud, Ti, c, mv, h, k, max_U_pct, tipo_calculo, metodo="Explícito", T0=0.0, TL=0.0, progreso=None,
+                          pasos_lote=1, regla="simpson", tiempos_salida=None, historial=None):
+    # tipo_calculo: 1 doble drenaje, 2 drenaje superior, 3 drenaje inferior
+    # metodo: "Explícito", "Implícito" o "Crank-Nicolson" (se admiten los textos del selector de la app, con espacios)
+    # progreso(fraccion) es compatible con st.progress(...).progress
+    # pasos_lote: pasos de tiempo entre registros (caudal, U, asiento, isócrona y parada); 1 = todos los pasos
+    # regla: "simpson" o "trapecio" para el grado de consolidación U(t) (integral_isocrona)
+    # tiempos_salida: si se da, solo se registra (y se evalúa U) en el primer paso que alcanza cada tiempo;
+    #                 el cálculo termina al pasar el último o al superar max_U_pct en un registro
+    #                 (los tiempos ≤ 0 se ignoran; una lista vacía equivale a None)
+    # historial: HistorialIsocronas donde guardar las isócronas (memoria acotada); None = todas en una lista
+    s_max = longitud * mv * Ti
+    permeabilidad = c * mv * 10
+    alfa = c * k / (h**2)
+    pasos_lote = max(1, int(pasos_lote))
+
+    nx, x = malla_consolidacion(longitud, h)
+    u0 = np.ones(nx + 1) * Ti
+    u = np.zeros(nx + 1)
+
+    hist_t, hist_Q, hist_S, hist_U = [], [], [], []
+    hist_presiones_completas = []
+    registrar = historial.registrar if historial is not None else lambda t, u: hist_presiones_completas.append((t, np.copy(u)))
+    registrar(0.0, u0)
+    grado_consolidacion = 0.0
+    t = 0.0
+
+    # --- MOTOR IMPLÍCITO / CRANK-NICOLSON (matriz en banda) ---
+    if metodo.strip() in THETA:
+        # (I - θ·α·D) u^{t+k} = (I + (1-θ)·α·D) u^t ; θ = 1 Euler implícito, θ = 0.5 Crank-Nicolson
+        theta = THETA[metodo.strip()]
+        inf, diag, sup = operador_difusion(nx, tipo_calculo)
+        resolver = factorizar_tridiagonal(-theta * alfa * inf, 1.0 - theta * alfa * diag, -theta * alfa * sup)
+
+        if tipo_calculo == 1: u0[0] = T0; u0[nx] = TL
+        elif tipo_calculo == 2: u0[0] = T0
+        elif tipo_calculo == 3: u0[nx] = TL
+
+        def avanzar(u0, u):
+            rhs = u0 + (1.0 - theta) * alfa * aplicar_operador(inf, diag, sup, u0) if theta < 1.0 else u0
+            u = resolver(rhs)
+
+            if tipo_calculo == 1: u[0] = T0; u[nx] = TL
+            elif tipo_calculo == 2: u[0] = T0
+            elif tipo_calculo == 3: u[nx] = TL
+            return u, u0
+
+    # --- MOTOR EXPLÍCITO ---
+    else:
+        # El primer paso parte de la media entre la carga y el contorno drenante (tipo 1) o del contorno ya drenado
+        if tipo_calculo == 1: u0[0] = (T0 + Ti) / 2; u0[nx] = (TL + Ti) / 2
+        elif tipo_calculo == 2: u0[0] = 0
+        elif tipo_calculo == 3: u0[0] = alfa * (2 * u0[1] - 2 * u0[0]) + u0[0]; u0[nx] = 0
+
+        # Doble buffer: u0 (t) y u (t + k) se intercambian en cada paso, sin copias ni reservas de memoria
+        tmp = np.empty(max(nx - 1, 0))
+
+        def avanzar(u0, u):
+            paso_explicito(u0, u, alfa, tipo_calculo, T0, TL, tmp)
+            return u, u0
+
+    # Sin tiempos positivos se registra en cada paso, como con tiempos_salida=None
+    salidas = None if tiempos_salida is None else np.sort([float(v) for v in tiempos_salida if v > 0])
+    if salidas is not None and salidas.size == 0: salidas = None
+    i_salida = 0
+    area_total = longitud * Ti
+
+    # --- BUCLE TEMPORAL ---
+    while grado_consolidacion <= max_U_pct / 100.0:
+        for _ in range(pasos_lote):
+            t += k
+            u0, u = avanzar(u0, u)
+
+        if salidas is not None:
+            if i_salida < len(salidas) and t < salidas[i_salida]:
+                if t > T_LIMITE: break
+                continue
+            while i_salida < len(salidas) and salidas[i_salida] <= t: i_salida += 1
+
+        registrar(t, u0)
+
+        if tipo_calculo in [1, 2]: derivada = u0[1] / h
+        else: derivada = abs(u0[nx] - u0[nx-1]) / h
+        Q = permeabilidad * derivada
+
+        grado_consolidacion = (area_total - integral_isocrona(x, u0, regla)) / area_total
+        asiento = s_max * grado_consolidacion
+
+        hist_t.append(t); hist_Q.append(Q); hist_S.append(asiento * 100); hist_U.append(grado_consolidacion * 100)
+        if progreso is not None: progreso(min(1.0, grado_consolidacion / (max_U_pct / 100.0)))
+        if t > T_LIMITE: break
+        if salidas is not None and i_salida >= len(salidas): break
+
+    return {
+        'hist_t': np.array(hist_t), 'hist_Q': np.array(hist_Q), 'hist_S': np.array(hist_S), 'hist_U': np.array(hist_U),
+        'x': x, 't': t,
+        'hist_presiones_completas': historial.isocronas() if historial is not None else hist_presiones_completas,
+        's_max': s_max, 'permeabilidad': permeabilidad, 'alfa': alfa
+    }
+
+
+def simular_consolidacion_adaptativa(longitud, Ti, c, mv, h, k, max_U_pct, tipo_calculo, T0=0.0, TL=0.0, progreso=None,
+                                     tiempos_objetivo=(), U_objetivo=(), dU_max=5.0, tol_paso=3e-3, crecimiento_max=2.0,
+                                     tol_U=1e-6, regla="simpson", historial=None):
+    # Euler implícito con extrapolación de Richardson (un paso k y dos de k/2: 2º orden y L-estable) y paso variable.
+    # k es el paso inicial; cada paso se ajusta para que el error local estimado (|u_k/2 - u_k| / Ti) sea ~tol_paso y
+    # U no cambie más de dU_max (%), creciendo como mucho crecimiento_max veces por paso. Los tiempos_objetivo (días)
+    # se alcanzan recortando el paso y los U_objetivo (%) y max_U_pct resolviendo el paso que da U exacto
+    # (regula falsi de Illinois, tolerancia tol_U %).
+    # historial: como en simular_consolidacion
+    # Devuelve el mismo diccionario que simular_consolidacion más el coste: pasos, rechazados, resoluciones, factorizaciones, tiempo_cpu
+    inicio = time.perf_counter()
+    s_max = longitud * mv * Ti
+    permeabilidad = c * mv * 10
+    area_total = longitud * Ti
+
+    nx, x = malla_consolidacion(longitud, h)
+    u0 = np.ones(nx + 1) * Ti
+    hist_t, hist_Q, hist_S, hist_U = [], [], [], []
+    hist_presiones_completas = []
+    registrar = historial.registrar if historial is not None else lambda t, u: hist_presiones_completas.append((t, np.copy(u)))
+    registrar(0.0, u0)
+    if tipo_calculo == 1: u0[0] = T0; u0[nx] = TL
+    elif tipo_calculo == 2: u0[0] = T0
+    elif tipo_calculo == 3: u0[nx] = TL
+
+    inf, diag, sup = operador_difusion(nx, tipo_calculo)
+    resoluciones = factorizaciones = 0
+    resolvedores = {} # factorizaciones de los últimos pasos k y k/2, reutilizadas mientras no cambie el paso
+
+    def euler(k_paso):
+        nonlocal factorizaciones
+        if k_paso not in resolvedores:
+            if len(resolvedores) >= 4: resolvedores.clear()
+            alfa = c * k_paso / (h**2)
+            resolvedores[k_paso] = factorizar_tridiagonal(-alfa * inf, 1.0 - alfa * diag, -alfa * sup)
+            factorizaciones += 1
+        resolver = resolvedores[k_paso]
+
+        def resolver_contando(u):
+            nonlocal resoluciones
+            resoluciones += 1
+            return resolver(u)
+        return resolver_contando
+
+    def paso(u0, k_paso):
+        # Paso completo y dos medios pasos; los dos medios pasos comparten la misma factorización
+        medio = euler(k_paso / 2.0)
+        u_k = euler(k_paso)(u0)
+        u_k2 = medio(medio(u0))
+        u = 2.0 * u_k2 - u_k
+        if tipo_calculo == 1: u[0] = T0; u[nx] = TL
+        elif tipo_calculo == 2: u[0] = T0
+        elif tipo_calculo == 3: u[nx] = TL
+        return u, (area_total - integral_isocrona(x, u, regla)) / area_total * 100, np.abs(u_k2 - u_k).max() / Ti
+
+    tiempos = sorted(float(v) for v in tiempos_objetivo if v > 0)
+    niveles = sorted(set(float(v) for v in U_objetivo if 0 < v < max_U_pct) | {float(max_U_pct)})
+    i_t = i_U = 0
+    t = 0.0; U0 = 0.0
+    pasos = rechazados = 0
+
+    while t <= T_LIMITE:
+        k_paso = k
+        if i_t < len(tiempos) and t + k_paso >= tiempos[i_t]: k_paso = tiempos[i_t] - t
+        u, U, err = paso(u0, k_paso)
+
+        # Paso demasiado grande: se rechaza y se repite con uno menor
+        if (err > 2 * tol_paso or U - U0 > 2 * dU_max) and k_paso > 1e-9:
+            k = k_paso * max(0.2, min(0.5, 0.9 * np.sqrt(tol_paso / max(err, 1e-300)))); rechazados += 1
+            continue
+
+        # Se ha cruzado un nivel de U: se busca el paso que lo alcanza exactamente
+        nivel = niveles[i_U]
+        if U >= nivel:
+            ka, Ua, kb, Ub = 0.0, U0, k_paso, U
+            lado = 0
+            for _ in range(60):
+                if abs(U - nivel) <= tol_U: break
+                k_paso = kb - (Ub - nivel) * (kb - ka) / (Ub - Ua)
+                u, U, _ = paso(u0, k_paso)
+                if U >= nivel:
+                    kb, Ub = k_paso, U
+                    if lado == 1: Ua = nivel + (Ua - nivel) / 2.0 # Illinois
+                    lado = 1
+                else:
+                    ka, Ua = k_paso, U
+                    if lado == -1: Ub = nivel + (Ub - nivel) / 2.0
+                    lado = -1
+
+        t += k_paso
+        pasos += 1
+        dU = U - U0
+        u0, U0 = u, U
+        while i_t < len(tiempos) and tiempos[i_t] <= t * (1 + 1e-12): i_t += 1
+        while i_U < len(niveles) and niveles[i_U] <= U0 + tol_U: i_U += 1
+
+        if tipo_calculo in [1, 2]: derivada = u0[1] / h
+        else: derivada = abs(u0[nx] - u0[nx-1]) / h
+        hist_t.append(t); hist_Q.append(permeabilidad * derivada); hist_S.append(s_max * U0); hist_U.append(U0)
+        registrar(t, u0)
+        if progreso is not None: progreso(min(1.0, U0 / max_U_pct))
+        if i_U >= len(niveles): break
+
+        # Nuevo paso: error local ~ k² (Euler) y ritmo de U actual, limitado por el crecimiento máximo
+        k = min(k * crecimiento_max, k_paso * 0.9 * np.sqrt(tol_paso / max(err, 1e-15)))
+        if dU > 0: k = min(k, dU_max * k_paso / dU)
+
+    return {
+        'hist_t': np.array(hist_t), 'hist_Q': np.array(hist_Q), 'hist_S': np.array(hist_S), 'hist_U': np.array(hist_U),
+        'x': x, 't': t,
+        'hist_presiones_completas': historial.isocronas() if historial is not None else hist_presiones_completas,
+        's_max': s_max, 'permeabilidad': permeabilidad, 'alfa': c * k / (h**2),
+        'pasos': pasos, 'rechazados': rechazados, 'resoluciones': resoluciones,
+        'factorizaciones': factorizaciones, 'tiempo_cpu': time.perf_counter() - inicio
+    }
+
+
+class HistorialIsocronas:
+    """
+    Registro de isócronas con memoria acotada: una matriz (capacidad × nodos) preasignada, en RAM o
+    en un .npy mapeado a disco (ruta). Se guarda el estado inicial y después:
+      - tiempos: el primer registro que alcanza cada tiempo pedido (capacidad exacta)
+      - intervalo: una isócrona cada intervalo días (mismo criterio que seleccionar_isocronas)
+      - por_decada: n isócronas por década de tiempo a partir del primer paso (escala logarítmica)
+    En los modos intervalo y por_decada, al llenarse la matriz se descarta una de cada dos filas y se
+    duplica el espaciado, de modo que nunca se superan n_max isócronas.
+    Cada fila es [t, u(x0), ..., u(xn)]. Con ruta, al pedir las isócronas el fichero se recorta a las
+    filas válidas, así que el .npy se interpreta solo (np.load(ruta)[:, 0] son los tiempos).
+    """
+
+    def __init__(self, n_nodos, tiempos=None, intervalo=None, por_decada=None, n_max=500, ruta=None):
+        if tiempos is not None:
+            self.objetivos = sorted(float(v) for v in tiempos if v > 0)
+            capacidad = len(self.objetivos) + 1
+        elif intervalo is None and por_decada is None:
+            raise ValueError("Indica tiempos, intervalo o por_decada")
+        else:
+            self.objetivos = None
+            capacidad = max(2, int(n_max))
+        self.intervalo = intervalo
+        self.factor = None if por_decada is None else 10.0 ** (1.0 / por_decada)
+        self.ruta = ruta
+        if ruta is not None:
+            self.datos = np.lib.format.open_memmap(ruta, mode='w+', dtype=np.float64, shape=(capacidad, n_nodos + 1))
+        else:
+            self.datos = np.empty((capacidad, n_nodos + 1))
+        self.t, self.matriz = self.datos[:, 0], self.datos[:, 1:]
+        self.n = 0
+        self.siguiente = 0.0
+
+    def registrar(self, t, u):
+        if t < self.siguiente: return
+        if self.n == self.t.size: self._diezmar()
+        self.datos[self.n, 0] = t
+        self.datos[self.n, 1:] = u
+        self.n += 1
+
+        if self.objetivos is not None:
+            while self.objetivos and self.objetivos[0] <= t: self.objetivos.pop(0)
+            self.siguiente = self.objetivos[0] if self.objetivos else np.inf
+        elif self.intervalo is not None:
+            self.siguiente += self.intervalo
+        elif t > 0:
+            # tras t = 0 se guarda el primer paso, que fija el origen de la escala; los umbrales no arrastran
+            # el redondeo al paso de tiempo
+            self.siguiente = self.siguiente * self.factor if self.siguiente > 0 else t * self.factor
+            while self.siguiente <= t: self.siguiente *= self.factor
+
+    def _diezmar(self):
+        m = (self.n + 1) // 2
+        self.datos[:m] = self.datos[0:self.n:2]
+        self.n = m
+        if self.intervalo is not None:
+            self.intervalo *= 2
+            self.siguiente = self.t[m - 1] + self.intervalo
+        else:
+            self.factor **= 2
+            self.siguiente = self.t[m - 1] * self.factor
+
+    def cerrar(self, bloque=256):
+        # Recorta el fichero a las n filas válidas: se copia por bloques a un .npy nuevo que sustituye
+        # al original y se reabre en solo lectura (ya no se puede registrar). En RAM no hace nada
+        if self.ruta is None: return
+        if self.n == self.t.size:
+            self.datos.flush()
+        else:
+            ruta_tmp = self.ruta + ".tmp"
+            recortado = np.lib.format.open_memmap(ruta_tmp, mode='w+', dtype=np.float64, shape=(self.n, self.datos.shape[1]))
+            for i in range(0, self.n, bloque):
+                recortado[i:i + bloque] = self.datos[i:min(i + bloque, self.n)]
+            recortado.flush()
+            del recortado
+            self.datos = self.t = self.matriz = None # libera el mapeo antes de sustituir el fichero
+            os.replace(ruta_tmp, self.ruta)
+            self.datos = np.load(self.ruta, mmap_mode='r')
+            self.t, self.matriz = self.datos[:, 0], self.datos[:, 1:]
+
+    def isocronas(self):
+        # Lista (t, u) compatible con hist_presiones_completas; las u son vistas de la matriz (o del fichero)
+        self.cerrar()
+        return [(float(self.t[i]), self.matriz[i]) for i in range(self.n)]
+
+
+def fichero_isocronas():
+    # Fichero .npy temporal propio de un cálculo; antes se reintentan los borrados pendientes y se
+    # barren los huérfanos de procesos anteriores
+    limpiar_ficheros_isocronas(ANTIGUEDAD_ISOCRONAS)
+    descriptor, ruta = tempfile.mkstemp(prefix=PREFIJO_ISOCRONAS, suffix=".npy")
+    os.close(descriptor)
+    _FICHEROS_ISOCRONAS.add(ruta)
+    return ruta
+
+
+def _borrar(ruta):
+    try:
+        os.remove(ruta)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        return False # sigue mapeado (Windows)
+    _FICHEROS_ISOCRONAS.discard(ruta); _BORRADOS_PENDIENTES.discard(ruta)
+    return True
+
+
+def borrar_fichero_isocronas(ruta):
+    # Si no se puede borrar todavía queda pendiente y se reintenta en la próxima limpieza
+    if ruta is not None and not _borrar(ruta): _BORRADOS_PENDIENTES.add(ruta)
+
+
+def limpiar_ficheros_isocronas(antiguedad=None):
+    # Reintenta los borrados pendientes. Con antiguedad (s) borra además los isocronas_*.npy del directorio
+    # temporal que no son de este proceso y llevan más de ese tiempo sin modificarse; sin ella (al salir)
+    # borra todos los ficheros creados por este proceso
+    for ruta in list(_BORRADOS_PENDIENTES): _borrar(ruta)
+    if antiguedad is None:
+        for ruta in list(_FICHEROS_ISOCRONAS): _borrar(ruta)
+        return
+    limite = time.time() - antiguedad
+    for ruta in glob.glob(os.path.join(tempfile.gettempdir(), f"{PREFIJO_ISOCRONAS}*.npy")):
+        if ruta in _FICHEROS_ISOCRONAS: continue
+        try:
+            if os.path.getmtime(ruta) < limite: os.remove(ruta)
+        except OSError:
+            pass
+
+
+def seleccionar_isocronas(hist_presiones_completas, intervalo_dias):
+    historial_isocronas = [(0.0, hist_presiones_completas[0][1])]
+    tiempo_objetivo = intervalo_dias
+    for tiempo_pres, u0_pres in hist_presiones_completas[1:]:
+        if tiempo_pres >= tiempo_objetivo:
+            historial_isocronas.append((tiempo_pres, u0_pres))
+            tiempo_objetivo += intervalo_dias
+    return historial_isocronas
+
+
+atexit.register(limpiar_ficheros_isocronas) # al cerrar el servidor no quedan ficheros de sus sesiones
@@ -9,6 +9,11 @@ from docx import Document
 from docx.shared import Inches, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from datetime import date
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import funcionesPilotes as fpil # motores de cálculo compartidos GCOC / CTE
 
 st.set_page_config(page_title="Cálculo de Pilotes - CTE DB-SE-C", layout="wide", page_icon="🏢")
 
@@ -34,6 +39,7 @@ if 'table_key' not in st.session_state:
 
 if 'calculado' not in st.session_state: st.session_state.calculado = False
 if 'word_buffer' not in st.session_state: st.session_state.word_buffer = None
+if 'cache_pilotes' not in st.session_state: st.session_state.cache_pilotes = fpil.CacheMatrices()
 if 'fig_final_guardada' not in st.session_state: st.session_state.fig_final_guardada = None
 
 # ══════════════════════════════════════════════════════════════════════════
@@ -112,138 +118,6 @@ val_def_L_max = max(float(L_min), min(20.0, float(z_max_total_sidebar)))
 L_max = col_l2.number_input("L max (m)", value=val_def_L_max, min_value=float(L_min), step=1.0)
 L_step = st.sidebar.number_input("Paso L (m)", value=2.5, min_value=0.5)
 
-
-# ══════════════════════════════════════════════════════════════════════════
-# MOTORES DE CÁLCULO CTE DB-SE-C
-# ══════════════════════════════════════════════════════════════════════════
-def calcular_perfil_tensiones(df, zw, z_max):
-    z_max_extendido = z_max + 10.0 
-    z_vals = np.arange(0, z_max_extendido + 0.1, 0.1)
-    sigma_v, u, sigma_v_eff = [], [], []
-    sv_acum = 0.0
-    for z in z_vals:
-        z_acum, gamma_actual = 0.0, 18.0
-        for idx, row in df.iterrows():
-            is_last = (idx == len(df) - 1)
-            if z <= z_acum + row["Espesor (m)"] + 1e-5 or is_last:
-                gamma_actual = row["Gamma Seco (kN/m3)"] if z <= zw + 1e-5 else row["Gamma Sat. (kN/m3)"]
-                break
-            z_acum += row["Espesor (m)"]
-            
-        sv_acum += gamma_actual * 0.1 if z > 0 else 0.0
-        u_val = max(0, (z - zw) * 9.81)
-        sigma_v.append(sv_acum)
-        u.append(u_val)
-        sigma_v_eff.append(sv_acum - u_val)
-    return z_vals, np.array(sigma_v), np.array(u), np.array(sigma_v_eff)
-
-def obtener_tension_a_profundidad(z_target, z_vals, sigma_array):
-    return np.interp(z_target, z_vals, sigma_array)
-
-def calcular_pilote_cte(D, L, df, zw, z_nulo, gamma_r_val, sigma_tope, fp, Kf, f_rug, is_steel):
-    z_max = df["Espesor (m)"].sum()
-    if L > z_max: return None 
-    
-    z_vals, sig_v, u, sig_v_eff = calcular_perfil_tensiones(df, zw, z_max)
-    z_eval_punta = L
-    sig_v_eff_punta = obtener_tension_a_profundidad(z_eval_punta, z_vals, sig_v_eff)
-    
-    # BULBO UNIFORME: 6D hacia arriba y 3D hacia abajo
-    z_sup_bulbo, z_inf_bulbo = max(0.0, L - (6 * D)), L + (3 * D)
-    tipo_bulbo = "6D/3D"
-
-    espesor_bulbo = z_inf_bulbo - z_sup_bulbo
-    qp_eq_acumulado, z_acum, detalle_bulbo_grafico = 0.0, 0.0, []
-    
-    for idx, row in df.iterrows():
-        is_last = (idx == len(df) - 1)
-        h_estrato = row["Espesor (m)"]
-        z_top_estrato = z_acum
-        z_bot_estrato = max(z_acum + h_estrato, z_inf_bulbo) if is_last else z_acum + h_estrato
-            
-        overlap_top = max(z_sup_bulbo, z_top_estrato)
-        overlap_bot = min(z_inf_bulbo, z_bot_estrato)
-        overlap_h = max(0.0, overlap_bot - overlap_top)
-        
-        if overlap_h > 0 and espesor_bulbo > 0:
-            cond_i, c_i, phi_i = row["Condición"], row["c / cu (kPa)"], row["phi (grados)"]
-            
-            if "Corto Plazo" in cond_i:
-                qp_i = 9.0 * c_i
-            else:
-                phi_rad = math.radians(phi_i)
-                Nq = 1.0 if phi_i == 0 else ((1 + math.sin(phi_rad))/(1 - math.sin(phi_rad))) * math.exp(math.pi * math.tan(phi_rad))
-                qp_i = min(fp * sig_v_eff_punta * Nq, 20000.0) 
-            
-            peso = overlap_h / espesor_bulbo
-            qp_eq_acumulado += qp_i * peso
-            
-            detalle_bulbo_grafico.append({
-                "Estrato": f"{row['Estrato']} (Prol.)" if is_last and overlap_bot > (z_acum + h_estrato) else row['Estrato'],
-                "Espesor en bulbo (m)": overlap_h, "Participación (%)": peso * 100.0, "q_p individual (kPa)": qp_i
-            })
-        z_acum += h_estrato
-        
-    Area_pilote = (math.pi * D**2) / 4.0
-    Q_punta = qp_eq_acumulado * Area_pilote
-    
-    auditoria_punta = {
-        "Profundidad Punta (m)": L, "σ'_v efectiva base (kPa)": sig_v_eff_punta,
-        "Resist. Unitaria q_p (kPa)": qp_eq_acumulado, "Fuerza Total Punta (kN)": Q_punta
-    }
-    
-    Q_fuste, z_top, Perimetro, auditoria_fuste = 0.0, 0.0, math.pi * D, []
-    
-    for _, row in df.iterrows():
-        z_bot = z_top + row["Espesor (m)"]
-        if z_top >= L: break
-        
-        # Aplicación Zona Fuste Nulo
-        z_start_fuste = max(z_top, z_nulo)
-        z_end_tramo = min(z_bot, L)
-        
-        if z_end_tramo <= z_start_fuste:
-            z_top = z_bot; continue
-            
-        puntos_corte = [z_start_fuste]
-        if z_start_fuste < zw < z_end_tramo: puntos_corte.append(zw)
-        puntos_corte.append(z_end_tramo)
-        
-        for i in range(len(puntos_corte) - 1):
-            z_sub_top, z_sub_bot = puntos_corte[i], puntos_corte[i+1]
-            L_sub = z_sub_bot - z_sub_top
-            sig_v_eff_mid = obtener_tension_a_profundidad(z_sub_top + (L_sub / 2.0), z_vals, sig_v_eff)
-            
-            if "Corto Plazo" in row["Condición"]:
-                tau_f = (100.0 * row["c / cu (kPa)"]) / (100.0 + row["c / cu (kPa)"])
-                if is_steel: tau_f *= 0.8
-            else:
-                tau_f_raw = sig_v_eff_mid * Kf * f_rug * math.tan(math.radians(row["phi (grados)"]))
-                tau_f = min(tau_f_raw, 100.0 if row["c / cu (kPa)"] > 0 else 120.0)
-                
-            Q_tramo = tau_f * Perimetro * L_sub
-            Q_fuste += Q_tramo
-            
-            sufijo = " (Seco)" if len(puntos_corte) > 2 and z_sub_bot <= zw else (" (Sat.)" if len(puntos_corte) > 2 else "")
-            auditoria_fuste.append({
-                "Estrato": row["Estrato"] + sufijo, "Cotas (m)": f"{z_sub_top:.1f} a {z_sub_bot:.1f}",
-                "Long. fuste (m)": L_sub, "σ'_v media (kPa)": sig_v_eff_mid,
-                "Resist. Unitaria τ_f (kPa)": tau_f, "Fuerza Tramo (kN)": Q_tramo
-            })
-        z_top = z_bot
-        
-    Q_adm_geo = (Q_punta + Q_fuste) / gamma_r_val
-    Q_tope_est = Area_pilote * (sigma_tope * 1000.0)
-
-    return {
-        "D": D, "L": L, "Q_punta (kN)": Q_punta, "Q_fuste (kN)": Q_fuste, 
-        "Q_adm_geo (kN)": Q_adm_geo, "Q_tope_est (kN)": Q_tope_est, "Q_final (kN)": min(Q_adm_geo, Q_tope_est),
-        "Control": "ESTRUCTURAL" if Q_tope_est < Q_adm_geo else "GEOTÉCNICA",
-        "auditoria_punta": auditoria_punta, "auditoria_fuste": auditoria_fuste,
-        "auditoria_bulbo": detalle_bulbo_grafico, "z_sup_bulbo": z_sup_bulbo, "z_inf_bulbo": z_inf_bulbo,
-        "tipo_bulbo": tipo_bulbo
-    }
-
 # ══════════════════════════════════════════════════════════════════════════
 # INTERFAZ PRINCIPAL DE PESTAÑAS 
 # ══════════════════════════════════════════════════════════════════════════
@@ -307,7 +181,8 @@ if st.sidebar.button("⚙️ Calcular Pilotes", type="primary", use_container_wi
 # CÁLCULOS PRINCIPALES Y RENDERIZADO
 # ══════════════════════════════════════════════════════════════════════════
 if st.session_state.calculado:
-    z_vals, sig_v, u, sig_v_eff = calcular_perfil_tensiones(df_edit, zw, z_max_total)
+    perfil = fpil.StressProfile.desde_df(df_edit, zw)
+    z_vals, sig_v, u, sig_v_eff = perfil.discretizar(z_max_total + 10.0)
     
     with tab_datos:
         st.markdown("---")
@@ -329,8 +204,8 @@ if st.session_state.calculado:
                 z_sub_bot = puntos_corte[i+1]
                 z_mid_loop = z_sub_top + (z_sub_bot - z_sub_top) / 2.0
                 
-                sig_v_eff_mid_loop = obtener_tension_a_profundidad(z_mid_loop, z_vals, sig_v_eff)
-                sig_v_eff_base = obtener_tension_a_profundidad(z_sub_bot, z_vals, sig_v_eff)
+                sig_v_eff_mid_loop = perfil.sigma_eff(z_mid_loop)
+                sig_v_eff_base = perfil.sigma_eff(z_sub_bot)
                 cond_loop, c_loop, phi_loop = row_est["Condición"], row_est["c / cu (kPa)"], row_est["phi (grados)"]
                 
                 if "Corto Plazo" in cond_loop:
@@ -376,22 +251,21 @@ if st.session_state.calculado:
         st.markdown("---")
         st.subheader("🔎 Consulta puntual de tensiones")
         z_consulta = st.number_input("Introduce una profundidad Z (m):", min_value=0.0, max_value=float(z_max_total + 10.0), value=float(zw), step=0.1)
-        sig_v_z = obtener_tension_a_profundidad(z_consulta, z_vals, sig_v)
-        u_z = obtener_tension_a_profundidad(z_consulta, z_vals, u)
-        sig_v_eff_z = obtener_tension_a_profundidad(z_consulta, z_vals, sig_v_eff)
+        sig_v_z = perfil.sigma_v(z_consulta)
+        u_z = perfil.u(z_consulta)
+        sig_v_eff_z = perfil.sigma_eff(z_consulta)
         
         col_t1, col_t2, col_t3 = st.columns(3)
         col_t1.metric(label="Tensión Total (σ)", value=f"{sig_v_z:.2f} kPa")
         col_t2.metric(label="Pres. Intersticial (u)", value=f"{u_z:.2f} kPa")
         col_t3.metric(label="Tensión Efectiva (σ')", value=f"{sig_v_eff_z:.2f} kPa")
 
-    resultados = []
-    for D in np.arange(D_min, D_max + 1e-5, D_step):
-        for L in np.arange(L_min, L_max + 1e-5, L_step):
-            res = calcular_pilote_cte(D, L, df_edit, zw, z_nulo, gamma_r, sigma_tope_mpa, fp_val, Kf_val, f_rug, is_steel)
-            if res is not None: resultados.append(res)
-
-    df_res = pd.DataFrame(resultados)
+    D_arr = np.arange(D_min, D_max + 1e-5, D_step)
+    L_arr = np.arange(L_min, L_max + 1e-5, L_step)
+    # Caché por contenido: si los datos no cambian (p. ej. al cambiar de pestaña) no se recalcula nada
+    matriz = st.session_state.cache_pilotes.obtener(D_arr, L_arr, df_edit, zw, "CTE", z_nulo=z_nulo, gamma_r_val=gamma_r, sigma_tope=sigma_tope_mpa,
+                                                    fp=fp_val, Kf=Kf_val, f_rug=f_rug, is_steel=is_steel)
+    df_res = fpil.matriz_a_dataframe(matriz)
     df_pivot_geo_global, df_pivot_final_global = None, None
 
     if not df_res.empty:
@@ -457,12 +331,32 @@ if st.session_state.calculado:
             st.plotly_chart(fig_final, use_container_width=True)
             st.session_state.fig_final_guardada = fig_final 
 
+            st.markdown("---")
+            st.subheader("🎯 Longitud Mínima para las Cargas de Pilares")
+            st.markdown("*Para cada diámetro de la matriz, menor longitud con Q_final ≥ N (horquilla cada 1 m + bisección, precisión 1 cm).*")
+            texto_cargas = st.text_input("Cargas de pilares N (kN), separadas por comas:", value="1000, 1500", key="cargas_pilares")
+            try:
+                cargas = [float(v) for v in texto_cargas.replace(";", ",").split(",") if v.strip()]
+            except ValueError:
+                cargas = []
+                st.error("Las cargas deben ser números separados por comas.")
+            if cargas:
+                df_sol, df_vol = st.session_state.cache_pilotes.diseno(D_arr, cargas, df_edit, zw, "CTE", L_min=L_min, z_nulo=z_nulo, gamma_r_val=gamma_r, sigma_tope=sigma_tope_mpa,
+                                                                     fp=fp_val, Kf=Kf_val, f_rug=f_rug, is_steel=is_steel)
+                df_sol_tabla = df_sol.pivot(index="Pilar", columns="D", values="L")
+                df_sol_tabla.index = [f"Pilar {p} (N = {n:.0f} kN)" for p, n in zip(df_sol_tabla.index, cargas)]
+                df_sol_tabla.columns = [f"Ø {d_val:.2f} m" for d_val in df_sol_tabla.columns]
+                st.dataframe(df_sol_tabla.style.format("{:.2f} m", na_rep="—"), use_container_width=True)
+                df_vol["D"] = df_vol["D"].apply(lambda x: f"Ø {x:.2f} m")
+                st.dataframe(df_vol.set_index("D").style.format({"L máx (m)": "{:.2f}", "Volumen total (m3)": "{:.2f}"}, na_rep="—"), use_container_width=True)
+                st.caption("— : sin solución (tope estructural inferior a N, longitud mayor que el sondeo o L mínima mayor que el sondeo).")
+
         with tab_auditoria:
             st.subheader("🔍 Auditoría (CTE DB-SE-C F.2)")
             col_aud1, col_aud2 = st.columns(2)
             d_aud = col_aud1.selectbox("Diámetro Ø (m):", df_res['D'].unique(), format_func=lambda x: f"{x:.2f}")
             l_aud = col_aud2.selectbox("Longitud L (m):", df_res['L'].unique(), format_func=lambda x: f"{x:.2f}")
-            res_aud = df_res[(df_res['D'] == d_aud) & (df_res['L'] == l_aud)].iloc[0]
+            res_aud = fpil.auditar_pilote(matriz, d_aud, l_aud, df_edit) # auditoría bajo demanda del pilote seleccionado
             
             st.markdown(f"**Carga Final:** {res_aud['Q_final (kN)']:.0f} kN | **R_cd Punta:** {res_aud['Q_punta (kN)']/gamma_r:.0f} kN | **R_cd Fuste:** {res_aud['Q_fuste (kN)']/gamma_r:.0f} kN")
             st.dataframe(pd.DataFrame(res_aud['auditoria_fuste']).style.format({"Long. fuste (m)": "{:.2f}", "σ'_v media (kPa)": "{:.1f}", "Resist. Unitaria τ_f (kPa)": "{:.2f}", "Fuerza Tramo (kN)": "{:.0f}"}).hide(axis="index"), use_container_width=True)
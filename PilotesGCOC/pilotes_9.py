@@ -9,6 +9,11 @@ from docx import Document
 from docx.shared import Inches, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from datetime import date
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import funcionesPilotes as fpil # motores de cálculo compartidos GCOC / CTE
 
 st.set_page_config(page_title="Cálculo de Pilotes - GCOC", layout="wide", page_icon="🏗️")
 
@@ -31,6 +36,7 @@ if 'df_base' not in st.session_state:
 
 if 'calculado' not in st.session_state: st.session_state.calculado = False
 if 'word_buffer' not in st.session_state: st.session_state.word_buffer = None
+if 'cache_pilotes' not in st.session_state: st.session_state.cache_pilotes = fpil.CacheMatrices()
 if 'fig_auditoria_guardada' not in st.session_state: st.session_state.fig_auditoria_guardada = None
 if 'fig_final_guardada' not in st.session_state: st.session_state.fig_final_guardada = None
 
@@ -148,184 +154,6 @@ if st.sidebar.button("⚙️ Calcular Pilotes", type="primary", use_container_wi
     st.session_state.calculado = True
     st.session_state.word_buffer = None
 
-# ══════════════════════════════════════════════════════════════════════════
-# MOTORES DE CÁLCULO
-# ══════════════════════════════════════════════════════════════════════════
-def calcular_perfil_tensiones(df, zw, z_max):
-    z_max_extendido = z_max + 10.0 
-    z_vals = np.arange(0, z_max_extendido + 0.1, 0.1)
-    sigma_v, u, sigma_v_eff = [], [], []
-    sv_acum = 0.0
-    for z in z_vals:
-        z_acum, gamma_actual = 0.0, 18.0
-        for idx, row in df.iterrows():
-            is_last = (idx == len(df) - 1)
-            if z <= z_acum + row["Espesor (m)"] + 1e-5 or is_last:
-                if z <= zw + 1e-5:
-                    gamma_actual = row["Gamma Seco (kN/m3)"]
-                else:
-                    gamma_actual = row["Gamma Sat. (kN/m3)"]
-                break
-            z_acum += row["Espesor (m)"]
-            
-        sv_acum = sv_acum + gamma_actual * 0.1 if z > 0 else 0.0
-        u_val = max(0, (z - zw) * 9.81)
-        sigma_v.append(sv_acum)
-        u.append(u_val)
-        sigma_v_eff.append(sv_acum - u_val)
-        
-    return z_vals, np.array(sigma_v), np.array(u), np.array(sigma_v_eff)
-
-def obtener_tension_a_profundidad(z_target, z_vals, sigma_array):
-    return np.interp(z_target, z_vals, sigma_array)
-
-def calcular_pilote(D, L, df, zw, fS_val, sigma_tope_mpa):
-    z_max = df["Espesor (m)"].sum()
-    if L > z_max: return None 
-    
-    fD_calc = max(2.0/3.0, 1.0 - (D / 3.0))
-    z_vals, sig_v, u, sig_v_eff = calcular_perfil_tensiones(df, zw, z_max)
-    
-    # --- PUNTA GCOC (ESTRICTA LEY DE ESPESORES 6D/3D) ---
-    z_eval_punta = min(L, 20 * D)
-    sig_v_eff_punta = obtener_tension_a_profundidad(z_eval_punta, z_vals, sig_v_eff)
-    
-    z_sup_bulbo = max(0.0, L - (6 * D))
-    z_inf_bulbo = L + (3 * D)
-    espesor_bulbo = z_inf_bulbo - z_sup_bulbo
-    
-    qp_eq_acumulado = 0.0
-    z_acum = 0.0
-    detalle_bulbo_grafico = [] 
-    
-    for idx, row in df.iterrows():
-        is_last = (idx == len(df) - 1)
-        h_estrato = row["Espesor (m)"]
-        z_top_estrato = z_acum
-        
-        z_bot_estrato = max(z_acum + h_estrato, z_inf_bulbo) if is_last else z_acum + h_estrato
-            
-        overlap_top = max(z_sup_bulbo, z_top_estrato)
-        overlap_bot = min(z_inf_bulbo, z_bot_estrato)
-        overlap_h = max(0.0, overlap_bot - overlap_top)
-        
-        if overlap_h > 0 and espesor_bulbo > 0:
-            cond_i = row["Condición"]
-            c_i = row["c / cu (kPa)"]
-            phi_i = row["phi (grados)"]
-            
-            if "Corto Plazo" in cond_i:
-                qp_i = 9.0 * c_i * fD_calc
-            else:
-                phi_rad = math.radians(phi_i)
-                if phi_i == 0:
-                    Nq_star, Nc_star = 1.0, 9.0 * fD_calc
-                else:
-                    Nq_star = 1.5 * ((1 + math.sin(phi_rad))/(1 - math.sin(phi_rad))) * math.exp(math.pi * math.tan(phi_rad)) * fD_calc
-                    Nc_star = (Nq_star - 1) / math.tan(phi_rad)
-                qp_i = (sig_v_eff_punta * Nq_star) + (c_i * Nc_star)
-            
-            peso = overlap_h / espesor_bulbo
-            qp_eq_acumulado += qp_i * peso
-            
-            nombre_estrato = f"{row['Estrato']} (Prolongado)" if is_last and overlap_bot > (z_acum + h_estrato) else row['Estrato']
-            
-            detalle_bulbo_grafico.append({
-                "Estrato": nombre_estrato,
-                "Espesor en bulbo (m)": overlap_h,
-                "Participación (%)": peso * 100.0,
-                "q_p individual (kPa)": qp_i
-            })
-            
-        z_acum += h_estrato
-        
-    qp = qp_eq_acumulado
-    Area_pilote = (math.pi * D**2) / 4.0
-    Q_punta = qp * Area_pilote
-    
-    auditoria_punta = {
-        "Profundidad Punta (m)": L,
-        "σ'_v efectiva base (kPa)": sig_v_eff_punta,
-        "Factor de escala (fD)": fD_calc,
-        "Resist. Unitaria q_p (kPa)": qp,
-        "Fuerza Total Punta (kN)": Q_punta
-    }
-    
-    # --- FUSTE (MEJORADO PARA CORTES DEL NIVEL FREÁTICO) ---
-    Q_fuste, z_top, Perimetro = 0.0, 0.0, math.pi * D
-    auditoria_fuste = [] 
-    k0_tan_delta_fijo = 0.30 
-    
-    for _, row in df.iterrows():
-        z_bot = z_top + row["Espesor (m)"]
-        if z_top >= L: break
-        
-        z_end_tramo = min(z_bot, L)
-        if z_end_tramo <= z_top:
-            z_top = z_bot
-            continue
-            
-        # Identificar si el Nivel Freático cruza por medio de este estrato
-        puntos_corte = [z_top]
-        if z_top < zw < z_end_tramo:
-            puntos_corte.append(zw)
-        puntos_corte.append(z_end_tramo)
-        
-        # Calcular los sub-tramos (secos y saturados por separado)
-        for i in range(len(puntos_corte) - 1):
-            z_sub_top = puntos_corte[i]
-            z_sub_bot = puntos_corte[i+1]
-            L_sub = z_sub_bot - z_sub_top
-            
-            z_mid = z_sub_top + (L_sub / 2.0)
-            sig_v_eff_mid = obtener_tension_a_profundidad(z_mid, z_vals, sig_v_eff)
-            
-            if "Corto Plazo" in row["Condición"]:
-                tau_f = min(row["c / cu (kPa)"] * (100.0 / (100.0 + row["c / cu (kPa)"])), 70.0)
-            else:
-                tau_f = min(row["c / cu (kPa)"] + k0_tan_delta_fijo * sig_v_eff_mid, 90.0)
-                
-            Q_tramo = tau_f * Perimetro * L_sub
-            Q_fuste += Q_tramo
-            
-            # Etiquetamos el estrato si ha sufrido una división freática
-            sufijo = ""
-            if len(puntos_corte) > 2:
-                sufijo = " (Seco)" if z_sub_bot <= zw else " (Sat.)"
-            
-            # --- ARREGLO DE PANDAS: L_sub se guarda como float numérico real ---
-            auditoria_fuste.append({
-                "Estrato": row["Estrato"] + sufijo,
-                "Cotas (m)": f"{z_sub_top:.1f} a {z_sub_bot:.1f}",
-                "Long. fuste (m)": L_sub,
-                "σ'_v media (kPa)": sig_v_eff_mid,
-                "Resist. Unitaria τ_f (kPa)": tau_f,
-                "Fuerza Tramo (kN)": Q_tramo
-            })
-            
-        z_top = z_bot
-        
-    Q_total_geo = Q_punta + Q_fuste
-    Q_adm_geo = Q_total_geo / fS_val
-    
-    Q_tope_est = Area_pilote * (sigma_tope_mpa * 1000.0)
-    Q_final_diseno = min(Q_adm_geo, Q_tope_est)
-    control = "ESTRUCTURAL" if Q_tope_est < Q_adm_geo else "GEOTÉCNICO"
-
-    return {
-        "D": D, "L": L, "fD": fD_calc, 
-        "Q_punta (kN)": Q_punta, "Q_fuste (kN)": Q_fuste, 
-        "Q_adm_geo (kN)": Q_adm_geo,
-        "Q_tope_est (kN)": Q_tope_est,
-        "Q_final (kN)": Q_final_diseno,
-        "Control": control,
-        "auditoria_punta": auditoria_punta,
-        "auditoria_fuste": auditoria_fuste,
-        "auditoria_bulbo": detalle_bulbo_grafico,
-        "z_sup_bulbo": z_sup_bulbo,
-        "z_inf_bulbo": z_inf_bulbo
-    }
-
 # ══════════════════════════════════════════════════════════════════════════
 # GENERADOR DEL INFORME EN WORD
 # ══════════════════════════════════════════════════════════════════════════
@@ -448,7 +276,8 @@ def generar_word_pilotes(df_estratos, fig_tens, df_pivot_geo, df_pivot_final, fS
 # CÁLCULOS PRINCIPALES Y RENDERIZADO DE RESULTADOS
 # ══════════════════════════════════════════════════════════════════════════
 if st.session_state.calculado:
-    z_vals, sig_v, u, sig_v_eff = calcular_perfil_tensiones(df_edit, zw, z_max_total)
+    perfil = fpil.StressProfile.desde_df(df_edit, zw)
+    z_vals, sig_v, u, sig_v_eff = perfil.discretizar(z_max_total + 10.0)
     
     # --- Guardamos esta tabla unitaria mejorada (con cortes freáticos) para el Word ---
     datos_unitarios = []
@@ -475,8 +304,8 @@ if st.session_state.calculado:
                 z_sub_bot = puntos_corte[i+1]
                 z_mid_loop = z_sub_top + (z_sub_bot - z_sub_top) / 2.0
                 
-                sig_v_eff_mid_loop = obtener_tension_a_profundidad(z_mid_loop, z_vals, sig_v_eff)
-                sig_v_eff_base = obtener_tension_a_profundidad(min(z_sub_bot, 20*D_min), z_vals, sig_v_eff)
+                sig_v_eff_mid_loop = perfil.sigma_eff(z_mid_loop)
+                sig_v_eff_base = perfil.sigma_eff(min(z_sub_bot, 20*D_min))
                 cond_loop = row_est["Condición"]
                 c_loop = row_est["c / cu (kPa)"]
                 phi_loop = row_est["phi (grados)"]
@@ -532,25 +361,21 @@ if st.session_state.calculado:
         st.subheader("🔎 Consulta puntual de tensiones")
         z_consulta = st.number_input("Introduce una profundidad Z (m):", min_value=0.0, max_value=float(z_max_total + 10.0), value=float(zw), step=0.1)
         
-        sig_v_z = obtener_tension_a_profundidad(z_consulta, z_vals, sig_v)
-        u_z = obtener_tension_a_profundidad(z_consulta, z_vals, u)
-        sig_v_eff_z = obtener_tension_a_profundidad(z_consulta, z_vals, sig_v_eff)
+        sig_v_z = perfil.sigma_v(z_consulta)
+        u_z = perfil.u(z_consulta)
+        sig_v_eff_z = perfil.sigma_eff(z_consulta)
         
         col_t1, col_t2, col_t3 = st.columns(3)
         col_t1.metric(label="Tensión Total (σ)", value=f"{sig_v_z:.2f} kPa")
         col_t2.metric(label="Pres. Intersticial (u)", value=f"{u_z:.2f} kPa")
         col_t3.metric(label="Tensión Efectiva (σ')", value=f"{sig_v_eff_z:.2f} kPa")
 
-    resultados = []
     D_arr = np.arange(D_min, D_max + 1e-5, D_step)
     L_arr = np.arange(L_min, L_max + 1e-5, L_step)
 
-    for D in D_arr:
-        for L in L_arr:
-            res = calcular_pilote(D, L, df_edit, zw, FS, sigma_tope_mpa)
-            if res is not None: resultados.append(res)
-
-    df_res = pd.DataFrame(resultados)
+    # Caché por contenido: si los datos no cambian (p. ej. al cambiar de pestaña) no se recalcula nada
+    matriz = st.session_state.cache_pilotes.obtener(D_arr, L_arr, df_edit, zw, "GCOC", fS_val=FS, sigma_tope_mpa=sigma_tope_mpa)
+    df_res = fpil.matriz_a_dataframe(matriz)
     df_pivot_geo_global = None
     df_pivot_final_global = None
     res_auditoria_seleccionada = None
@@ -681,6 +506,25 @@ if st.session_state.calculado:
             st.plotly_chart(fig_final, use_container_width=True)
             st.session_state.fig_final_guardada = fig_final # Guardamos para el Word
 
+            st.markdown("---")
+            st.subheader("🎯 Longitud Mínima para las Cargas de Pilares")
+            st.markdown("*Para cada diámetro de la matriz, menor longitud con Q_final ≥ N (horquilla cada 1 m + bisección, precisión 1 cm).*")
+            texto_cargas = st.text_input("Cargas de pilares N (kN), separadas por comas:", value="1000, 1500", key="cargas_pilares")
+            try:
+                cargas = [float(v) for v in texto_cargas.replace(";", ",").split(",") if v.strip()]
+            except ValueError:
+                cargas = []
+                st.error("Las cargas deben ser números separados por comas.")
+            if cargas:
+                df_sol, df_vol = st.session_state.cache_pilotes.diseno(D_arr, cargas, df_edit, zw, "GCOC", L_min=L_min, fS_val=FS, sigma_tope_mpa=sigma_tope_mpa)
+                df_sol_tabla = df_sol.pivot(index="Pilar", columns="D", values="L")
+                df_sol_tabla.index = [f"Pilar {p} (N = {n:.0f} kN)" for p, n in zip(df_sol_tabla.index, cargas)]
+                df_sol_tabla.columns = [f"Ø {d_val:.2f} m" for d_val in df_sol_tabla.columns]
+                st.dataframe(df_sol_tabla.style.format("{:.2f} m", na_rep="—"), use_container_width=True)
+                df_vol["D"] = df_vol["D"].apply(lambda x: f"Ø {x:.2f} m")
+                st.dataframe(df_vol.set_index("D").style.format({"L máx (m)": "{:.2f}", "Volumen total (m3)": "{:.2f}"}, na_rep="—"), use_container_width=True)
+                st.caption("— : sin solución (tope estructural inferior a N, longitud mayor que el sondeo o L mínima mayor que el sondeo).")
+
         with tab_auditoria:
             st.subheader("🔍 Inspector de Resistencias Unitarias y Bulbo de Punta")
             col_aud1, col_aud2 = st.columns(2)
@@ -691,7 +535,7 @@ if st.session_state.calculado:
             res_auditoria = df_res[(df_res['D'] == d_aud) & (df_res['L'] == l_aud)]
             
             if not res_auditoria.empty:
-                fila_aud = res_auditoria.iloc[0]
+                fila_aud = fpil.auditar_pilote(matriz, d_aud, l_aud, df_edit) # auditoría bajo demanda del pilote seleccionado
                 
                 st.markdown(f"### ➡️ Carga de Diseño Final: **{fila_aud['Q_final (kN)']:.0f} kN** (Controlado por: **{fila_aud['Control']}**)")
                 st.markdown(f"- Admisible del Terreno: {fila_aud['Q_adm_geo (kN)']:.0f} kN")
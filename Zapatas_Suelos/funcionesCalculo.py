@@ -5,14 +5,21 @@
 # =============================================================================
 
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib
+from matplotlib.figure import Figure
 from matplotlib.patches import Polygon
 import openpyxl
+try:
+    import xlsxwriter # escritura en streaming más rápida; si no está se usa openpyxl en modo write_only
+except ImportError:
+    xlsxwriter = None
 from docx import Document
 from docx.shared import Cm, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT
+import itertools
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 # --- GESTIÓN DE ARCHIVOS Y DATOS ---
@@ -81,6 +88,27 @@ def tension_zapata_continua(b, q, x, z):
     tensionxz = (q / np.pi) * (np.sin(alpha) * np.sin(alpha + 2*delta))
     return tensionz, tensionx, tensionxz
 
+def tensiones_malla_zapata(b, q, xcoord, zcoord, dtype=np.float64):
+    # Misma solución que tension_zapata_continua para toda la malla (z, x) en una sola llamada:
+    # zcoord como columna y xcoord como fila se combinan por broadcasting, sin meshgrid ni bucles.
+    # dtype=np.float32 reduce a la mitad la memoria de las tres matrices en mallas muy finas.
+    tipo = np.dtype(dtype).type
+    x = np.asarray(xcoord, dtype=tipo)[np.newaxis, :]
+    z = np.asarray(zcoord, dtype=tipo)[:, np.newaxis]
+    z = np.where(z <= 0, tipo(0.001), z)
+    theta1 = np.arctan2((x - b), z)
+    theta2 = np.arctan2((x + b), z)
+    alpha = theta2 - theta1
+    delta = theta1
+
+    sin_alpha = np.sin(alpha)
+    term_trig = sin_alpha * np.cos(alpha + 2*delta)
+    factor = tipo(q / np.pi)
+    tensionz = factor * (alpha + term_trig)
+    tensionx = factor * (alpha - term_trig)
+    tensionxz = factor * (sin_alpha * np.sin(alpha + 2*delta))
+    return tensionz, tensionx, tensionxz
+
 def asiento_deformacion_plana(cotas, z, hi, E, poisson, tensionx, tensionz):
     idx = parametro_terreno(cotas, z)
     nu = poisson[idx]
@@ -95,6 +123,37 @@ def parametro_terreno(cotas, zt):
             return i + 1
     return len(cotas) - 1 
 
+def indice_estrato(cotas, z):
+    # parametro_terreno para un array de profundidades (en un contacto se toma el estrato superior)
+    cotas = np.asarray(cotas, dtype=float)
+    return np.clip(np.searchsorted(cotas, z, side='left'), 1, cotas.size - 1)
+
+def asientos_malla_zapata(zcoord, cotas, E, poisson, m_tension_x, m_tension_z):
+    # asiento_deformacion_plana para toda la malla: cada z se asigna a su estrato una sola vez
+    # y cada vertical se integra con una suma acumulada.
+    # Devuelve (v_asientos, m_asientos): asiento en superficie de cada x y matriz (nz, nx) con el
+    # asiento del punto (zcoord[j], x), es decir, la compresión del terreno por debajo de zcoord[j].
+    zcoord = np.asarray(zcoord, dtype=float)
+    idx = indice_estrato(cotas, zcoord)
+    nu = np.asarray(poisson, dtype=float)[idx][:, np.newaxis]
+    mod_E = np.asarray(E, dtype=float)[idx][:, np.newaxis]
+    hi = np.diff(zcoord, prepend=0.0)[:, np.newaxis]
+
+    epsilon_z = (1 + nu) / mod_E * ((1 - nu) * m_tension_z - nu * m_tension_x)
+    d_asiento = np.abs(epsilon_z * hi)
+    acumulado = np.cumsum(d_asiento, axis=-2) # admite también pilas (n_casos, nz, nx)
+    v_asientos = acumulado[..., -1, :]
+    return v_asientos, v_asientos[..., np.newaxis, :] - acumulado
+
+def asiento_profundidad(z, zcoord, v_asientos, m_asientos):
+    # Asiento de la vertical a cualquier profundidad z (interpolación lineal entre nodos)
+    z_nodos = np.concatenate(([0.0], zcoord))
+    asientos = np.vstack((v_asientos, m_asientos))
+    z = min(max(z, 0.0), z_nodos[-1])
+    k = int(np.clip(np.searchsorted(z_nodos, z), 1, z_nodos.size - 1))
+    peso = (z - z_nodos[k-1]) / (z_nodos[k] - z_nodos[k-1])
+    return (1 - peso) * asientos[k-1] + peso * asientos[k]
+
 def tension_geostatica(z, cotas, pe_saturado, pe_seco, nf):
     sigma_v = 0
     z_actual = 0
@@ -108,31 +167,136 @@ def tension_geostatica(z, cotas, pe_saturado, pe_seco, nf):
         z_actual += dz
     return sigma_v
 
+def perfil_geostatico(cotas, pe_saturado, pe_seco, nf, z_max=0.0):
+    # Ley σv(z) exacta y lineal a tramos: quiebros en los contactos entre estratos y en el nivel
+    # freático (mismo criterio que tension_geostatica: saturado por debajo de nf, seco por encima).
+    # Por debajo de la última cota se prolonga con el último estrato hasta z_max.
+    cotas = np.asarray(cotas, dtype=float)
+    z_fin = max(cotas[-1], z_max)
+    z_cortes = np.concatenate((cotas, [nf, z_fin]))
+    z_cortes = np.unique(z_cortes[(z_cortes >= 0) & (z_cortes <= z_fin)])
+    z_medio = 0.5 * (z_cortes[:-1] + z_cortes[1:])
+    idx = indice_estrato(cotas, z_medio)
+    gamma = np.where(z_medio > nf, np.asarray(pe_saturado, dtype=float)[idx], np.asarray(pe_seco, dtype=float)[idx])
+    sigma_cortes = np.concatenate(([0.0], np.cumsum(gamma * np.diff(z_cortes))))
+    return z_cortes, sigma_cortes
+
+def tension_geostatica_columna(zcoord, cotas, pe_saturado, pe_seco, nf):
+    # σv en todas las profundidades de la malla con una sola tabla (no depende de x)
+    zcoord = np.asarray(zcoord, dtype=float)
+    z_cortes, sigma_cortes = perfil_geostatico(cotas, pe_saturado, pe_seco, nf, zcoord.max(initial=0.0))
+    return np.interp(zcoord, z_cortes, sigma_cortes)
+
+def calcular_malla_zapata(xcoord, zcoord, b, q, cotas, pe_saturado, pe_seco, nf, E, poisson, dtype=np.float64):
+    # Tensiones inducidas y geostáticas en la malla (z, x) y asiento en superficie de cada vertical
+    # (el asiento a otras profundidades se obtiene con asientos_malla_zapata / asiento_profundidad)
+    # A. Inducidas (malla completa, ver tensiones_malla_zapata)
+    m_tension_z, m_tension_x, m_tension_xz = tensiones_malla_zapata(b, q, xcoord, zcoord, dtype)
+    # B. Geostáticas (una columna σv(z) común a todas las verticales)
+    m_tension_geo = np.tile(tension_geostatica_columna(zcoord, cotas, pe_saturado, pe_seco, nf)[:, np.newaxis], (1, xcoord.size))
+    # C. Asientos
+    v_asientos, _ = asientos_malla_zapata(zcoord, cotas, E, poisson, m_tension_x, m_tension_z)
+
+    return m_tension_z, m_tension_x, m_tension_xz, m_tension_geo, v_asientos
+
+# --- SUPERPOSICIÓN DE CASOS DE CARGA Y ZAPATAS CONTIGUAS ---
+
+def influencia_unitaria(b, xcoord, zcoord, desplazamientos=(0.0,), dtype=np.float64):
+    # Tensiones para q = 1 de cada zapata (semiancho b, eje en x = desplazamiento) en la malla (z, x).
+    # La solución solo depende de x - desplazamiento: se evalúa una sola vez en el conjunto de
+    # abscisas relativas distintas y se reparte a cada zapata por indexación.
+    # Devuelve matrices (n_zapatas, nz, nx) para "z", "x" y "xz".
+    desplazamientos = np.atleast_1d(np.asarray(desplazamientos, dtype=float))
+    x_rel = np.asarray(xcoord, dtype=float)[np.newaxis, :] - desplazamientos[:, np.newaxis]
+    x_unicas, inversa = np.unique(x_rel, return_inverse=True)
+    inversa = inversa.reshape(x_rel.shape)
+    campos = tensiones_malla_zapata(b, 1.0, x_unicas, zcoord, dtype)
+    return {clave: np.moveaxis(campo[:, inversa], 1, 0) for clave, campo in zip(("z", "x", "xz"), campos)}
+
+def superponer_zapatas(xcoord, zcoord, b, cargas, desplazamientos=(0.0,), cotas=None, E=None, poisson=None,
+                       influencia=None, dtype=np.float64):
+    # Tensiones (y asientos si se dan cotas, E y poisson) de n_casos combinaciones de carga sobre
+    # n_zapatas zapatas iguales, por superposición de la influencia unitaria (las tensiones son
+    # lineales en q). cargas: (n_casos,) misma q en todas las zapatas, o (n_casos, n_zapatas).
+    # El asiento se calcula con las tensiones ya superpuestas (la deformación lleva valor absoluto).
+    # influencia permite reutilizar el resultado de influencia_unitaria entre llamadas.
+    if influencia is None: influencia = influencia_unitaria(b, xcoord, zcoord, desplazamientos, dtype)
+    n_zapatas = influencia["z"].shape[0]
+    cargas = np.asarray(cargas, dtype=float)
+    if cargas.ndim < 2: cargas = np.repeat(np.atleast_1d(cargas)[:, np.newaxis], n_zapatas, axis=1)
+
+    resultado = {clave: np.tensordot(cargas.astype(campo.dtype), campo, axes=1) for clave, campo in influencia.items()}
+    if cotas is not None:
+        resultado["asientos"], resultado["m_asientos"] = asientos_malla_zapata(zcoord, cotas, E, poisson, resultado["x"], resultado["z"])
+    return resultado
+
 # --- EXPORTACIÓN Y GRÁFICOS ---
 
+def guardar_xlsx_filas(filas, directorio, nombre):
+    # Escribe las filas en streaming (sin mantener todas las celdas en memoria):
+    # xlsxwriter en modo constant_memory o, si no está instalado, openpyxl en modo write_only
+    ruta = os.path.join(directorio, f"{nombre}.xlsx")
+    if xlsxwriter is not None:
+        wb = xlsxwriter.Workbook(ruta, {'constant_memory': True})
+        ws = wb.add_worksheet('Sheet')
+        for i, fila in enumerate(filas):
+            ws.write_row(i, 0, fila)
+        wb.close()
+    else:
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet('Sheet')
+        for fila in filas:
+            ws.append(fila)
+        wb.save(ruta)
+
 def guardar_xlsx_matriz(xcoord, zcoord, data, directorio, nombre):
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    for j, x in enumerate(xcoord):
-        ws.cell(row=1, column=j+2, value=x)
-    for i, z in enumerate(zcoord):
-        ws.cell(row=i+2, column=1, value=z)
-        for j, val in enumerate(data[i]):
-            ws.cell(row=i+2, column=j+2, value=val)
-    wb.save(os.path.join(directorio, f"{nombre}.xlsx"))
+    # Fila 1 con las x y, debajo, una fila por z con la cota en la columna A
+    cabecera = [[None] + np.asarray(xcoord, dtype=float).tolist()]
+    cuerpo = ([z] + fila for z, fila in zip(np.asarray(zcoord, dtype=float).tolist(), np.asarray(data, dtype=float).tolist()))
+    guardar_xlsx_filas(itertools.chain(cabecera, cuerpo), directorio, nombre)
 
 def guardar_xlsx_vector(xcoord, data, directorio, nombre):
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    for j, x in enumerate(xcoord):
-        ws.cell(row=1, column=j+1, value=x)
-        ws.cell(row=2, column=j+1, value=data[j])
-    wb.save(os.path.join(directorio, f"{nombre}.xlsx"))
-
-def graficos_tensiones_zapata(xcoord, zcoord, tension, directorio, titulo, tipo, B, cotas, nf):
-    plt.rcParams['font.family'] = 'sans-serif'
+    guardar_xlsx_filas([np.asarray(xcoord, dtype=float).tolist(), np.asarray(data, dtype=float).tolist()], directorio, nombre)
+
+def guardar_binario(xcoord, zcoord, matrices, directorio, nombre, formato='npz'):
+    # Copia binaria de las matrices de resultados para otras herramientas (sin pasar por Excel).
+    # 'npz': arrays x, z y uno por matriz (np.load); 'parquet': tabla larga z, x, <matriz>...
+    # (requiere pyarrow o fastparquet). Los vectores por x (p. ej. asientos) se guardan tal cual en npz.
+    # Los nombres 'x' y 'z' quedan reservados para las coordenadas en ambos formatos.
+    reservadas = sorted({'x', 'z'} & set(matrices))
+    if reservadas:
+        raise ValueError(f"Nombres de matriz reservados para las coordenadas: {', '.join(reservadas)}")
+    xcoord, zcoord = np.asarray(xcoord, dtype=float), np.asarray(zcoord, dtype=float)
+    if formato == 'npz':
+        ruta = os.path.join(directorio, f"{nombre}.npz")
+        arrays = {'x': xcoord, 'z': zcoord}
+        arrays.update((clave, np.asarray(valor)) for clave, valor in matrices.items())
+        np.savez_compressed(ruta, **arrays)
+    elif formato == 'parquet':
+        import pandas as pd
+        Z, X = np.meshgrid(zcoord, xcoord, indexing='ij')
+        tabla = {"z": Z.ravel(), "x": X.ravel()}
+        for clave, valor in matrices.items():
+            valor = np.asarray(valor)
+            tabla[clave] = np.broadcast_to(valor, Z.shape).ravel() if valor.ndim == 1 else valor.ravel()
+        ruta = os.path.join(directorio, f"{nombre}.parquet")
+        pd.DataFrame(tabla).to_parquet(ruta, index=False)
+    else:
+        raise ValueError(f"Formato binario no soportado: {formato}")
+    return ruta
+
+def graficos_tensiones_zapata(xcoord, zcoord, tension, directorio, titulo, tipo, B, cotas, nf, dpi=300, formato='png'):
+    # API orientada a objetos (Figure + lienzo Agg): no toca el estado global de pyplot y se puede lanzar en paralelo
+    with matplotlib.rc_context({'font.family': 'sans-serif'}):
+        fig = Figure(figsize=(10, 10))
+        ax = fig.subplots()
+        _dibujar_tensiones(fig, ax, xcoord, zcoord, tension, titulo, tipo, B, cotas, nf)
+        ruta = os.path.join(directorio, f"{titulo.replace(' ', '_')}_{tipo}.{formato}")
+        fig.savefig(ruta, dpi=dpi, format=formato)
+    return ruta
+
+def _dibujar_tensiones(fig, ax, xcoord, zcoord, tension, titulo, tipo, B, cotas, nf):
     # Mantenemos el lienzo fijo y márgenes controlados
-    fig, ax = plt.subplots(figsize=(10, 10))
     fig.subplots_adjust(left=0.12, right=0.88, top=0.90, bottom=0.10)
     
     X, Z = np.meshgrid(xcoord, zcoord)
@@ -192,12 +356,16 @@ def graficos_tensiones_zapata(xcoord, zcoord, tension, directorio, titulo, tipo,
     ax.set_ylabel("Profundidad Z [m]", fontsize=11, fontweight='bold')
     ax.axhline(0, color='black', linewidth=2.0, zorder=31)
 
-    plt.savefig(os.path.join(directorio, f"{titulo.replace(' ', '_')}_{tipo}.png"), dpi=300)
-    plt.close()
+def grafico_asientos(xcoord, asiento, directorio, titulo, cotas, nf, B, dpi=300, formato='png'):
+    with matplotlib.rc_context({'font.family': 'sans-serif'}):
+        fig = Figure(figsize=(12, 5))
+        ax = fig.subplots()
+        _dibujar_asientos(fig, ax, xcoord, asiento, titulo, B)
+        ruta = os.path.join(directorio, f"{titulo}.{formato}")
+        fig.savefig(ruta, dpi=dpi, format=formato)
+    return ruta
 
-def grafico_asientos(xcoord, asiento, directorio, titulo, cotas, nf, B):
-    plt.rcParams['font.family'] = 'sans-serif'
-    fig, ax = plt.subplots(figsize=(12, 5))
+def _dibujar_asientos(fig, ax, xcoord, asiento, titulo, B):
     fig.subplots_adjust(left=0.1, right=0.95, top=0.88, bottom=0.15)
     
     asiento_mm = np.array(asiento) * 1000 
@@ -236,8 +404,37 @@ def grafico_asientos(xcoord, asiento, directorio, titulo, cotas, nf, B):
     ax.grid(True, which='major', linestyle=':', color='gray', alpha=0.3)
     ax.minorticks_on()
 
-    plt.savefig(os.path.join(directorio, f"{titulo}.png"), dpi=300)
-    plt.close()
+# --- RENDERIZADO DE GRÁFICOS ---
+
+TITULOS_TENSION = {'z': 'Tensión Vertical Sigma_Z', 'x': 'Tensión Horizontal Sigma_X', 'xz': 'Tensión Cortante Tau_XZ'}
+
+def _renderizar(tarea):
+    funcion, args, kwargs = tarea
+    return funcion(*args, **kwargs)
+
+def renderizar_graficos(xcoord, zcoord, tensiones, asiento, directorio, B, cotas, nf,
+                        tipos=('isolinea', 'continua'), asientos=True, dpi=300, formato='png', procesos=1):
+    # tensiones: {'z': m_tension_z, 'x': m_tension_x, 'xz': m_tension_xz}; solo se dibujan las claves presentes
+    # tipos: mapas a generar ('isolinea', 'continua'); asientos=False omite el perfil de asientos
+    # procesos: nº de procesos del pool (1 = en serie, None = núcleos disponibles). Arrancar los procesos e
+    #           importar matplotlib en cada uno cuesta más que dibujar unas pocas figuras, así que por defecto
+    #           se dibuja en serie y el pool solo compensa con muchas figuras o mallas muy finas
+    # Devuelve la lista de rutas generadas. En Windows/macOS el script llamante debe protegerse con if __name__ == "__main__"
+    tareas = []
+    for clave, tension in tensiones.items():
+        if tension is None: continue
+        for tipo in tipos:
+            tareas.append((graficos_tensiones_zapata, (xcoord, zcoord, tension, directorio, TITULOS_TENSION[clave], tipo, B, cotas, nf),
+                           {'dpi': dpi, 'formato': formato}))
+    if asientos:
+        tareas.append((grafico_asientos, (xcoord, asiento, directorio, 'Perfil de Asientos', cotas, nf, B),
+                       {'dpi': dpi, 'formato': formato}))
+
+    if procesos is None: procesos = min(len(tareas), os.cpu_count() or 1)
+    if procesos <= 1 or len(tareas) <= 1:
+        return [_renderizar(tarea) for tarea in tareas]
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        return list(pool.map(_renderizar, tareas))
 
 def guardar_reporte_docx(B, q, ax, az, directorio, espesor, pe_seco, pe_saturado, E, poisson, nf):
     doc = Document()
@@ -0,0 +1,987 @@
+# =============================================================================
+# LIBRERÍA: funcionesPilotes.py
+# Propósito: Motores de cálculo compartidos por las apps de pilotes
+#            (PilotesGCOC/pilotes_9.py y PilotesCTE/PilotesCTE_2.py)
+# =============================================================================
+
+# Listado de funciones (actualizar según se añaden funciones)
+
+    # StressProfile, perfil de tensiones verticales (σv, u, σ'v) construido una vez por estratigrafía y nivel freático
+    # calcular_perfil_tensiones, discretiza el perfil cada 0.1 m para las gráficas de la app
+
+    # tabla_estratos, convierte la tabla de estratos en arrays posicionales para los motores
+    # calcular_pilote, capacidad de un pilote según la GCOC (punta 6D/3D, fuste, tope estructural)
+    # calcular_pilote_cte, capacidad de un pilote según el CTE DB-SE-C
+    # pesos_bulbo, participación de cada estrato en el bulbo 6D/3D como tensor (nD, nL, nEstratos)
+    # qp_estratos_gcoc / qp_estratos_cte, resistencia unitaria en punta de cada estrato para todos los (D, L)
+    # tau_fuste_gcoc / tau_fuste_cte, resistencia unitaria por fuste de un estrato
+    # tabla_fuste, fuerza de fuste acumulada por tramos (contactos, nivel freático, fuste nulo)
+    # integrar_fuste, fuerza de fuste por unidad de perímetro para un vector de longitudes
+    # kernel_pilotes, matrices de capacidad D x L sin bucles por pilote
+    # calcular_matriz_pilotes, matriz de diseño D x L compartiendo perfil de tensiones y tabla de estratos
+    # auditar_pilote, reconstruye bajo demanda la auditoría de un (D, L) de la matriz
+    # matriz_a_dataframe, pasa las matrices al formato largo de resultados de las apps
+
+    # longitud_minima, menor L que resiste una carga N para un diámetro (horquilla + bisección)
+    # diseno_optimo, longitud mínima y volumen de hormigón por diámetro para una lista de cargas de pilares
+
+    # clave_parametros / clave_calculo, huella de nivel freático, método y parámetros (y de la estratigrafía)
+    # celdas_afectadas, pilotes de la matriz que dependen de los estratos editados
+    # CacheMatrices, caché LRU de matrices D x L que solo calcula las celdas nuevas al ampliar rangos
+    #               o las celdas afectadas al editar un estrato, y memoriza los diseños óptimos por cargas
+
+    # ejecutar_matriz_paralelo, reparte la matriz D x L en bloques de diámetros entre procesos
+    # ejecutar_lote, ejecuta una función por tarea (p. ej. por sondeo) en un pool de procesos
+
+    # leer_sondeo, importa la estratigrafía de un sondeo (xlsx tipo Data/datos_terreno*.xlsx, csv o json)
+    # es_sondeo, reconoce un sondeo por las columnas de su cabecera (sin leer los datos)
+    # validar_estratos, comprueba espesores y parámetros igual que la tabla de las apps
+
+import hashlib
+import json
+import math
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+
+GAMMA_W = 9.81          # peso específico del agua (kN/m3)
+GAMMA_DEFECTO = 18.0    # peso específico si no hay estratos definidos (kN/m3)
+
+
+# --- PERFIL DE TENSIONES ---
+
+class StressProfile:
+    # Integración cerrada de σv = ∫γ(z)dz. Entre dos cortes consecutivos (contactos entre
+    # estratos o nivel freático) γ es constante, así que σv es lineal a tramos y basta
+    # guardar el valor en cada corte y la pendiente del tramo.
+    # El último estrato se prolonga indefinidamente, como en el cálculo de la punta.
+
+    def __init__(self, espesores, gamma_seco, gamma_sat, zw, gamma_w=GAMMA_W):
+        espesores = np.asarray(espesores, dtype=float)
+        gamma_seco = np.asarray(gamma_seco, dtype=float)
+        gamma_sat = np.asarray(gamma_sat, dtype=float)
+        self.zw = float(zw)
+        self.gamma_w = float(gamma_w)
+
+        if espesores.size == 0:
+            espesores = np.array([0.0])
+            gamma_seco = np.array([GAMMA_DEFECTO])
+            gamma_sat = np.array([GAMMA_DEFECTO])
+
+        # Cota de base de cada estrato; el contacto pertenece al estrato superior
+        self.cotas_base = np.cumsum(espesores)
+        self.n_estratos = espesores.size
+
+        # Cortes del perfil: superficie, contactos interiores y nivel freático
+        cortes = np.concatenate(([0.0], self.cotas_base[:-1]))
+        if self.zw > 0.0:
+            cortes = np.append(cortes, self.zw)
+        self.z_cortes = np.unique(cortes)
+
+        # Pendiente (γ) de cada tramo evaluada en su punto medio
+        z_fin = np.append(self.z_cortes[1:], self.z_cortes[-1] + 1.0)
+        z_medio = 0.5 * (self.z_cortes + z_fin)
+        idx_estrato = self.estrato_en(z_medio)
+        self.gamma_tramo = np.where(z_medio <= self.zw, gamma_seco[idx_estrato], gamma_sat[idx_estrato])
+
+        # σv acumulada en cada corte
+        dz = np.diff(self.z_cortes)
+        self.sigma_cortes = np.concatenate(([0.0], np.cumsum(self.gamma_tramo[:-1] * dz)))
+
+    @classmethod
+    def desde_df(cls, df, zw):
+        return cls(df["Espesor (m)"].to_numpy(dtype=float),
+                   df["Gamma Seco (kN/m3)"].to_numpy(dtype=float),
+                   df["Gamma Sat. (kN/m3)"].to_numpy(dtype=float), zw)
+
+    def estrato_en(self, z):
+        # Índice (posicional) del estrato que contiene z; por debajo del sondeo, el último
+        idx = np.searchsorted(self.cotas_base, np.asarray(z, dtype=float), side="left")
+        return np.minimum(idx, self.n_estratos - 1)
+
+    def sigma_v(self, z):
+        z_arr = np.maximum(np.asarray(z, dtype=float), 0.0)
+        tramo = np.searchsorted(self.z_cortes, z_arr, side="right") - 1
+        resultado = self.sigma_cortes[tramo] + self.gamma_tramo[tramo] * (z_arr - self.z_cortes[tramo])
+        return float(resultado) if resultado.ndim == 0 else resultado
+
+    def u(self, z):
+        resultado = np.maximum(0.0, (np.asarray(z, dtype=float) - self.zw) * self.gamma_w)
+        return float(resultado) if resultado.ndim == 0 else resultado
+
+    def sigma_eff(self, z):
+        return self.sigma_v(z) - self.u(z)
+
+    def discretizar(self, z_max, paso=0.1):
+        z_vals = np.arange(0, z_max + paso, paso)
+        return z_vals, self.sigma_v(z_vals), self.u(z_vals), self.sigma_eff(z_vals)
+
+
+def calcular_perfil_tensiones(df, zw, z_max):
+    # Perfil discretizado hasta 10 m por debajo del sondeo (gráficas y consultas puntuales)
+    return StressProfile.desde_df(df, zw).discretizar(z_max + 10.0)
+
+
+
+# --- TABLA DE ESTRATOS ---
+
+def tabla_estratos(df):
+    # Columnas del editor de estratos pasadas a arrays posicionales (una sola lectura del DataFrame)
+    espesor = df["Espesor (m)"].to_numpy(dtype=float)
+    z_bot = np.cumsum(espesor)
+    return {
+        "Estrato": [str(nombre) for nombre in df["Estrato"]],
+        "espesor": espesor,
+        "z_top": np.concatenate(([0.0], z_bot[:-1])),
+        "z_bot": z_bot,
+        "corto": np.array(["Corto Plazo" in str(cond) for cond in df["Condición"]], dtype=bool),
+        "c": df["c / cu (kPa)"].to_numpy(dtype=float),
+        "phi": df["phi (grados)"].to_numpy(dtype=float),
+    }
+
+
+# --- MOTOR GCOC ---
+
+def calcular_pilote(D, L, df, zw, fS_val, sigma_tope_mpa, perfil=None, estratos=None, auditoria=True):
+    if estratos is None: estratos = tabla_estratos(df)
+    if perfil is None: perfil = StressProfile.desde_df(df, zw)
+    z_max = estratos["espesor"].sum()
+    if L > z_max: return None 
+    
+    fD_calc = max(2.0/3.0, 1.0 - (D / 3.0))
+    n_estratos = len(estratos["Estrato"])
+    
+    # --- PUNTA GCOC (ESTRICTA LEY DE ESPESORES 6D/3D) ---
+    z_eval_punta = min(L, 20 * D)
+    sig_v_eff_punta = perfil.sigma_eff(z_eval_punta)
+    
+    z_sup_bulbo = max(0.0, L - (6 * D))
+    z_inf_bulbo = L + (3 * D)
+    espesor_bulbo = z_inf_bulbo - z_sup_bulbo
+    
+    qp_eq_acumulado = 0.0
+    detalle_bulbo_grafico = [] 
+    
+    for i in range(n_estratos):
+        is_last = (i == n_estratos - 1)
+        z_top_estrato = estratos["z_top"][i]
+        z_bot_estrato = max(estratos["z_bot"][i], z_inf_bulbo) if is_last else estratos["z_bot"][i]
+            
+        overlap_top = max(z_sup_bulbo, z_top_estrato)
+        overlap_bot = min(z_inf_bulbo, z_bot_estrato)
+        overlap_h = max(0.0, overlap_bot - overlap_top)
+        
+        if overlap_h > 0 and espesor_bulbo > 0:
+            c_i = estratos["c"][i]
+            phi_i = estratos["phi"][i]
+            
+            if estratos["corto"][i]:
+                qp_i = 9.0 * c_i * fD_calc
+            else:
+                phi_rad = math.radians(phi_i)
+                if phi_i == 0:
+                    Nq_star, Nc_star = 1.0, 9.0 * fD_calc
+                else:
+                    Nq_star = 1.5 * ((1 + math.sin(phi_rad))/(1 - math.sin(phi_rad))) * math.exp(math.pi * math.tan(phi_rad)) * fD_calc
+                    Nc_star = (Nq_star - 1) / math.tan(phi_rad)
+                qp_i = (sig_v_eff_punta * Nq_star) + (c_i * Nc_star)
+            
+            peso = overlap_h / espesor_bulbo
+            qp_eq_acumulado += qp_i * peso
+            
+            if auditoria:
+                nombre_estrato = f"{estratos['Estrato'][i]} (Prolongado)" if is_last and overlap_bot > estratos["z_bot"][i] else estratos["Estrato"][i]
+                
+                detalle_bulbo_grafico.append({
+                    "Estrato": nombre_estrato,
+                    "Espesor en bulbo (m)": overlap_h,
+                    "Participación (%)": peso * 100.0,
+                    "q_p individual (kPa)": qp_i
+                })
+        
+    qp = qp_eq_acumulado
+    Area_pilote = (math.pi * D**2) / 4.0
+    Q_punta = qp * Area_pilote
+    
+    auditoria_punta = {
+        "Profundidad Punta (m)": L,
+        "σ'_v efectiva base (kPa)": sig_v_eff_punta,
+        "Factor de escala (fD)": fD_calc,
+        "Resist. Unitaria q_p (kPa)": qp,
+        "Fuerza Total Punta (kN)": Q_punta
+    }
+    
+    # --- FUSTE (MEJORADO PARA CORTES DEL NIVEL FREÁTICO) ---
+    Q_fuste, Perimetro = 0.0, math.pi * D
+    auditoria_fuste = [] 
+    k0_tan_delta_fijo = 0.30 
+    
+    for i in range(n_estratos):
+        z_top, z_bot = estratos["z_top"][i], estratos["z_bot"][i]
+        if z_top >= L: break
+        
+        z_end_tramo = min(z_bot, L)
+        if z_end_tramo <= z_top: continue
+            
+        # Identificar si el Nivel Freático cruza por medio de este estrato
+        puntos_corte = [z_top]
+        if z_top < zw < z_end_tramo:
+            puntos_corte.append(zw)
+        puntos_corte.append(z_end_tramo)
+        
+        # Calcular los sub-tramos (secos y saturados por separado)
+        for j in range(len(puntos_corte) - 1):
+            z_sub_top = puntos_corte[j]
+            z_sub_bot = puntos_corte[j+1]
+            L_sub = z_sub_bot - z_sub_top
+            
+            z_mid = z_sub_top + (L_sub / 2.0)
+            sig_v_eff_mid = perfil.sigma_eff(z_mid)
+            
+            c_i = estratos["c"][i]
+            if estratos["corto"][i]:
+                tau_f = min(c_i * (100.0 / (100.0 + c_i)), 70.0)
+            else:
+                tau_f = min(c_i + k0_tan_delta_fijo * sig_v_eff_mid, 90.0)
+                
+            Q_tramo = tau_f * Perimetro * L_sub
+            Q_fuste += Q_tramo
+            
+            if not auditoria: continue
+            
+            # Etiquetamos el estrato si ha sufrido una división freática
+            sufijo = ""
+            if len(puntos_corte) > 2:
+                sufijo = " (Seco)" if z_sub_bot <= zw else " (Sat.)"
+            
+            auditoria_fuste.append({
+                "Estrato": estratos["Estrato"][i] + sufijo,
+                "Cotas (m)": f"{z_sub_top:.1f} a {z_sub_bot:.1f}",
+                "Long. fuste (m)": L_sub,
+                "σ'_v media (kPa)": sig_v_eff_mid,
+                "Resist. Unitaria τ_f (kPa)": tau_f,
+                "Fuerza Tramo (kN)": Q_tramo
+            })
+        
+    Q_total_geo = Q_punta + Q_fuste
+    Q_adm_geo = Q_total_geo / fS_val
+    
+    Q_tope_est = Area_pilote * (sigma_tope_mpa * 1000.0)
+    Q_final_diseno = min(Q_adm_geo, Q_tope_est)
+    control = "ESTRUCTURAL" if Q_tope_est < Q_adm_geo else "GEOTÉCNICO"
+
+    return {
+        "D": D, "L": L, "fD": fD_calc, 
+        "Q_punta (kN)": Q_punta, "Q_fuste (kN)": Q_fuste, 
+        "Q_adm_geo (kN)": Q_adm_geo,
+        "Q_tope_est (kN)": Q_tope_est,
+        "Q_final (kN)": Q_final_diseno,
+        "Control": control,
+        "auditoria_punta": auditoria_punta,
+        "auditoria_fuste": auditoria_fuste,
+        "auditoria_bulbo": detalle_bulbo_grafico,
+        "z_sup_bulbo": z_sup_bulbo,
+        "z_inf_bulbo": z_inf_bulbo
+    }
+
+
+# --- MOTOR CTE DB-SE-C ---
+
+def calcular_pilote_cte(D, L, df, zw, z_nulo, gamma_r_val, sigma_tope, fp, Kf, f_rug, is_steel, perfil=None, estratos=None, auditoria=True):
+    if estratos is None: estratos = tabla_estratos(df)
+    if perfil is None: perfil = StressProfile.desde_df(df, zw)
+    z_max = estratos["espesor"].sum()
+    if L > z_max: return None 
+    
+    n_estratos = len(estratos["Estrato"])
+    z_eval_punta = L
+    sig_v_eff_punta = perfil.sigma_eff(z_eval_punta)
+    
+    # BULBO UNIFORME: 6D hacia arriba y 3D hacia abajo
+    z_sup_bulbo, z_inf_bulbo = max(0.0, L - (6 * D)), L + (3 * D)
+    tipo_bulbo = "6D/3D"
+
+    espesor_bulbo = z_inf_bulbo - z_sup_bulbo
+    qp_eq_acumulado, detalle_bulbo_grafico = 0.0, []
+    
+    for i in range(n_estratos):
+        is_last = (i == n_estratos - 1)
+        z_top_estrato = estratos["z_top"][i]
+        z_bot_estrato = max(estratos["z_bot"][i], z_inf_bulbo) if is_last else estratos["z_bot"][i]
+            
+        overlap_top = max(z_sup_bulbo, z_top_estrato)
+        overlap_bot = min(z_inf_bulbo, z_bot_estrato)
+        overlap_h = max(0.0, overlap_bot - overlap_top)
+        
+        if overlap_h > 0 and espesor_bulbo > 0:
+            c_i, phi_i = estratos["c"][i], estratos["phi"][i]
+            
+            if estratos["corto"][i]:
+                qp_i = 9.0 * c_i
+            else:
+                phi_rad = math.radians(phi_i)
+                Nq = 1.0 if phi_i == 0 else ((1 + math.sin(phi_rad))/(1 - math.sin(phi_rad))) * math.exp(math.pi * math.tan(phi_rad))
+                qp_i = min(fp * sig_v_eff_punta * Nq, 20000.0) 
+            
+            peso = overlap_h / espesor_bulbo
+            qp_eq_acumulado += qp_i * peso
+            
+            if auditoria:
+                detalle_bulbo_grafico.append({
+                    "Estrato": f"{estratos['Estrato'][i]} (Prol.)" if is_last and overlap_bot > estratos["z_bot"][i] else estratos["Estrato"][i],
+                    "Espesor en bulbo (m)": overlap_h, "Participación (%)": peso * 100.0, "q_p individual (kPa)": qp_i
+                })
+        
+    Area_pilote = (math.pi * D**2) / 4.0
+    Q_punta = qp_eq_acumulado * Area_pilote
+    
+    auditoria_punta = {
+        "Profundidad Punta (m)": L, "σ'_v efectiva base (kPa)": sig_v_eff_punta,
+        "Resist. Unitaria q_p (kPa)": qp_eq_acumulado, "Fuerza Total Punta (kN)": Q_punta
+    }
+    
+    Q_fuste, Perimetro, auditoria_fuste = 0.0, math.pi * D, []
+    
+    for i in range(n_estratos):
+        z_top, z_bot = estratos["z_top"][i], estratos["z_bot"][i]
+        if z_top >= L: break
+        
+        # Aplicación Zona Fuste Nulo
+        z_start_fuste = max(z_top, z_nulo)
+        z_end_tramo = min(z_bot, L)
+        
+        if z_end_tramo <= z_start_fuste: continue
+            
+        puntos_corte = [z_start_fuste]
+        if z_start_fuste < zw < z_end_tramo: puntos_corte.append(zw)
+        puntos_corte.append(z_end_tramo)
+        
+        for j in range(len(puntos_corte) - 1):
+            z_sub_top, z_sub_bot = puntos_corte[j], puntos_corte[j+1]
+            L_sub = z_sub_bot - z_sub_top
+            sig_v_eff_mid = perfil.sigma_eff(z_sub_top + (L_sub / 2.0))
+            
+            c_i = estratos["c"][i]
+            if estratos["corto"][i]:
+                tau_f = (100.0 * c_i) / (100.0 + c_i)
+                if is_steel: tau_f *= 0.8
+            else:
+                tau_f_raw = sig_v_eff_mid * Kf * f_rug * math.tan(math.radians(estratos["phi"][i]))
+                tau_f = min(tau_f_raw, 100.0 if c_i > 0 else 120.0)
+                
+            Q_tramo = tau_f * Perimetro * L_sub
+            Q_fuste += Q_tramo
+            
+            if not auditoria: continue
+            
+            sufijo = " (Seco)" if len(puntos_corte) > 2 and z_sub_bot <= zw else (" (Sat.)" if len(puntos_corte) > 2 else "")
+            auditoria_fuste.append({
+                "Estrato": estratos["Estrato"][i] + sufijo, "Cotas (m)": f"{z_sub_top:.1f} a {z_sub_bot:.1f}",
+                "Long. fuste (m)": L_sub, "σ'_v media (kPa)": sig_v_eff_mid,
+                "Resist. Unitaria τ_f (kPa)": tau_f, "Fuerza Tramo (kN)": Q_tramo
+            })
+        
+    Q_adm_geo = (Q_punta + Q_fuste) / gamma_r_val
+    Q_tope_est = Area_pilote * (sigma_tope * 1000.0)
+
+    return {
+        "D": D, "L": L, "Q_punta (kN)": Q_punta, "Q_fuste (kN)": Q_fuste, 
+        "Q_adm_geo (kN)": Q_adm_geo, "Q_tope_est (kN)": Q_tope_est, "Q_final (kN)": min(Q_adm_geo, Q_tope_est),
+        "Control": "ESTRUCTURAL" if Q_tope_est < Q_adm_geo else "GEOTÉCNICA",
+        "auditoria_punta": auditoria_punta, "auditoria_fuste": auditoria_fuste,
+        "auditoria_bulbo": detalle_bulbo_grafico, "z_sup_bulbo": z_sup_bulbo, "z_inf_bulbo": z_inf_bulbo,
+        "tipo_bulbo": tipo_bulbo
+    }
+
+
+# --- KERNEL VECTORIZADO (D x L) ---
+
+LIMITE_TENSOR = 2_000_000   # nº máximo de elementos del tensor (nD, nL, nEstratos) por bloque de diámetros
+
+
+def pesos_bulbo(D, L, estratos):
+    # Peso de cada estrato en el bulbo 6D/3D: espesor interceptado / espesor del bulbo.
+    # D (nD, 1) y L (1, nL) -> tensor (nD, nL, nEstratos). El último estrato se prolonga.
+    z_sup = np.maximum(0.0, L - 6 * D)
+    z_inf = L + 3 * D
+    z_bot = np.broadcast_to(estratos["z_bot"], z_inf.shape + estratos["z_bot"].shape).copy()
+    z_bot[..., -1] = np.maximum(z_bot[..., -1], z_inf)
+    overlap = np.minimum(z_inf[..., None], z_bot) - np.maximum(z_sup[..., None], estratos["z_top"])
+    return np.maximum(overlap, 0.0) / (z_inf - z_sup)[..., None]
+
+
+def qp_estratos_gcoc(D, L, estratos, perfil):
+    # q_p de cada estrato con la σ'v de la punta (limitada a 20D) -> (nD, nL, nEstratos)
+    fD = np.maximum(2.0/3.0, 1.0 - D / 3.0)[..., None]
+    sig_v_eff_punta = perfil.sigma_eff(np.minimum(L, 20 * D))[..., None]
+    c, phi_rad = estratos["c"], np.radians(estratos["phi"])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Nq_star = 1.5 * ((1 + np.sin(phi_rad))/(1 - np.sin(phi_rad))) * np.exp(np.pi * np.tan(phi_rad)) * fD
+        Nc_star = np.where(estratos["phi"] == 0, 9.0 * fD, (Nq_star - 1) / np.tan(phi_rad))
+    Nq_star = np.where(estratos["phi"] == 0, 1.0, Nq_star)
+    qp_largo = (sig_v_eff_punta * Nq_star) + (c * Nc_star)
+    return np.where(estratos["corto"], 9.0 * c * fD, qp_largo)
+
+
+def qp_estratos_cte(D, L, estratos, perfil, fp):
+    sig_v_eff_punta = perfil.sigma_eff(L + 0 * D)[..., None]
+    phi_rad = np.radians(estratos["phi"])
+    Nq = np.where(estratos["phi"] == 0, 1.0, ((1 + np.sin(phi_rad))/(1 - np.sin(phi_rad))) * np.exp(np.pi * np.tan(phi_rad)))
+    return np.where(estratos["corto"], 9.0 * estratos["c"], np.minimum(fp * sig_v_eff_punta * Nq, 20000.0))
+
+
+def tau_fuste_gcoc(estratos, idx, sig_v_eff):
+    c = estratos["c"][idx]
+    return np.where(estratos["corto"][idx], np.minimum(c * (100.0 / (100.0 + c)), 70.0), np.minimum(c + 0.30 * sig_v_eff, 90.0))
+
+
+def tau_fuste_cte(estratos, idx, sig_v_eff, Kf, f_rug, is_steel):
+    c = estratos["c"][idx]
+    tau_corto = (100.0 * c) / (100.0 + c) * (0.8 if is_steel else 1.0)
+    tau_largo = np.minimum(sig_v_eff * Kf * f_rug * np.tan(np.radians(estratos["phi"][idx])), np.where(c > 0, 100.0, 120.0))
+    return np.where(estratos["corto"][idx], tau_corto, tau_largo)
+
+
+def tabla_fuste(estratos, perfil, zw, tau, z_nulo=0.0):
+    # Tramos de fuste delimitados por contactos, nivel freático y fuste nulo; en cada uno τ_f
+    # se evalúa en el punto medio (igual que el cálculo por tramos). Se guarda la fuerza
+    # por unidad de perímetro acumulada hasta la cabeza de cada tramo.
+    z_max = estratos["z_bot"][-1]
+    cortes = np.concatenate(([0.0], estratos["z_bot"], [zw, z_nulo]))
+    cortes = np.unique(cortes[(cortes >= 0.0) & (cortes <= z_max)])
+    z_ini, L_sub = cortes[:-1], np.diff(cortes)
+    z_mid = z_ini + L_sub / 2.0
+    idx = np.searchsorted(estratos["z_bot"], z_mid, side="left")
+    fuerza = np.where(z_ini >= z_nulo, tau(estratos, idx, perfil.sigma_eff(z_mid)) * L_sub, 0.0)
+    return {"cortes": cortes, "idx": idx, "acumulado": np.concatenate(([0.0], np.cumsum(fuerza))),
+            "tau": tau, "z_nulo": z_nulo}
+
+
+def integrar_fuste(L, tabla, estratos, perfil):
+    # Fuerza de fuste por unidad de perímetro para cada longitud L (tramos completos + tramo parcial)
+    k = np.clip(np.searchsorted(tabla["cortes"], L, side="left") - 1, 0, tabla["idx"].size - 1)
+    z_ini = tabla["cortes"][k]
+    L_sub = L - z_ini
+    tau_parcial = tabla["tau"](estratos, tabla["idx"][k], perfil.sigma_eff(z_ini + L_sub / 2.0))
+    return tabla["acumulado"][k] + np.where(z_ini >= tabla["z_nulo"], tau_parcial * L_sub, 0.0)
+
+
+def kernel_pilotes(D_arr, L_arr, estratos, perfil, zw, metodo="GCOC", **parametros):
+    # Misma formulación que calcular_pilote / calcular_pilote_cte para todos los (D, L) a la vez.
+    # El tensor de pesos del bulbo se procesa por bloques de diámetros para acotar la memoria.
+    D_arr = np.atleast_1d(np.asarray(D_arr, dtype=float))
+    L_arr = np.atleast_1d(np.asarray(L_arr, dtype=float))
+    forma = (D_arr.size, L_arr.size)
+    n_estratos = len(estratos["Estrato"])
+    if n_estratos == 0:
+        matriz = {clave: np.full(forma, np.nan) for clave in CLAVES_MATRIZ}
+        matriz["estructural"] = np.zeros(forma, dtype=bool)
+        return matriz
+
+    valido = L_arr <= estratos["espesor"].sum()
+    L_calc = np.where(valido, L_arr, 0.0)
+
+    if metodo == "GCOC":
+        tau = tau_fuste_gcoc
+        tabla = tabla_fuste(estratos, perfil, zw, tau)
+    else:
+        Kf, f_rug, is_steel = parametros["Kf"], parametros["f_rug"], parametros["is_steel"]
+        tau = lambda est, idx, sig: tau_fuste_cte(est, idx, sig, Kf, f_rug, is_steel)
+        tabla = tabla_fuste(estratos, perfil, zw, tau, parametros["z_nulo"])
+
+    qp = np.empty(forma)
+    bloque = max(1, LIMITE_TENSOR // (L_arr.size * n_estratos))
+    for i0 in range(0, D_arr.size, bloque):
+        D = D_arr[i0:i0 + bloque, None]
+        L = L_calc[None, :]
+        if metodo == "GCOC":
+            qp_i = qp_estratos_gcoc(D, L, estratos, perfil)
+        else:
+            qp_i = qp_estratos_cte(D, L, estratos, perfil, parametros["fp"])
+        qp[i0:i0 + bloque] = np.sum(qp_i * pesos_bulbo(D, L, estratos), axis=-1)
+
+    Area_pilote = (np.pi * D_arr**2 / 4.0)[:, None]
+    Perimetro = (np.pi * D_arr)[:, None]
+    Q_punta = qp * Area_pilote
+    Q_fuste = Perimetro * integrar_fuste(L_calc, tabla, estratos, perfil)[None, :]
+
+    if metodo == "GCOC":
+        Q_adm_geo = (Q_punta + Q_fuste) / parametros["fS_val"]
+        Q_tope_est = Area_pilote * (parametros["sigma_tope_mpa"] * 1000.0)
+    else:
+        Q_adm_geo = (Q_punta + Q_fuste) / parametros["gamma_r_val"]
+        Q_tope_est = Area_pilote * (parametros["sigma_tope"] * 1000.0)
+    Q_tope_est = np.broadcast_to(Q_tope_est, forma)
+
+    nan = ~valido[None, :]
+    matriz = {
+        "Q_punta (kN)": np.where(nan, np.nan, Q_punta),
+        "Q_fuste (kN)": np.where(nan, np.nan, Q_fuste),
+        "Q_adm_geo (kN)": np.where(nan, np.nan, Q_adm_geo),
+        "Q_tope_est (kN)": np.where(nan, np.nan, Q_tope_est),
+        "Q_final (kN)": np.where(nan, np.nan, np.minimum(Q_adm_geo, Q_tope_est)),
+    }
+    matriz["estructural"] = ~nan & (Q_tope_est < Q_adm_geo)
+    return matriz
+
+
+# --- MATRIZ DE DISEÑO (D x L) ---
+
+MOTORES = {"GCOC": calcular_pilote, "CTE": calcular_pilote_cte}
+CONTROL_GEOTECNICO = {"GCOC": "GEOTÉCNICO", "CTE": "GEOTÉCNICA"}
+CLAVES_MATRIZ = ["Q_punta (kN)", "Q_fuste (kN)", "Q_adm_geo (kN)", "Q_tope_est (kN)", "Q_final (kN)"]
+
+
+def calcular_matriz_pilotes(D_arr, L_arr, df, zw, metodo="GCOC", perfil=None, con_auditoria=False, procesos=1, progreso=None, **parametros):
+    # Barrido completo de la matriz de diseño con un único perfil de tensiones y una única
+    # tabla de estratos. Las matrices tienen forma (nD, nL); las celdas con L mayor que
+    # la profundidad del sondeo quedan como NaN.
+    # parametros: los del motor elegido (GCOC: fS_val, sigma_tope_mpa;
+    #             CTE: z_nulo, gamma_r_val, sigma_tope, fp, Kf, f_rug, is_steel)
+    # Por defecto solo se devuelven capacidades numéricas; la auditoría de un pilote concreto
+    # se reconstruye bajo demanda con auditar_pilote. con_auditoria=True la genera para todas las celdas.
+    # procesos > 1 reparte la matriz en bloques de diámetros entre procesos (ver ejecutar_matriz_paralelo);
+    # progreso(fraccion, texto) es compatible con st.progress(...).progress.
+    D_arr = np.atleast_1d(np.asarray(D_arr, dtype=float))
+    L_arr = np.atleast_1d(np.asarray(L_arr, dtype=float))
+    estratos = tabla_estratos(df)
+    if perfil is None: perfil = StressProfile.desde_df(df, zw)
+
+    if procesos is not None and procesos > 1 and D_arr.size > 1:
+        matriz = ejecutar_matriz_paralelo(D_arr, L_arr, df, zw, metodo, procesos, progreso, **parametros)
+    else:
+        matriz = kernel_pilotes(D_arr, L_arr, estratos, perfil, zw, metodo, **parametros)
+        if progreso is not None: progreso(1.0, text="Matriz de pilotes calculada")
+    matriz["Q_total (kN)"] = matriz["Q_punta (kN)"] + matriz["Q_fuste (kN)"]
+    matriz.update({"D": D_arr, "L": L_arr, "metodo": metodo, "zw": zw, "parametros": parametros,
+                   "perfil": perfil, "estratos": estratos})
+
+    if con_auditoria:
+        matriz["resultados"] = []
+        for D in D_arr:
+            for L in L_arr:
+                res = auditar_pilote(matriz, D, L, df)
+                if res is not None: matriz["resultados"].append(res)
+    return matriz
+
+
+def auditar_pilote(matriz, D, L, df):
+    # Resultado completo (con auditoría de fuste y bulbo) de un pilote de la matriz,
+    # reutilizando el perfil y la tabla de estratos ya calculados
+    motor = MOTORES[matriz["metodo"]]
+    return motor(D, L, df, matriz["zw"], perfil=matriz["perfil"], estratos=matriz["estratos"], **matriz["parametros"])
+
+
+def matriz_a_dataframe(matriz):
+    # Formato largo (una fila por pilote, D exterior y L interior) que usan las tablas dinámicas de las apps
+    D_grid, L_grid = np.meshgrid(matriz["D"], matriz["L"], indexing="ij")
+    valido = ~np.isnan(matriz["Q_final (kN)"])
+    df_res = pd.DataFrame({"D": D_grid[valido], "L": L_grid[valido]})
+    if matriz["metodo"] == "GCOC":
+        df_res["fD"] = np.maximum(2.0/3.0, 1.0 - (df_res["D"] / 3.0))
+    for clave in CLAVES_MATRIZ:
+        df_res[clave] = matriz[clave][valido]
+    df_res["Control"] = np.where(matriz["estructural"][valido], "ESTRUCTURAL", CONTROL_GEOTECNICO[matriz["metodo"]])
+    return df_res
+
+
+# --- LONGITUD ÓPTIMA ---
+
+def longitud_minima(D, N, df, zw, metodo="GCOC", L_min=1.0, L_max=None, paso=1.0, tol=0.01,
+                    perfil=None, estratos=None, **parametros):
+    # Menor L (con precisión tol) tal que Q_final(D, L) >= N, con pocas evaluaciones del motor.
+    # 1) Horquilla: se avanza desde L_min con paso hasta la primera L que cumple.
+    #    La capacidad no es estrictamente monótona (la punta baja al entrar en un estrato
+    #    blando), por eso se busca la primera L que cumple y no se biseca sobre todo el sondeo.
+    # 2) Bisección dentro de la horquilla hasta que su ancho sea menor que tol.
+    # Devuelve L = None si el tope estructural es inferior a N, si no se alcanza N antes del fondo del sondeo
+    # o si L_min supera la longitud máxima (fondo del sondeo o L_max).
+    motor = MOTORES[metodo]
+    if estratos is None: estratos = tabla_estratos(df)
+    if perfil is None: perfil = StressProfile.desde_df(df, zw)
+    z_max = estratos["espesor"].sum()
+    L_max = z_max if L_max is None else min(L_max, z_max)
+    evaluaciones = 0
+
+    def q_final(L):
+        nonlocal evaluaciones
+        evaluaciones += 1
+        return motor(D, L, df, zw, perfil=perfil, estratos=estratos, auditoria=False, **parametros)
+
+    solucion = {"D": D, "N (kN)": N, "L": None, "Q_final (kN)": np.nan, "Control": None}
+    if L_min > L_max:
+        solucion.update({"Control": f"L_min > L_max ({L_max:.2f} m)", "Volumen (m3)": np.nan, "Evaluaciones": 0})
+        return solucion
+    L_ok, res_ok, L_no = None, None, None
+    L = L_min
+    while True:
+        res = q_final(L)
+        if res["Q_tope_est (kN)"] < N:
+            solucion["Control"] = "ESTRUCTURAL"
+            break
+        if res["Q_final (kN)"] >= N:
+            L_ok, res_ok = L, res
+            break
+        if L >= L_max:
+            break
+        L_no, L = L, min(L + paso, L_max)
+
+    if L_ok is not None and L_no is not None:
+        while L_ok - L_no > tol:
+            L_medio = 0.5 * (L_no + L_ok)
+            res = q_final(L_medio)
+            if res["Q_final (kN)"] >= N: L_ok, res_ok = L_medio, res
+            else: L_no = L_medio
+
+    if L_ok is not None:
+        solucion.update({"L": L_ok, "Q_final (kN)": res_ok["Q_final (kN)"], "Control": res_ok["Control"]})
+    solucion["Volumen (m3)"] = np.nan if L_ok is None else math.pi * D**2 / 4.0 * L_ok
+    solucion["Evaluaciones"] = evaluaciones
+    return solucion
+
+
+def diseno_optimo(D_arr, cargas, df, zw, metodo="GCOC", L_min=1.0, L_max=None, paso=1.0, tol=0.01, **parametros):
+    # Para cada carga de pilar y cada diámetro admisible, longitud mínima y volumen de hormigón.
+    # Devuelve (df_sol, df_resumen): una fila por (pilar, D) y, por diámetro, el volumen total
+    # de hormigón de todos los pilares (NaN si algún pilar no tiene solución con ese diámetro).
+    cargas = np.atleast_1d(np.asarray(cargas, dtype=float))
+    estratos, perfil = tabla_estratos(df), StressProfile.desde_df(df, zw)
+    filas = []
+    for i, N in enumerate(cargas):
+        for D in np.atleast_1d(np.asarray(D_arr, dtype=float)):
+            solucion = longitud_minima(D, N, df, zw, metodo, L_min, L_max, paso, tol,
+                                       perfil=perfil, estratos=estratos, **parametros)
+            filas.append({"Pilar": i + 1, **solucion})
+    df_sol = pd.DataFrame(filas)
+    df_sol["L"] = df_sol["L"].astype(float)
+
+    agrupado = df_sol.groupby("D")
+    df_resumen = pd.DataFrame({
+        "Pilares resueltos": agrupado["L"].count(),
+        "L máx (m)": agrupado["L"].max(),
+        "Volumen total (m3)": agrupado["Volumen (m3)"].sum(min_count=1),
+        "Evaluaciones": agrupado["Evaluaciones"].sum(),
+    })
+    df_resumen.loc[df_resumen["Pilares resueltos"] < cargas.size, "Volumen total (m3)"] = np.nan
+    return df_sol, df_resumen.reset_index()
+
+
+# --- CACHÉ DE RESULTADOS ---
+
+def clave_parametros(zw, metodo, parametros):
+    return repr((metodo, float(zw), sorted((k, float(v)) for k, v in parametros.items())))
+
+
+def clave_calculo(df, zw, metodo, parametros):
+    huella = hashlib.sha256()
+    huella.update(pd.util.hash_pandas_object(df[COLUMNAS_ESTRATOS].reset_index(drop=True), index=True).to_numpy().tobytes())
+    huella.update(clave_parametros(zw, metodo, parametros).encode())
+    return huella.hexdigest()
+
+
+def celdas_afectadas(df_antes, df_despues, D_arr, L_arr, z_nulo=0.0):
+    # Máscara (nD, nL) de los pilotes cuyo resultado puede cambiar al pasar de df_antes a df_despues
+    # (mismo zw y parámetros). Para cada fila editada k:
+    # - espesor, filas añadidas o eliminadas: cambian las cotas desde la cabeza de k hacia abajo,
+    #   afecta a todo pilote cuyo bulbo llegue por debajo de ella (L + 3D > z_top)
+    # - pesos específicos: cambia σ'v por debajo de z_top, afecta a los pilotes con L > z_top
+    # - condición, c o φ: afecta a los pilotes cuyo fuste útil o cuyo bulbo 6D/3D corta el estrato
+    D = np.atleast_1d(np.asarray(D_arr, dtype=float))[:, None]
+    L = np.atleast_1d(np.asarray(L_arr, dtype=float))[None, :]
+    z_sup, z_inf = np.maximum(0.0, L - 6 * D), L + 3 * D
+    afectadas = np.zeros((D.size, L.size), dtype=bool)
+
+    antes, despues = tabla_estratos(df_antes), tabla_estratos(df_despues)
+    n_antes, n_despues = len(antes["Estrato"]), len(despues["Estrato"])
+    columnas_gamma = ["Gamma Seco (kN/m3)", "Gamma Sat. (kN/m3)"]
+    gamma_antes = df_antes[columnas_gamma].to_numpy(dtype=float)
+    gamma_despues = df_despues[columnas_gamma].to_numpy(dtype=float)
+
+    for k in range(max(n_antes, n_despues)):
+        if k >= min(n_antes, n_despues) or antes["espesor"][k] != despues["espesor"][k]:
+            z_top = min(t["z_top"][k] if k < len(t["z_top"]) else t["espesor"].sum() for t in (antes, despues))
+            afectadas |= z_inf > z_top
+            break
+        z_top, z_bot = despues["z_top"][k], despues["z_bot"][k]
+        if (gamma_antes[k] != gamma_despues[k]).any():
+            afectadas |= L > z_top
+        if (antes["corto"][k] != despues["corto"][k] or antes["c"][k] != despues["c"][k]
+                or antes["phi"][k] != despues["phi"][k]):
+            fuste = np.minimum(z_bot, L) > max(z_top, z_nulo)
+            z_bot_bulbo = np.maximum(z_bot, z_inf) if k == n_despues - 1 else z_bot
+            bulbo = np.minimum(z_inf, z_bot_bulbo) > np.maximum(z_sup, z_top)
+            afectadas |= fuste | bulbo
+    return afectadas
+
+
+class CacheMatrices:
+    # Caché LRU por contenido: la clave es la huella de los datos que definen el cálculo
+    # (estratos, zw, método, FS/γ_R, tope...) y cada entrada guarda la malla (D, L) ya calculada.
+    # Si se amplían los rangos de D o L solo se calculan las filas y columnas nuevas, y si solo
+    # se ha editado algún estrato se parte de la última entrada con los mismos parámetros y se
+    # recalculan únicamente las celdas afectadas (celdas_afectadas). El tamaño se limita por nº de entradas y por nº total de celdas almacenadas.
+    # También memoriza los resultados de diseno_optimo (método diseno) con la misma huella más diámetros, cargas y L_min.
+
+    def __init__(self, max_entradas=16, max_celdas=5_000_000):
+        self.max_entradas = max_entradas
+        self.max_celdas = max_celdas
+        self.entradas = OrderedDict()
+        self.celdas_calculadas = 0   # celdas evaluadas en la última consulta (0 = acierto completo)
+        self.disenos = OrderedDict()
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def limpiar(self):
+        self.entradas.clear()
+        self.disenos.clear()
+
+    def obtener(self, D_arr, L_arr, df, zw, metodo="GCOC", **parametros):
+        # Mismo resultado que calcular_matriz_pilotes (sin auditoría)
+        D_arr = np.atleast_1d(np.asarray(D_arr, dtype=float))
+        L_arr = np.atleast_1d(np.asarray(L_arr, dtype=float))
+        D_req, L_req = np.round(D_arr, 6), np.round(L_arr, 6)
+        df = df[COLUMNAS_ESTRATOS].reset_index(drop=True)
+        clave, base = clave_calculo(df, zw, metodo, parametros), clave_parametros(zw, metodo, parametros)
+
+        entrada = self.entradas.get(clave)
+        self.celdas_calculadas = 0
+        if entrada is None:
+            previa = next((e for e in reversed(self.entradas.values()) if e["base"] == base), None)
+            if previa is not None:
+                entrada = self._editar(previa, df, zw, metodo, parametros)
+            else:
+                estratos, perfil = tabla_estratos(df), StressProfile.desde_df(df, zw)
+                D_c, L_c = np.unique(D_req), np.unique(L_req)
+                entrada = {"D": D_c, "L": L_c, "estratos": estratos, "perfil": perfil, "df": df.copy(), "base": base,
+                           "matriz": kernel_pilotes(D_c, L_c, estratos, perfil, zw, metodo, **parametros)}
+                self.celdas_calculadas = D_c.size * L_c.size
+        self.celdas_calculadas += self._ampliar(entrada, D_req, L_req, zw, metodo, parametros)
+        self.entradas[clave] = entrada
+        self.entradas.move_to_end(clave)
+        self._recortar()
+
+        i = np.searchsorted(entrada["D"], D_req)
+        j = np.searchsorted(entrada["L"], L_req)
+        matriz = {clave_m: valores[np.ix_(i, j)] for clave_m, valores in entrada["matriz"].items()}
+        matriz["Q_total (kN)"] = matriz["Q_punta (kN)"] + matriz["Q_fuste (kN)"]
+        matriz.update({"D": D_arr, "L": L_arr, "metodo": metodo, "zw": zw, "parametros": parametros,
+                       "perfil": entrada["perfil"], "estratos": entrada["estratos"]})
+        return matriz
+
+    def diseno(self, D_arr, cargas, df, zw, metodo="GCOC", L_min=1.0, **parametros):
+        # Mismo resultado que diseno_optimo; la búsqueda de raíces solo se repite si cambian los datos
+        D_arr = np.atleast_1d(np.asarray(D_arr, dtype=float))
+        cargas = np.atleast_1d(np.asarray(cargas, dtype=float))
+        df = df[COLUMNAS_ESTRATOS].reset_index(drop=True)
+        clave = (clave_calculo(df, zw, metodo, parametros), tuple(np.round(D_arr, 6)), tuple(cargas), float(L_min))
+        if clave not in self.disenos:
+            self.disenos[clave] = diseno_optimo(D_arr, cargas, df, zw, metodo, L_min=L_min, **parametros)
+            while len(self.disenos) > self.max_entradas:
+                self.disenos.popitem(last=False)
+        self.disenos.move_to_end(clave)
+        df_sol, df_resumen = self.disenos[clave]
+        return df_sol.copy(), df_resumen.copy()
+
+    def _editar(self, previa, df, zw, metodo, parametros):
+        # Nueva entrada a partir de otra con los mismos parámetros: solo se recalculan las celdas afectadas
+        estratos, perfil = tabla_estratos(df), StressProfile.desde_df(df, zw)
+        afectadas = celdas_afectadas(previa["df"], df, previa["D"], previa["L"], parametros.get("z_nulo", 0.0))
+        matriz = {clave_m: valores.copy() for clave_m, valores in previa["matriz"].items()}
+        filas, columnas = afectadas.any(axis=1), afectadas.any(axis=0)
+        if filas.any():
+            nuevas = kernel_pilotes(previa["D"][filas], previa["L"][columnas], estratos, perfil, zw, metodo, **parametros)
+            sub_mascara = afectadas[np.ix_(filas, columnas)]
+            for clave_m, valores in matriz.items():
+                bloque = valores[np.ix_(filas, columnas)]
+                bloque[sub_mascara] = nuevas[clave_m][sub_mascara]
+                valores[np.ix_(filas, columnas)] = bloque
+            self.celdas_calculadas = int(filas.sum() * columnas.sum())
+        return {"D": previa["D"], "L": previa["L"], "estratos": estratos, "perfil": perfil, "df": df.copy(),
+                "base": previa["base"], "matriz": matriz}
+
+    def _ampliar(self, entrada, D_req, L_req, zw, metodo, parametros):
+        D_nuevos = np.setdiff1d(D_req, entrada["D"])
+        L_nuevos = np.setdiff1d(L_req, entrada["L"])
+        if D_nuevos.size == 0 and L_nuevos.size == 0:
+            return 0
+
+        D_tot, L_tot = np.union1d(entrada["D"], D_nuevos), np.union1d(entrada["L"], L_nuevos)
+        i_viejo, j_viejo = np.searchsorted(D_tot, entrada["D"]), np.searchsorted(L_tot, entrada["L"])
+        i_nuevo, j_nuevo = np.searchsorted(D_tot, D_nuevos), np.searchsorted(L_tot, L_nuevos)
+        args = (entrada["estratos"], entrada["perfil"], zw, metodo)
+        filas = kernel_pilotes(D_nuevos, L_tot, *args, **parametros) if D_nuevos.size else None
+        columnas = kernel_pilotes(entrada["D"], L_nuevos, *args, **parametros) if L_nuevos.size else None
+
+        matriz = {}
+        for clave_m, valores in entrada["matriz"].items():
+            nueva = np.empty((D_tot.size, L_tot.size), dtype=valores.dtype)
+            nueva[np.ix_(i_viejo, j_viejo)] = valores
+            if filas is not None: nueva[i_nuevo, :] = filas[clave_m]
+            if columnas is not None: nueva[np.ix_(i_viejo, j_nuevo)] = columnas[clave_m]
+            matriz[clave_m] = nueva
+        n_calculadas = D_nuevos.size * L_tot.size + entrada["D"].size * L_nuevos.size
+        entrada.update({"D": D_tot, "L": L_tot, "matriz": matriz})
+        return n_calculadas
+
+    def _recortar(self):
+        def celdas():
+            return sum(e["D"].size * e["L"].size for e in self.entradas.values())
+        while len(self.entradas) > 1 and (len(self.entradas) > self.max_entradas or celdas() > self.max_celdas):
+            self.entradas.popitem(last=False)
+
+
+# --- EJECUCIÓN EN PARALELO ---
+
+_CONTEXTO_PROCESO = {}   # estratigrafía enviada una sola vez a cada proceso
+
+
+def _iniciar_proceso(df, zw, metodo, parametros):
+    _CONTEXTO_PROCESO.update(zw=zw, metodo=metodo, parametros=parametros,
+                             estratos=tabla_estratos(df), perfil=StressProfile.desde_df(df, zw))
+
+
+def _calcular_bloque(i0, D_bloque, L_arr):
+    ctx = _CONTEXTO_PROCESO
+    return i0, kernel_pilotes(D_bloque, L_arr, ctx["estratos"], ctx["perfil"], ctx["zw"], ctx["metodo"], **ctx["parametros"])
+
+
+def ejecutar_matriz_paralelo(D_arr, L_arr, df, zw, metodo="GCOC", procesos=None, progreso=None, n_bloques=None, **parametros):
+    # Reparte las filas de diámetros entre procesos. La estratigrafía viaja en el inicializador
+    # del pool (una vez por proceso); cada tarea solo lleva su bloque de diámetros y las longitudes.
+    D_arr = np.atleast_1d(np.asarray(D_arr, dtype=float))
+    L_arr = np.atleast_1d(np.asarray(L_arr, dtype=float))
+    procesos = procesos or os.cpu_count() or 1
+    n_bloques = min(D_arr.size, n_bloques or 4 * procesos)
+    limites = np.linspace(0, D_arr.size, n_bloques + 1).astype(int)
+
+    forma = (D_arr.size, L_arr.size)
+    matriz = {clave: np.full(forma, np.nan) for clave in CLAVES_MATRIZ}
+    matriz["estructural"] = np.zeros(forma, dtype=bool)
+
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso,
+                             initargs=(df, zw, metodo, parametros)) as pool:
+        trabajos = [pool.submit(_calcular_bloque, i0, D_arr[i0:i1], L_arr)
+                    for i0, i1 in zip(limites[:-1], limites[1:]) if i1 > i0]
+        for n_hechos, trabajo in enumerate(as_completed(trabajos), start=1):
+            i0, bloque = trabajo.result()
+            i1 = i0 + bloque["Q_final (kN)"].shape[0]
+            for clave in CLAVES_MATRIZ + ["estructural"]:
+                matriz[clave][i0:i1] = bloque[clave]
+            if progreso is not None:
+                progreso(n_hechos / len(trabajos), text=f"Bloques calculados: {n_hechos}/{len(trabajos)}")
+    return matriz
+
+
+def ejecutar_lote(funcion, tareas, procesos=None, progreso=None):
+    # Ejecuta funcion(*tarea) para cada tarea (p. ej. un sondeo) en un pool de procesos.
+    # Devuelve (tarea, resultado, error) en orden de finalización; un error no detiene el lote.
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        trabajos = {pool.submit(funcion, *tarea): tarea for tarea in tareas}
+        for n_hechos, trabajo in enumerate(as_completed(trabajos), start=1):
+            tarea = trabajos[trabajo]
+            try:
+                resultado, error = trabajo.result(), None
+            except Exception as e:
+                resultado, error = None, e
+            if progreso is not None:
+                progreso(n_hechos / len(trabajos), text=f"Tareas completadas: {n_hechos}/{len(trabajos)}")
+            yield tarea, resultado, error
+
+
+# --- LECTURA DE SONDEOS ---
+
+COLUMNAS_ESTRATOS = ["Estrato", "Espesor (m)", "Gamma Seco (kN/m3)", "Gamma Sat. (kN/m3)",
+                     "Condición", "c / cu (kPa)", "phi (grados)"]
+
+
+def _leer_excel_terreno(archivo):
+    # Formato Data/datos_terreno*.xlsx: Espesor, nivel freático (fila 2), p_seco, p_saturado,
+    # Cu, C, fi y opcionalmente Tipo Cálculo ('d' drenado / 'nd' no drenado)
+    hoja = pd.read_excel(archivo, sheet_name=0, header=0)
+    hoja = hoja[hoja.iloc[:, 0].notna()].reset_index(drop=True)
+    zw = hoja.iloc[0, 1] if len(hoja) and pd.notna(hoja.iloc[0, 1]) else None
+
+    cu = hoja.iloc[:, 4].fillna(0.0).astype(float)
+    c = hoja.iloc[:, 5].fillna(0.0).astype(float)
+    fi = hoja.iloc[:, 6].fillna(0.0).astype(float)
+    if hoja.shape[1] > 7:
+        no_drenado = hoja.iloc[:, 7].astype(str).str.strip().str.lower() == "nd"
+    else:
+        # Sin columna de tipo de cálculo: sin rozamiento se considera no drenado
+        no_drenado = fi == 0
+
+    df = pd.DataFrame({
+        "Estrato": [f"UG-{i + 1:02d}" for i in range(len(hoja))],
+        "Espesor (m)": hoja.iloc[:, 0].astype(float),
+        "Gamma Seco (kN/m3)": hoja.iloc[:, 2].astype(float),
+        "Gamma Sat. (kN/m3)": hoja.iloc[:, 3].astype(float),
+        "Condición": np.where(no_drenado, "Corto Plazo", "Largo Plazo"),
+        "c / cu (kPa)": np.where(no_drenado, cu, c),
+        "phi (grados)": np.where(no_drenado, 0.0, fi),
+    })
+    return df, zw
+
+
+def es_sondeo(archivo):
+    # Un archivo es un sondeo si su cabecera tiene las columnas que espera leer_sondeo:
+    # xlsx con el formato de Data/datos_terreno*.xlsx (Espesor, nivel freático, p_seco, p_saturado, Cu, C, fi)
+    # o csv / json con las columnas de la tabla de estratos de las apps
+    extension = os.path.splitext(archivo)[1].lower()
+    try:
+        if extension == ".json":
+            with open(archivo, encoding="utf-8") as f:
+                datos = json.load(f)
+            estratos = datos.get("estratos") if isinstance(datos, dict) else None
+            columnas = set(estratos[0]) if isinstance(estratos, list) and estratos and isinstance(estratos[0], dict) else set()
+            return set(COLUMNAS_ESTRATOS) <= columnas
+        if extension == ".csv":
+            return set(COLUMNAS_ESTRATOS) <= set(pd.read_csv(archivo, nrows=0).columns)
+        cabecera = [str(col).strip().lower() for col in pd.read_excel(archivo, sheet_name=0, nrows=0).columns]
+    except (OSError, ValueError, UnicodeDecodeError):
+        return False
+    prefijos = ("espesor", "nivel fre", "p_seco", "p_saturado", "cu", "c ", "fi")
+    return len(cabecera) >= len(prefijos) and all(col.startswith(pre) for col, pre in zip(cabecera, prefijos))
+
+
+def leer_sondeo(archivo, zw=None):
+    # Devuelve (df, zw) con las columnas de la tabla de estratos de las apps.
+    # csv: columnas de la app y, opcionalmente, "zw (m)" en la primera fila
+    # json: {"zw": 3.0, "estratos": [{columnas de la app}, ...]}
+    # El nivel freático del archivo tiene prioridad sobre el valor zw pasado como argumento.
+    extension = os.path.splitext(archivo)[1].lower()
+    if extension == ".json":
+        with open(archivo, encoding="utf-8") as f:
+            datos = json.load(f)
+        df = pd.DataFrame(datos["estratos"])
+        zw_archivo = datos.get("zw")
+    elif extension == ".csv":
+        df = pd.read_csv(archivo)
+        zw_archivo = df["zw (m)"].dropna().iloc[0] if "zw (m)" in df and df["zw (m)"].notna().any() else None
+    else:
+        df, zw_archivo = _leer_excel_terreno(archivo)
+
+    if zw_archivo is None: zw_archivo = zw
+    if zw_archivo is None:
+        raise ValueError(f"{archivo}: no se ha definido el nivel freático")
+
+    faltan = [col for col in COLUMNAS_ESTRATOS if col not in df.columns]
+    if faltan:
+        raise ValueError(f"{archivo}: faltan las columnas {', '.join(faltan)}")
+    df = df[COLUMNAS_ESTRATOS].reset_index(drop=True)
+    validar_estratos(df, archivo)
+    return df, float(zw_archivo)
+
+
+def validar_estratos(df, origen="tabla de estratos"):
+    # Mismas comprobaciones que bloquean el botón de cálculo en las apps
+    if len(df) == 0:
+        raise ValueError(f"{origen}: no hay estratos definidos")
+    if (df["Espesor (m)"] <= 0).any():
+        nulos = df.loc[df["Espesor (m)"] <= 0, "Estrato"].astype(str).tolist()
+        raise ValueError(f"{origen}: los estratos {', '.join(nulos)} tienen espesor ≤ 0 m")
+    columnas_geomecanicas = ["Gamma Seco (kN/m3)", "Gamma Sat. (kN/m3)", "c / cu (kPa)", "phi (grados)"]
+    if (df[columnas_geomecanicas] < 0).any().any():
+        raise ValueError(f"{origen}: hay valores negativos en las propiedades del terreno")
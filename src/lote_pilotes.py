@@ -0,0 +1,137 @@
+# cálculo por lotes de matrices de pilotes (GCOC y CTE DB-SE-C) para todos los sondeos de un directorio
+#
+# uso:
+#   python src/lote_pilotes.py Data/ --salida resultados_pilotes --D 0.6 1.5 0.3 --L 10 20 2.5
+#
+# Cada sondeo (xlsx con el formato de Data/datos_terreno*.xlsx, csv o json con las columnas de
+# la tabla de estratos de las apps) genera un único libro <sondeo>_pilotes.xlsx con la
+# estratigrafía, los resultados GCOC y CTE en formato largo y las matrices de diseño final.
+
+# llamada a las librerias
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import funcionesPilotes as fpil # motores de cálculo compartidos GCOC / CTE
+
+EXTENSIONES = (".xlsx", ".csv", ".json")
+
+
+def buscar_sondeos(directorio, directorio_salida=None):
+    # Devuelve (sondeos, omitidos). Se descartan los temporales de Excel y los libros que escribe el
+    # propio lote si el directorio de resultados es el de entrada; el resto se reconoce por su
+    # cabecera (columnas de estratigrafía), no por el nombre del archivo
+    archivos = []
+    for extension in EXTENSIONES:
+        archivos += glob.glob(os.path.join(directorio, f"*{extension}"))
+    archivos = sorted(a for a in archivos if not os.path.basename(a).startswith("~$"))
+    if directorio_salida and os.path.realpath(directorio_salida) == os.path.realpath(directorio):
+        resultados = {os.path.realpath(ruta_resultado(a, directorio_salida)) for a in archivos}
+        archivos = [a for a in archivos if os.path.realpath(a) not in resultados]
+    sondeos = [a for a in archivos if fpil.es_sondeo(a)]
+    omitidos = [a for a in archivos if a not in sondeos]
+    return sondeos, omitidos
+
+
+def ruta_resultado(archivo, directorio_salida):
+    nombre = os.path.splitext(os.path.basename(archivo))[0]
+    return os.path.join(directorio_salida, f"{nombre}_pilotes.xlsx")
+
+
+def tabla_pivote(df_res, columna):
+    pivote = df_res.pivot(index="L", columns="D", values=columna)
+    pivote.index = [f"L = {idx:.1f} m" for idx in pivote.index]
+    pivote.columns = [f"Ø {d_val:.2f} m" for d_val in pivote.columns]
+    return pivote
+
+
+def calcular_sondeo(archivo, directorio_salida, opciones):
+    # Trabajo de un proceso: lee el sondeo, calcula ambas matrices y escribe el libro de resultados
+    df, zw = fpil.leer_sondeo(archivo, opciones["zw"])
+    D_arr = np.arange(opciones["D"][0], opciones["D"][1] + 1e-5, opciones["D"][2])
+    L_arr = np.arange(opciones["L"][0], opciones["L"][1] + 1e-5, opciones["L"][2])
+    perfil = fpil.StressProfile.desde_df(df, zw)
+
+    matriz_gcoc = fpil.calcular_matriz_pilotes(D_arr, L_arr, df, zw, "GCOC", perfil=perfil,
+                                               fS_val=opciones["fs"], sigma_tope_mpa=opciones["tope_gcoc"])
+
+    # La app CTE anula la cohesión en largo plazo; se replica para obtener los mismos resultados
+    df_cte = df.copy()
+    df_cte.loc[df_cte["Condición"] == "Largo Plazo", "c / cu (kPa)"] = 0.0
+    matriz_cte = fpil.calcular_matriz_pilotes(D_arr, L_arr, df_cte, zw, "CTE", perfil=perfil,
+                                              z_nulo=opciones["z_nulo"], gamma_r_val=opciones["gamma_r"],
+                                              sigma_tope=opciones["tope_cte"], fp=opciones["fp"], Kf=opciones["kf"],
+                                              f_rug=opciones["f_rug"], is_steel=opciones["acero"])
+
+    df_gcoc = fpil.matriz_a_dataframe(matriz_gcoc)
+    df_cte_res = fpil.matriz_a_dataframe(matriz_cte)
+
+    salida = ruta_resultado(archivo, directorio_salida)
+    with pd.ExcelWriter(salida, engine="openpyxl") as libro:
+        df.assign(**{"zw (m)": [zw] + [None] * (len(df) - 1)}).to_excel(libro, sheet_name="Estratigrafía", index=False)
+        df_gcoc.to_excel(libro, sheet_name="GCOC", index=False)
+        df_cte_res.to_excel(libro, sheet_name="CTE", index=False)
+        if not df_gcoc.empty:
+            tabla_pivote(df_gcoc, "Q_final (kN)").to_excel(libro, sheet_name="GCOC Q_final")
+        if not df_cte_res.empty:
+            tabla_pivote(df_cte_res, "Q_final (kN)").to_excel(libro, sheet_name="CTE Q_final")
+    return salida, len(df_gcoc)
+
+
+def leer_argumentos(argv=None):
+    parser = argparse.ArgumentParser(description="Cálculo por lotes de matrices de pilotes GCOC y CTE DB-SE-C")
+    parser.add_argument("directorio", help="directorio con los sondeos (xlsx, csv o json)")
+    parser.add_argument("--salida", default="resultados_pilotes", help="directorio de resultados")
+    parser.add_argument("--procesos", type=int, default=None, help="nº de procesos (por defecto, todos los núcleos)")
+    parser.add_argument("--zw", type=float, default=None, help="nivel freático (m) si el archivo no lo define")
+    parser.add_argument("--D", type=float, nargs=3, default=[0.6, 1.5, 0.3], metavar=("MIN", "MAX", "PASO"), help="diámetros (m)")
+    parser.add_argument("--L", type=float, nargs=3, default=[10.0, 20.0, 2.5], metavar=("MIN", "MAX", "PASO"), help="longitudes (m)")
+    parser.add_argument("--fs", type=float, default=3.0, help="GCOC: factor de seguridad")
+    parser.add_argument("--tope-gcoc", type=float, default=4.0, help="GCOC: tope estructural (MPa)")
+    parser.add_argument("--gamma-r", type=float, default=3.0, help="CTE: coeficiente parcial de resistencia γ_R")
+    parser.add_argument("--tope-cte", type=float, default=5.0, help="CTE: tope estructural (MPa)")
+    parser.add_argument("--z-nulo", type=float, default=1.5, help="CTE: fuste nulo en cabeza (m)")
+    parser.add_argument("--fp", type=float, default=2.5, help="CTE: coeficiente fp (2.5 perforados, 3.0 hincados)")
+    parser.add_argument("--kf", type=float, default=0.75, help="CTE: coeficiente Kf (0.75 perforados, 1.0 hincados)")
+    parser.add_argument("--f-rug", type=float, default=1.0, help="CTE: factor de rugosidad f")
+    parser.add_argument("--acero", action="store_true", help="CTE: fuste metálico (τ_f × 0.8 en finos)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = leer_argumentos(argv)
+    sondeos, omitidos = buscar_sondeos(args.directorio, args.salida)
+    if omitidos:
+        print(f"-> Se omiten {len(omitidos)} archivos sin columnas de estratigrafía: {', '.join(os.path.basename(a) for a in omitidos)}")
+    if not sondeos:
+        print(f"No se han encontrado sondeos en {args.directorio}")
+        return 1
+    os.makedirs(args.salida, exist_ok=True)
+
+    opciones = {"zw": args.zw, "D": args.D, "L": args.L, "fs": args.fs, "tope_gcoc": args.tope_gcoc,
+                "gamma_r": args.gamma_r, "tope_cte": args.tope_cte, "z_nulo": args.z_nulo,
+                "fp": args.fp, "kf": args.kf, "f_rug": args.f_rug, "acero": args.acero}
+
+    print(f"-> {len(sondeos)} sondeos a calcular")
+    inicio, errores = time.perf_counter(), 0
+    tareas = [(archivo, args.salida, opciones) for archivo in sondeos]
+    for (archivo, _, _), resultado, error in fpil.ejecutar_lote(calcular_sondeo, tareas, args.procesos):
+        if error is None:
+            salida, n_pilotes = resultado
+            print(f"   OK    {os.path.basename(archivo)} -> {salida} ({n_pilotes} pilotes)")
+        else:
+            errores += 1
+            print(f"   ERROR {os.path.basename(archivo)}: {error}")
+
+    print(f"-> Lote terminado en {time.perf_counter() - inicio:.1f} s ({errores} errores)")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+# banco de pruebas de rendimiento de los motores de cálculo (pilotes, zapatas, asientos y consolidación)
+#
+# uso:
+#   python test/benchmark_motores.py --salida benchmark.json
+#   python test/benchmark_motores.py --rapido --salida nuevo.json --comparar benchmark.json
+#
+# Cada caso se ejecuta sobre estratigrafías sintéticas (3 a 50 capas, semilla fija) y mallas
+# de 5 x 5 a 200 x 400. Se guarda en JSON el tiempo (mínimo y mediana de las repeticiones),
+# la memoria pico (tracemalloc, en una ejecución aparte para no falsear el tiempo) y las
+# llamadas por segundo, junto con la versión de python / numpy y el commit, para poder
+# comparar resultados entre versiones con --comparar.
+#
+# Los motores con coste por celda (motores escalares de pilotes y asientos) se evalúan sobre
+# una muestra de como máximo --max-llamadas celdas de la malla repartidas uniformemente.
+# Si la estimación de un caso (tiempo del caso anterior escalado por tamaño) supera --limite
+# segundos, se omite y queda registrado como omitido.
+
+# llamada a las librerias
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for carpeta in ("", "Zapatas_Suelos", "zapata_Asientos", "Consolidacion"):
+    sys.path.append(os.path.join(RAIZ, carpeta))
+
+CAPAS = [3, 10, 50]
+MALLAS = [(5, 5), (20, 40), (50, 100), (200, 400)]
+CAPAS_RAPIDO = [3, 10]
+MALLAS_RAPIDO = [(5, 5), (20, 40)]
+ESPESOR_TOTAL = 40.0 # m, profundidad de los sondeos sintéticos
+
+
+# --- DATOS SINTÉTICOS ---
+
+def estratigrafia_sintetica(n_capas, semilla=0, espesor_total=ESPESOR_TOTAL):
+    # Tabla de estratos con las columnas de todas las apps (pilotes y asientos)
+    rng = np.random.default_rng(semilla + n_capas)
+    espesor = np.round(rng.dirichlet(np.ones(n_capas) * 2.0) * espesor_total, 2)
+    espesor[-1] = round(espesor_total - espesor[:-1].sum(), 2)
+    corto = rng.random(n_capas) < 0.4
+    gamma_seco = np.round(rng.uniform(16.0, 20.0, n_capas), 1)
+    gamma_sat = np.round(gamma_seco + rng.uniform(1.0, 2.5, n_capas), 1)
+    return pd.DataFrame({
+        "Estrato": [f"UG-{i + 1:02d}" for i in range(n_capas)],
+        "Descripción": [f"Capa {i + 1}" for i in range(n_capas)],
+        "Espesor (m)": espesor,
+        "Gamma Seco (kN/m3)": gamma_seco,
+        "Gamma Sat. (kN/m3)": gamma_sat,
+        "Condición": np.where(corto, "Corto Plazo", "Largo Plazo"),
+        "c / cu (kPa)": np.where(corto, np.round(rng.uniform(25.0, 200.0, n_capas)), np.round(rng.uniform(0.0, 15.0, n_capas))),
+        "phi (grados)": np.where(corto, 0.0, np.round(rng.uniform(22.0, 38.0, n_capas))),
+        "E (kPa)": np.round(rng.uniform(5000.0, 80000.0, n_capas), -2),
+        "nu": np.round(rng.uniform(0.25, 0.40, n_capas), 2),
+        "Peso Esp. (kN/m³)": gamma_seco,
+        "Peso Esp. Sat (kN/m³)": gamma_sat,
+    })
+
+
+def listas_zapata(df):
+    # Formato de Zapatas_Suelos/funcionesCalculo.datos_terreno (listas con un 0 inicial)
+    espesor = [0] + df["Espesor (m)"].tolist()
+    cotas = list(np.cumsum(espesor))
+    return (cotas, [0] + df["Peso Esp. (kN/m³)"].tolist(), [0] + df["Peso Esp. Sat (kN/m³)"].tolist(),
+            [0] + df["E (kPa)"].tolist(), [0] + df["nu"].tolist())
+
+
+def muestra_malla(n1, n2, max_llamadas):
+    # Índices (i, j) repartidos uniformemente por la malla n1 x n2
+    total = n1 * n2
+    planos = np.unique(np.linspace(0, total - 1, min(total, max_llamadas)).astype(int))
+    return np.divmod(planos, n2)
+
+
+# --- CASOS ---
+# Cada suite devuelve tuplas (caso, capas, malla, tamaño, funcion); funcion() ejecuta el caso
+# y devuelve el nº de llamadas (o celdas / pasos) realizadas.
+
+def suite_pilotes(capas, mallas, max_llamadas):
+    import funcionesPilotes as fpil
+    parametros = {"GCOC": {"fS_val": 3.0, "sigma_tope_mpa": 4.0},
+                  "CTE": {"z_nulo": 1.5, "gamma_r_val": 3.0, "sigma_tope": 5.0, "fp": 2.5, "Kf": 0.75, "f_rug": 1.0, "is_steel": False}}
+    casos = []
+    for n_capas in capas:
+        df, zw = estratigrafia_sintetica(n_capas), 3.0
+        for nD, nL in mallas:
+            D_arr = np.linspace(0.45, 2.0, nD)
+            L_arr = np.linspace(2.0, 0.9 * ESPESOR_TOTAL, nL)
+            filas, columnas = muestra_malla(nD, nL, max_llamadas)
+            for metodo, motor in (("GCOC", fpil.calcular_pilote), ("CTE", fpil.calcular_pilote_cte)):
+                def escalar(motor=motor, df=df, zw=zw, D_arr=D_arr, L_arr=L_arr, filas=filas, columnas=columnas, par=parametros[metodo]):
+                    for i, j in zip(filas, columnas):
+                        motor(D_arr[i], L_arr[j], df, zw, **par)
+                    return filas.size
+
+                def matriz(metodo=metodo, df=df, zw=zw, D_arr=D_arr, L_arr=L_arr, par=parametros[metodo]):
+                    fpil.calcular_matriz_pilotes(D_arr, L_arr, df, zw, metodo, **par)
+                    return D_arr.size * L_arr.size
+
+                nombre = motor.__name__
+                casos.append((nombre, n_capas, (nD, nL), filas.size, escalar))
+                casos.append((f"calcular_matriz_pilotes[{metodo}]", n_capas, (nD, nL), nD * nL, matriz))
+    return casos
+
+
+def suite_asientos(capas, mallas, max_llamadas):
+    import funcionesAsientos as fa
+    casos = []
+    for n_capas in capas:
+        df = estratigrafia_sintetica(n_capas)
+        for nB, nR in mallas:
+            B_arr = np.linspace(1.0, 6.0, nB)
+            LB_arr = np.linspace(1.0, 5.0, nR)
+            filas, columnas = muestra_malla(nB, nR, max_llamadas)
+            for motor in (fa.calcular_steinbrenner, fa.calcular_ec68):
+                def escalar(motor=motor, df=df, B_arr=B_arr, LB_arr=LB_arr, filas=filas, columnas=columnas):
+                    for i, j in zip(filas, columnas):
+                        B = B_arr[i]
+                        motor(100.0, B, B * LB_arr[j], df, min(2.0 * B, ESPESOR_TOTAL))
+                    return filas.size
+                casos.append((motor.__name__, n_capas, (nB, nR), filas.size, escalar))
+
+            def adaptativo(df=df, B_arr=B_arr, LB_arr=LB_arr, filas=filas, columnas=columnas):
+                for i, j in zip(filas, columnas):
+                    B = B_arr[i]
+                    fa.calcular_ec68(100.0, B, B * LB_arr[j], df, min(2.0 * B, ESPESOR_TOTAL), tol=1e-4)
+                return filas.size
+            casos.append(("calcular_ec68[tol=1e-4]", n_capas, (nB, nR), filas.size, adaptativo))
+    return casos
+
+
+def suite_zapatas(capas, mallas, max_llamadas):
+    import funcionesCalculo as ft
+    casos = []
+    for n_capas in capas:
+        cotas, pe_seco, pe_saturado, E, poisson = listas_zapata(estratigrafia_sintetica(n_capas, espesor_total=20.0))
+        for nz, nx in mallas:
+            xcoord = np.linspace(-10.0, 10.0, nx)
+            zcoord = np.linspace(0.05, 20.0, nz)
+
+            def malla(xcoord=xcoord, zcoord=zcoord, cotas=cotas, pe_seco=pe_seco, pe_saturado=pe_saturado, E=E, poisson=poisson):
+                ft.calcular_malla_zapata(xcoord, zcoord, 1.0, 150.0, cotas, pe_saturado, pe_seco, 2.0, E, poisson)
+                return xcoord.size * zcoord.size
+            casos.append(("calcular_malla_zapata", n_capas, (nz, nx), nz * nx, malla))
+
+        # Las tensiones inducidas no dependen del terreno: solo se miden una vez por malla
+        if n_capas != capas[0]: continue
+        for nz, nx in mallas:
+            xcoord = np.linspace(-10.0, 10.0, nx)
+            zcoord = np.linspace(0.05, 20.0, nz)
+            for tipo in (np.float64, np.float32):
+                def inducidas(xcoord=xcoord, zcoord=zcoord, tipo=tipo):
+                    ft.tensiones_malla_zapata(1.0, 150.0, xcoord, zcoord, tipo)
+                    return xcoord.size * zcoord.size
+                casos.append((f"tensiones_malla_zapata[{np.dtype(tipo).name}]", None, (nz, nx), nz * nx, inducidas))
+
+            # 24 casos de carga sobre 3 zapatas contiguas, por superposición de la influencia unitaria
+            cargas = np.linspace(50.0, 300.0, 72).reshape(24, 3)
+            def superposicion(xcoord=xcoord, zcoord=zcoord, cargas=cargas, cotas=cotas, E=E, poisson=poisson):
+                ft.superponer_zapatas(xcoord, zcoord, 1.0, cargas, (-3.0, 0.0, 3.0), cotas, E, poisson)
+                return cargas.size
+            casos.append(("superponer_zapatas[24x3]", n_capas, (nz, nx), nz * nx * cargas.shape[0], superposicion))
+    return casos
+
+
+def suite_consolidacion(capas, mallas, max_llamadas):
+    import funcionesConsolidacion as fcon
+    casos = []
+    longitud, c = 10.0, 0.05
+    for n_nodos, _ in mallas:
+        h = longitud / n_nodos
+        k = 0.4 * h**2 / c # α = 0.4, estable para el explícito
+        for metodo in ("Explícito", "Implícito", "Crank-Nicolson"):
+            def simulacion(h=h, k=k, metodo=metodo):
+                sim = fcon.simular_consolidacion(longitud, 100.0, c, 0.0002, h, k, 50.0, 1, metodo)
+                return sim["hist_t"].size
+            casos.append((f"simular_consolidacion[{metodo}]", None, (n_nodos, 1), n_nodos, simulacion))
+
+        def lote(h=h, k=k):
+            sim = fcon.simular_consolidacion(longitud, 100.0, c, 0.0002, h, k, 50.0, 1, "Explícito", pasos_lote=50)
+            return sim["hist_t"].size
+        casos.append(("simular_consolidacion[Explícito, lote=50]", None, (n_nodos, 1), n_nodos, lote))
+
+        def adaptativa(h=h, k=k):
+            sim = fcon.simular_consolidacion_adaptativa(longitud, 100.0, c, 0.0002, h, k, 50.0, 1)
+            return sim["pasos"]
+        casos.append(("simular_consolidacion_adaptativa", None, (n_nodos, 1), n_nodos, adaptativa))
+
+        def historial(h=h, k=k):
+            registro = fcon.HistorialIsocronas(fcon.malla_consolidacion(longitud, h)[0] + 1, por_decada=5, n_max=100)
+            sim = fcon.simular_consolidacion(longitud, 100.0, c, 0.0002, h, k, 50.0, 1, "Implícito", historial=registro)
+            return len(sim["hist_presiones_completas"])
+        casos.append(("simular_consolidacion[Implícito, historial log]", None, (n_nodos, 1), n_nodos, historial))
+    return casos
+
+
+SUITES = {"pilotes": suite_pilotes, "asientos": suite_asientos, "zapatas": suite_zapatas, "consolidacion": suite_consolidacion}
+
+
+# --- MEDIDA ---
+
+def medir(funcion, repeticiones, memoria):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        llamadas = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        funcion()
+        pico = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return {"llamadas": int(llamadas), "tiempo_s": min(tiempos), "tiempo_mediana_s": float(np.median(tiempos)),
+            "memoria_pico_mb": pico, "llamadas_por_s": llamadas / min(tiempos) if min(tiempos) > 0 else None}
+
+
+def ejecutar_suite(nombre, casos, opciones):
+    resultados = []
+    anterior = {} # (caso, capas) -> (tamaño, tiempo) del último caso medido, para estimar el siguiente
+    for caso, n_capas, malla, tamano, funcion in casos:
+        registro = {"suite": nombre, "caso": caso, "capas": n_capas, "malla": list(malla)}
+        previo = anterior.get((caso, n_capas))
+        if previo is not None and previo[1] * tamano / previo[0] * opciones["repeticiones"] > opciones["limite"]:
+            registro["omitido"] = f"estimación > {opciones['limite']:.0f} s"
+            print(f"   --    {caso:<38} capas={n_capas} malla={malla}: omitido")
+        else:
+            registro.update(medir(funcion, opciones["repeticiones"], opciones["memoria"]))
+            anterior[(caso, n_capas)] = (tamano, registro["tiempo_s"])
+            memoria = "" if registro["memoria_pico_mb"] is None else f", {registro['memoria_pico_mb']:.1f} MB"
+            print(f"   OK    {caso:<38} capas={n_capas} malla={malla}: {registro['tiempo_s']:.4f} s, "
+                  f"{registro['llamadas_por_s']:.0f} llamadas/s{memoria}")
+        resultados.append(registro)
+    return resultados
+
+
+def metadatos(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"fecha": datetime.now().isoformat(timespec="seconds"), "commit": commit,
+            "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "plataforma": platform.platform(), "procesador": platform.processor() or platform.machine(),
+            "argumentos": vars(args)}
+
+
+def clave_caso(registro):
+    return (registro["suite"], registro["caso"], registro["capas"], tuple(registro["malla"]))
+
+
+def comparar(base, nuevo):
+    # Tabla de aceleraciones (tiempo base / tiempo nuevo) de los casos medidos en ambos archivos
+    medidos = {clave_caso(r): r for r in base["resultados"] if "tiempo_s" in r}
+    print(f"-> Comparación con {base['meta'].get('commit')} ({base['meta'].get('fecha')})")
+    for registro in nuevo["resultados"]:
+        referencia = medidos.get(clave_caso(registro))
+        if referencia is None or "tiempo_s" not in registro:
+            continue
+        factor = referencia["tiempo_s"] / registro["tiempo_s"] if registro["tiempo_s"] > 0 else float("inf")
+        print(f"   {registro['caso']:<38} capas={registro['capas']} malla={tuple(registro['malla'])}: "
+              f"{referencia['tiempo_s']:.4f} s -> {registro['tiempo_s']:.4f} s (x{factor:.2f})")
+
+
+def leer_argumentos(argv=None):
+    parser = argparse.ArgumentParser(description="Banco de pruebas de rendimiento de los motores de cálculo")
+    parser.add_argument("--salida", default="benchmark.json", help="archivo JSON de resultados")
+    parser.add_argument("--suites", nargs="+", choices=list(SUITES), default=list(SUITES), help="suites a ejecutar")
+    parser.add_argument("--rapido", action="store_true", help=f"solo capas {CAPAS_RAPIDO} y mallas {MALLAS_RAPIDO}")
+    parser.add_argument("--repeticiones", type=int, default=3, help="repeticiones por caso (se guarda el mínimo y la mediana)")
+    parser.add_argument("--max-llamadas", type=int, default=500, help="celdas evaluadas por caso en los motores escalares")
+    parser.add_argument("--limite", type=float, default=120.0, help="se omiten los casos con tiempo estimado mayor (s)")
+    parser.add_argument("--sin-memoria", action="store_true", help="no mide la memoria pico (ahorra una ejecución por caso)")
+    parser.add_argument("--comparar", default=None, help="JSON de una ejecución anterior con el que comparar")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = leer_argumentos(argv)
+    capas, mallas = (CAPAS_RAPIDO, MALLAS_RAPIDO) if args.rapido else (CAPAS, MALLAS)
+    opciones = {"repeticiones": args.repeticiones, "limite": args.limite, "memoria": not args.sin_memoria}
+
+    informe = {"meta": metadatos(args), "resultados": []}
+    for nombre in args.suites:
+        print(f"-> Suite {nombre}")
+        try:
+            casos = SUITES[nombre](capas, mallas, args.max_llamadas)
+        except ImportError as error:
+            # p. ej. Zapatas_Suelos necesita matplotlib, openpyxl y python-docx
+            print(f"   ERROR {nombre}: {error}")
+            informe["resultados"].append({"suite": nombre, "omitido": f"dependencia no disponible: {error}"})
+            continue
+        informe["resultados"] += ejecutar_suite(nombre, casos, opciones)
+
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump(informe, archivo, indent=2, ensure_ascii=False)
+    print(f"-> Resultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            comparar(json.load(archivo), informe)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
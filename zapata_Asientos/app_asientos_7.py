@@ -9,208 +9,11 @@ from docx.shared import Pt, Cm, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT, WD_ALIGN_VERTICAL
 
-# ══════════════════════════════════════════════════════════════════════════
-# CONSTANTES
-# ══════════════════════════════════════════════════════════════════════════
-GAMMA_AGUA = 9.81  # kN/m³
-
-# ══════════════════════════════════════════════════════════════════════════
-# TENSIONES DE HOLL — BAJO EL CENTRO (compartido por ambos métodos)
-# ══════════════════════════════════════════════════════════════════════════
-def holl_esquina(p, B, L, z):
-    """Tensiones bajo la ESQUINA de una carga rectangular BxL (Solución de Holl)."""
-    if z <= 1e-6:
-        return p, p / 2.0, p / 2.0
-    R1 = np.sqrt(L**2 + z**2)
-    R2 = np.sqrt(B**2 + z**2)
-    R3 = np.sqrt(L**2 + B**2 + z**2)
-    arc = np.arctan((B * L) / (z * R3))
-    sz = (p / (2*np.pi)) * (arc + B*L*(1/R1**2 + 1/R2**2)*(z/R3))
-    sx = (p / (2*np.pi)) * (arc - (B*L*z)/(R1**2*R3))
-    sy = (p / (2*np.pi)) * (arc - (B*L*z)/(R2**2*R3))
-    return sz, sx, sy
-
-def holl_centro(p, B, L, z):
-    """Tensiones bajo el CENTRO: superposición ×4 de cuadrantes B/2 × L/2."""
-    sz, sx, sy = holl_esquina(p, B/2.0, L/2.0, z)
-    return 4*sz, 4*sx, 4*sy
-
-# ══════════════════════════════════════════════════════════════════════════
-# MÉTODO 1 — STEINBRENNER (φ1, φ2, s(z) analítico)
-# ══════════════════════════════════════════════════════════════════════════
-def phi1(m, n):
-    if m == 0:
-        t1 = np.log(np.sqrt(1+n**2)+n)
-        t2 = n*np.log((np.sqrt(1+n**2)+1)/n)
-    else:
-        t1 = np.log((np.sqrt(1+m**2+n**2)+n)/np.sqrt(1+m**2))
-        t2 = n*np.log((np.sqrt(1+m**2+n**2)+1)/np.sqrt(n**2+m**2))
-    return (1/np.pi)*(t1+t2)
-
-def phi2(m, n):
-    if m == 0: return 0.0
-    return (m/np.pi)*np.arctan(n/(m*np.sqrt(1+m**2+n**2)))
-
-def s_z(p, B, E, nu, z, L):
-    """Asiento teórico acumulado desde superficie hasta z (Steinbrenner)."""
-    n = L/B
-    m = z/B  # <-- CORREGIDO: m es simplemente z dividido por el ancho del área cargada
-    corchete = (1-nu**2)*phi1(m,n) - (1-nu-2*nu**2)*phi2(m,n)
-    return (p*B/E)*corchete
-
-def calcular_steinbrenner(p, B, L, df, z_max):
-    """
-    Método 1 — Steinbrenner BAJO EL CENTRO de la cimentación.
-    s_z() da el asiento bajo la ESQUINA de BxL. Para el CENTRO:
-        s_centro(z) = 4 × s_z(p, B/2, E, nu, z, L/2)
-    Igual que la superposición usada por holl_centro().
-    """
-    total = 0.0
-    resultados = []
-    z_actual = 0.0
-    n_factor = L / B   # = (L/2)/(B/2): la esbeltez del cuadrante es idéntica
-
-    for _, row in df.iterrows():
-        if z_actual >= z_max:
-            break
-        h_i   = float(row["Espesor (m)"])
-        E_i   = float(row["E (kPa)"])
-        nu_i  = float(row["nu"])
-        nombre= str(row["Descripción"])
-
-        z_techo = z_actual
-        z_base  = min(z_actual + h_i, z_max)
-
-        # m relativo al cuadrante B/2 (m_cuad = z/(B/2) = 2z/B)
-        m_t = z_techo / (B/2)  # <-- CORREGIDO
-        m_b = z_base  / (B/2)  # <-- CORREGIDO
-        
-        # Asiento CENTRO = 4 × esquina del cuadrante B/2 × L/2
-        s_t = 4 * s_z(p, B/2, E_i, nu_i, z_techo, L/2)
-        s_b = 4 * s_z(p, B/2, E_i, nu_i, z_base,  L/2)
-        ds  = s_t - s_b
-        total += ds
-
-        resultados.append({
-            "Capa":               nombre,
-            "z Techo [m]":        round(z_techo, 3),
-            "z Base [m]":         round(z_base,  3),
-            "m_techo":            round(m_t, 4),
-            "φ1_techo":           round(phi1(m_t, n_factor), 4),
-            "φ2_techo":           round(phi2(m_t, n_factor), 4),
-            "s_techo [mm]":       round(s_t*1000, 3),
-            "m_base":             round(m_b, 4),
-            "φ1_base":            round(phi1(m_b, n_factor), 4),
-            "φ2_base":            round(phi2(m_b, n_factor), 4),
-            "s_base [mm]":        round(s_b*1000, 3),
-            "Δs [mm]":            round(ds*1000, 3),
-        })
-        z_actual = z_base
+import os
+import sys
 
-    return total, pd.DataFrame(resultados)
-
-# ══════════════════════════════════════════════════════════════════════════
-# MÉTODO 2 — (integración directa de deformaciones unitarias)
-# ══════════════════════════════════════════════════════════════════════════
-def calcular_ec68(p, B, L, df, z_max, dz_sub=0.25):
-    """
-    Método 2 — Ec. 68:  s = Σ [ h/E · (Δσz - ν(Δσx+Δσy)) ]_i
-    Cada estrato se subdivide en subcapas de dz_sub metros para mejorar
-    la precisión de la integración numérica (regla del punto medio).
-    La tabla de resultados muestra valores AGREGADOS por capa original.
-    """
-    total = 0.0
-    resultados = []
-    z_actual = 0.0
-
-    for _, row in df.iterrows():
-        if z_actual >= z_max:
-            break
-        h_i    = float(row["Espesor (m)"])
-        E_i    = float(row["E (kPa)"])
-        nu_i   = float(row["nu"])
-        nombre = str(row["Descripción"])
-
-        z_techo = z_actual
-        z_base  = min(z_actual + h_i, z_max)
-        h_ef    = z_base - z_techo
-
-        # Número de subcapas (al menos 1)
-        n_sub  = max(1, int(np.ceil(h_ef / dz_sub)))
-        dz     = h_ef / n_sub
-
-        # Integración por subcapas (punto medio de cada una)
-        ds_capa  = 0.0
-        sz_medio = 0.0
-        sx_medio = 0.0
-        sy_medio = 0.0
-        ez_medio = 0.0
-
-        for k in range(n_sub):
-            z_sub_t = z_techo + k * dz
-            z_mid   = z_sub_t + dz / 2.0
-            dsz, dsx, dsy = holl_centro(p, B, L, z_mid)
-            dep_z  = (dsz - nu_i*(dsx+dsy)) / E_i
-            ds_sub = dep_z * dz
-            ds_capa  += ds_sub
-            sz_medio += dsz
-            sx_medio += dsx
-            sy_medio += dsy
-            ez_medio += dep_z
-
-        # Promedios representativos de la capa (solo para mostrar)
-        sz_medio /= n_sub
-        sx_medio /= n_sub
-        sy_medio /= n_sub
-        ez_medio /= n_sub
-
-        total += ds_capa
-
-        resultados.append({
-            "Capa":          nombre,
-            "z Techo [m]":   round(z_techo,  3),
-            "z Base [m]":    round(z_base,   3),
-            "h_ef [m]":      round(h_ef,     3),
-            "Sub-capas":      n_sub,
-            "Δσz med [kPa]": round(sz_medio, 3),
-            "Δσx med [kPa]": round(sx_medio, 3),
-            "Δσy med [kPa]": round(sy_medio, 3),
-            "Δεz med [-]":   round(ez_medio, 6),
-            "Δs [mm]":        round(ds_capa*1000, 3),
-        })
-        z_actual = z_base
-
-    return total, pd.DataFrame(resultados)
-
-# ══════════════════════════════════════════════════════════════════════════
-# TENSIÓN EFECTIVA Y ZONA DE INFLUENCIA
-# ══════════════════════════════════════════════════════════════════════════
-def sigma_v0(z, df, NF):
-    sv = 0.0; z_act = 0.0
-    for _, row in df.iterrows():
-        h  = float(row["Espesor (m)"])
-        g  = float(row["Peso Esp. (kN/m³)"])
-        gs = float(row["Peso Esp. Sat (kN/m³)"])
-        zt = z_act; zb = z_act + h
-        if z <= zt: break
-        ze = min(z, zb)
-        z_sec_b = min(ze, NF)
-        if z_sec_b > zt: sv += g*(z_sec_b-zt)
-        z_sat_t = max(zt, NF)
-        if ze > z_sat_t: sv += (gs-GAMMA_AGUA)*(ze-z_sat_t)
-        z_act = zb
-    return sv
-
-def z_influencia_ec7(p, B, L, df, NF):
-    et = float(pd.to_numeric(df["Espesor (m)"]).sum())
-    z = 0.05
-    while z <= et:
-        dsz, _, _ = holl_centro(p, B, L, z)
-        sv = sigma_v0(z, df, NF)
-        if sv > 0 and dsz <= 0.20*sv:
-            return z
-        z += 0.05
-    return et
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from funcionesAsientos import holl_centro, calcular_steinbrenner, calcular_ec68, sigma_v0, z_influencia_ec7 # motores de cálculo compartidos
 
 # ══════════════════════════════════════════════════════════════════════════
 # INFORME WORD ESTÉTICO
@@ -472,15 +275,29 @@ z_max_user = st.sidebar.number_input(
 # Precisión de ecuación elástica
 st.sidebar.markdown("---")
 st.sidebar.subheader("🔧 Precisión Ecuación Elástica")
-dz_sub = st.sidebar.select_slider(
-    "Tamaño de subcapa (dz) [m]",
-    options=[2.0, 1.0, 0.5, 0.25, 0.10, 0.05],
-    value=0.10,
-    on_change=reset_calculo,
-    help="Subdivisión de cada estrato para modelo elástico. "
-         "Menos dz = más precisión (converge a Steinbrenner)."
-)
-st.sidebar.caption(f"Subcapas estimadas: ~{int(np.ceil(espesor_total / dz_sub))} en total")
+integracion = st.sidebar.radio("Integración", ["Subcapas fijas", "Adaptativa (Gauss-Legendre)"],
+                               on_change=reset_calculo, horizontal=True)
+if integracion == "Subcapas fijas":
+    tol_ec = None
+    dz_sub = st.sidebar.select_slider(
+        "Tamaño de subcapa (dz) [m]",
+        options=[2.0, 1.0, 0.5, 0.25, 0.10, 0.05],
+        value=0.10,
+        on_change=reset_calculo,
+        help="Subdivisión de cada estrato para modelo elástico. "
+             "Menos dz = más precisión (converge a Steinbrenner)."
+    )
+    st.sidebar.caption(f"Subcapas estimadas: ~{int(np.ceil(espesor_total / dz_sub))} en total")
+else:
+    dz_sub = 0.25
+    tol_ec = st.sidebar.select_slider(
+        "Tolerancia relativa",
+        options=[1e-2, 1e-3, 1e-4, 1e-5, 1e-6],
+        value=1e-4,
+        format_func=lambda x: f"{x:.0e}",
+        on_change=reset_calculo,
+        help="Cada estrato se biseca hasta que el asiento estimado cambia menos que esta fracción."
+    )
 
 # ══════════════════════════════════════════════════════════════════════════
 # BOTÓN CALCULAR
@@ -488,13 +305,17 @@ st.sidebar.caption(f"Subcapas estimadas: ~{int(np.ceil(espesor_total / dz_sub))}
 st.sidebar.markdown("---")
 if st.sidebar.button("🚀 Calcular", type="primary", use_container_width=True):
     tot_st, df_st = calcular_steinbrenner(p, B, L, st.session_state.df_terreno, z_max_user)
-    tot_ec, df_ec = calcular_ec68(        p, B, L, st.session_state.df_terreno, z_max_user, dz_sub)
+    tot_ec, df_ec = calcular_ec68(        p, B, L, st.session_state.df_terreno, z_max_user, dz_sub, tol_ec)
+    # Los motores devuelven valores sin redondear (carga_asientos_2 los reescala); aquí se muestran redondeados
+    df_st = df_st.round({"s_techo [mm]": 3, "s_base [mm]": 3, "Δs [mm]": 3})
+    df_ec = df_ec.round({"Δσz med [kPa]": 3, "Δσx med [kPa]": 3, "Δσy med [kPa]": 3, "Δεz med [-]": 6, "Δs [mm]": 3})
 
     st.session_state.tot_st  = tot_st
     st.session_state.df_st   = df_st
     st.session_state.tot_ec  = tot_ec
     st.session_state.df_ec   = df_ec
     st.session_state.dz_used = dz_sub
+    st.session_state.tol_used = tol_ec
     st.session_state.calculo_realizado = True
 
 # ══════════════════════════════════════════════════════════════════════════
@@ -509,11 +330,8 @@ if st.session_state.calculo_realizado:
 
     # ── Figura bulbo ──────────────────────────────────────────────────────
     z_vals = np.linspace(0.05, espesor_total, 200)
-    sz_v,sx_v,sy_v,sv0_v = [],[],[],[]
-    for z in z_vals:
-        sz,sx,sy = holl_centro(p, B, L, z)
-        sz_v.append(sz); sx_v.append(sx); sy_v.append(sy)
-        sv0_v.append(sigma_v0(z, st.session_state.df_terreno, NF)*0.20)
+    sz_v,sx_v,sy_v = holl_centro(p, B, L, z_vals)
+    sv0_v = sigma_v0(z_vals, st.session_state.df_terreno, NF)*0.20
     fig_b, ax_b = plt.subplots(figsize=(5, 7))
     ax_b.plot(sz_v, z_vals, label=r"$\Delta\sigma_z$", color='red', lw=2)
     ax_b.plot(sx_v, z_vals, label=r"$\Delta\sigma_x$", color='blue', ls='--')
@@ -593,11 +411,17 @@ if modo == "🧮 Panel de Cálculo":
 
         # ── Métricas principales ──────────────────────────────────────────
         dz_used = st.session_state.get('dz_used', 0.25)
-        st.success(f"✅ Cálculo completado. **Ec. elástica** integrada con subcapas de **{dz_used} m**.")
+        tol_used = st.session_state.get('tol_used')
+        if tol_used is None:
+            txt_integracion = f"con subcapas de **{dz_used} m**"
+        else:
+            txt_integracion = (f"con Gauss-Legendre adaptativo (tol = {tol_used:.0e}): **{int(df_ec['Evaluaciones'].sum())}** "
+                               f"evaluaciones, error estimado **{df_ec['Error est. [mm]'].sum():.2e} mm**")
+        st.success(f"✅ Cálculo completado. **Ec. elástica** integrada {txt_integracion}.")
         c1, c2, c3 = st.columns(3)
         c1.metric("🔵 Steinbrenner",f"{tot_st*1000:.3f} mm")
         c2.metric("🟢 Ec. Elástica", f"{tot_ec*1000:.3f} mm",
-                  help=f"Integrada con dz = {dz_used} m")
+                  help=f"Integrada con dz = {dz_used} m" if tol_used is None else f"Integración adaptativa, tol = {tol_used:.0e}")
         dif = abs(tot_st - tot_ec)*1000
         pct = abs(tot_st - tot_ec)/max(abs(tot_st), 1e-9)*100
         c3.metric("📊 Diferencia",f"{dif:.3f} mm", f"{pct:.1f}%")
@@ -657,7 +481,11 @@ elif modo == "📋 Modelo Elástico":
     else:
         df_ec = st.session_state.df_ec
         dz_used = st.session_state.get('dz_used', 0.25)
-        st.caption(f"Integración con subcapas de **{dz_used} m** por estrato. Los valores de Δσ y Δεz son promedios de las subcapas.")
+        if st.session_state.get('tol_used') is None:
+            st.caption(f"Integración con subcapas de **{dz_used} m** por estrato. Los valores de Δσ y Δεz son promedios de las subcapas.")
+        else:
+            st.caption("Integración Gauss-Legendre adaptativa por estrato. Los valores de Δσ y Δεz son promedios integrales de cada capa.")
+            st.dataframe(df_ec[["Capa","Sub-capas","Evaluaciones","Error est. [mm]"]], use_container_width=True, hide_index=True)
         st.markdown("##### ⚡ Tensiones de Holl — promedio por capa")
         st.dataframe(df_ec[["Capa","Sub-capas","Δσz med [kPa]","Δσx med [kPa]","Δσy med [kPa]"]],
                      use_container_width=True, hide_index=True)
@@ -687,12 +515,9 @@ elif modo == "📉 Bulbo de Presiones":
         st.info("Las tensiones de Holl son **idénticas** para ambos métodos. La diferencia entre métodos está en cómo se integra el asiento.")
     with col2:
         z_vals = np.linspace(0.05, z_gr, 200)
-        sz_v,sx_v,sy_v,sv0_v,umb20_v = [],[],[],[],[]
-        for z in z_vals:
-            sz,sx,sy = holl_centro(p, B, L, z)
-            sv = sigma_v0(z, st.session_state.df_terreno, NF)
-            sz_v.append(sz); sx_v.append(sx); sy_v.append(sy)
-            sv0_v.append(sv); umb20_v.append(0.20*sv)
+        sz_v,sx_v,sy_v = holl_centro(p, B, L, z_vals)
+        sv0_v = sigma_v0(z_vals, st.session_state.df_terreno, NF)
+        umb20_v = 0.20*sv0_v
 
         fig, ax = plt.subplots(figsize=(9, 7))
         ax.plot(sz_v,   z_vals, label=r"Vertical $\Delta\sigma_z$",           color='red',         lw=2)
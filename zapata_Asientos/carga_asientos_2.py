@@ -9,181 +9,16 @@ from docx.shared import Pt, Cm, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT, WD_ALIGN_VERTICAL
 
-# ══════════════════════════════════════════════════════════════════════════
-# CONSTANTES
-# ══════════════════════════════════════════════════════════════════════════
-GAMMA_AGUA = 9.81  # kN/m³
-P_REF = 100.0      # Presión ficticia de referencia para el escalado elástico (kPa)
-
-# ══════════════════════════════════════════════════════════════════════════
-# TENSIONES DE HOLL — BAJO EL CENTRO (compartido por ambos métodos)
-# ══════════════════════════════════════════════════════════════════════════
-def holl_esquina(p, B, L, z):
-    """Tensiones bajo la ESQUINA de una carga rectangular BxL (Solución de Holl)."""
-    if z <= 1e-6:
-        return p, p / 2.0, p / 2.0
-    R1 = np.sqrt(L**2 + z**2)
-    R2 = np.sqrt(B**2 + z**2)
-    R3 = np.sqrt(L**2 + B**2 + z**2)
-    arc = np.arctan((B * L) / (z * R3))
-    sz = (p / (2*np.pi)) * (arc + B*L*(1/R1**2 + 1/R2**2)*(z/R3))
-    sx = (p / (2*np.pi)) * (arc - (B*L*z)/(R1**2*R3))
-    sy = (p / (2*np.pi)) * (arc - (B*L*z)/(R2**2*R3))
-    return sz, sx, sy
-
-def holl_centro(p, B, L, z):
-    """Tensiones bajo el CENTRO: superposición ×4 de cuadrantes B/2 × L/2."""
-    sz, sx, sy = holl_esquina(p, B/2.0, L/2.0, z)
-    return 4*sz, 4*sx, 4*sy
-
-# ══════════════════════════════════════════════════════════════════════════
-# MÉTODO 1 — STEINBRENNER (φ1, φ2, s(z) analítico)
-# ══════════════════════════════════════════════════════════════════════════
-def phi1(m, n):
-    if m == 0:
-        t1 = np.log(np.sqrt(1+n**2)+n)
-        t2 = n*np.log((np.sqrt(1+n**2)+1)/n)
-    else:
-        t1 = np.log((np.sqrt(1+m**2+n**2)+n)/np.sqrt(1+m**2))
-        t2 = n*np.log((np.sqrt(1+m**2+n**2)+1)/np.sqrt(n**2+m**2))
-    return (1/np.pi)*(t1+t2)
-
-def phi2(m, n):
-    if m == 0: return 0.0
-    return (m/np.pi)*np.arctan(n/(m*np.sqrt(1+m**2+n**2)))
-
-def s_z(p, B, E, nu, z, L):
-    """Asiento teórico acumulado desde superficie hasta z (Steinbrenner)."""
-    n = L/B
-    m = z/B  # Factor de profundidad corregido
-    corchete = (1-nu**2)*phi1(m,n) - (1-nu-2*nu**2)*phi2(m,n)
-    return (p*B/E)*corchete
-
-def calcular_steinbrenner(p, B, L, df, z_max):
-    total = 0.0
-    resultados = []
-    z_actual = 0.0
-    n_factor = L / B
-
-    for _, row in df.iterrows():
-        if z_actual >= z_max:
-            break
-        h_i   = float(row["Espesor (m)"])
-        E_i   = float(row["E (kPa)"])
-        nu_i  = float(row["nu"])
-        nombre= str(row["Descripción"])
-
-        z_techo = z_actual
-        z_base  = min(z_actual + h_i, z_max)
-
-        m_t = z_techo / (B/2)
-        m_b = z_base  / (B/2)
-        
-        s_t = 4 * s_z(p, B/2, E_i, nu_i, z_techo, L/2)
-        s_b = 4 * s_z(p, B/2, E_i, nu_i, z_base,  L/2)
-        ds  = s_t - s_b
-        total += ds
-
-        resultados.append({
-            "Capa":               nombre,
-            "z Techo [m]":        round(z_techo, 3),
-            "z Base [m]":         round(z_base,  3),
-            "m_techo":            round(m_t, 4),
-            "φ1_techo":           round(phi1(m_t, n_factor), 4),
-            "φ2_techo":           round(phi2(m_t, n_factor), 4),
-            "s_techo [mm]":       s_t*1000,
-            "m_base":             round(m_b, 4),
-            "φ1_base":            round(phi1(m_b, n_factor), 4),
-            "φ2_base":            round(phi2(m_b, n_factor), 4),
-            "s_base [mm]":        s_b*1000,
-            "Δs [mm]":            ds*1000,
-        })
-        z_actual = z_base
-
-    return total, pd.DataFrame(resultados)
-
-# ══════════════════════════════════════════════════════════════════════════
-# MÉTODO 2 — (integración directa de deformaciones unitarias)
-# ══════════════════════════════════════════════════════════════════════════
-def calcular_ec68(p, B, L, df, z_max, dz_sub=0.25):
-    total = 0.0
-    resultados = []
-    z_actual = 0.0
-
-    for _, row in df.iterrows():
-        if z_actual >= z_max:
-            break
-        h_i    = float(row["Espesor (m)"])
-        E_i    = float(row["E (kPa)"])
-        nu_i   = float(row["nu"])
-        nombre = str(row["Descripción"])
-
-        z_techo = z_actual
-        z_base  = min(z_actual + h_i, z_max)
-        h_ef    = z_base - z_techo
-
-        n_sub  = max(1, int(np.ceil(h_ef / dz_sub)))
-        dz     = h_ef / n_sub
-
-        ds_capa  = 0.0
-        sz_medio = 0.0
-        sx_medio = 0.0
-        sy_medio = 0.0
-        ez_medio = 0.0
-
-        for k in range(n_sub):
-            z_sub_t = z_techo + k * dz
-            z_mid   = z_sub_t + dz / 2.0
-            dsz, dsx, dsy = holl_centro(p, B, L, z_mid)
-            dep_z  = (dsz - nu_i*(dsx+dsy)) / E_i
-            ds_sub = dep_z * dz
-            ds_capa  += ds_sub
-            sz_medio += dsz
-            sx_medio += dsx
-            sy_medio += dsy
-            ez_medio += dep_z
-
-        sz_medio /= n_sub
-        sx_medio /= n_sub
-        sy_medio /= n_sub
-        ez_medio /= n_sub
-
-        total += ds_capa
-
-        resultados.append({
-            "Capa":          nombre,
-            "z Techo [m]":   round(z_techo,  3),
-            "z Base [m]":    round(z_base,   3),
-            "h_ef [m]":      round(h_ef,     3),
-            "Sub-capas":      n_sub,
-            "Δσz med [kPa]": sz_medio,
-            "Δσx med [kPa]": sx_medio,
-            "Δσy med [kPa]": sy_medio,
-            "Δεz med [-]":   ez_medio,
-            "Δs [mm]":       ds_capa*1000,
-        })
-        z_actual = z_base
+import os
+import sys
 
-    return total, pd.DataFrame(resultados)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from funcionesAsientos import holl_centro, calcular_steinbrenner, calcular_ec68, sigma_v0, abaco_presion_admisible, matriz_abaco # motores de cálculo compartidos
 
 # ══════════════════════════════════════════════════════════════════════════
-# TENSIÓN EFECTIVA
+# CONSTANTES
 # ══════════════════════════════════════════════════════════════════════════
-def sigma_v0(z, df, NF):
-    sv = 0.0; z_act = 0.0
-    for _, row in df.iterrows():
-        h  = float(row["Espesor (m)"])
-        g  = float(row["Peso Esp. (kN/m³)"])
-        gs = float(row["Peso Esp. Sat (kN/m³)"])
-        zt = z_act; zb = z_act + h
-        if z <= zt: break
-        ze = min(z, zb)
-        z_sec_b = min(ze, NF)
-        if z_sec_b > zt: sv += g*(z_sec_b-zt)
-        z_sat_t = max(zt, NF)
-        if ze > z_sat_t: sv += (gs-GAMMA_AGUA)*(ze-z_sat_t)
-        z_act = zb
-    return sv
+P_REF = 100.0      # Presión ficticia de referencia para el escalado elástico (kPa)
 
 # ══════════════════════════════════════════════════════════════════════════
 # INFORME WORD ESTÉTICO
@@ -346,6 +181,45 @@ def generar_word(B, L, s_adm, p_adm_st, p_adm_ec, NF, z_max, factor_bulbo, df_te
     buf.seek(0)
     return buf
 
+# ══════════════════════════════════════════════════════════════════════════
+# ÁBACOS DE DISEÑO (cacheados: solo se recalculan si cambian terreno o rejilla)
+# ══════════════════════════════════════════════════════════════════════════
+COLUMNAS_ABACO = {"Steinbrenner": "p_adm Steinbrenner [kPa]", "Ec. Elástica": "p_adm Ec. Elástica [kPa]"}
+
+@st.cache_data
+def _abaco(df_terreno, B_arr, relaciones_LB, s_adm_arr, factor_bulbo, dz_sub, tol_ec, NF):
+    return abaco_presion_admisible(df_terreno, B_arr, relaciones_LB, s_adm_arr, factor_bulbo, dz_sub, tol_ec, NF)
+
+@st.cache_data
+def _figura_abaco(df_abaco, metodo, factor_bulbo):
+    columna = COLUMNAS_ABACO[metodo]
+    estilos = ['-', '--', '-.', ':']
+    fig, ax = plt.subplots(figsize=(9, 6))
+    for i, (lb, df_lb) in enumerate(df_abaco.groupby("L/B")):
+        color = plt.cm.viridis(i / max(1, df_abaco["L/B"].nunique() - 1))
+        for j, (s, df_s) in enumerate(df_lb.groupby("s_adm [mm]")):
+            ax.plot(df_s["B [m]"], df_s[columna], color=color, ls=estilos[j % len(estilos)], lw=1.8,
+                    label=f"L/B = {lb:g} · s = {s:g} mm")
+    ax.set_xlabel("Ancho B [m]", fontsize=11)
+    ax.set_ylabel("Presión neta admisible [kPa]", fontsize=11)
+    ax.set_title(f"Ábaco de presión admisible — {metodo} (bulbo {factor_bulbo}B)")
+    ax.legend(fontsize=7, ncol=2)
+    ax.grid(True, linestyle=':', alpha=0.5)
+    ax.spines[['top','right']].set_visible(False)
+    plt.tight_layout()
+    buf = _fig_bytes(fig)
+    plt.close(fig)
+    return buf.getvalue()
+
+@st.cache_data
+def _abaco_xlsx(df_abaco):
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as libro:
+        for metodo, columna in COLUMNAS_ABACO.items():
+            matriz_abaco(df_abaco, columna).round(1).to_excel(libro, sheet_name=metodo)
+        df_abaco.to_excel(libro, sheet_name="Datos", index=False)
+    return buf.getvalue()
+
 # ══════════════════════════════════════════════════════════════════════════
 # SESSION STATE
 # ══════════════════════════════════════════════════════════════════════════
@@ -378,6 +252,7 @@ modo = st.sidebar.radio("Vista:", [
     "🧮 Panel de Resultados",
     "📋 Detalle Capas Escalas",
     "📉 Bulbo Límite",
+    "📈 Ábacos de Diseño",
     "📖 Fundamento Teórico y Algoritmo",
 ])
 
@@ -421,12 +296,25 @@ if z_max_calc > espesor_total:
 else:
     st.sidebar.success(f"💡 **Bulbo fijado en {factor_bulbo}B = {z_max_calc:.2f} m**\n\n*(Terreno disponible: {espesor_total:.2f} m)*")
 
-dz_sub = st.sidebar.select_slider(
-    "Tamaño de subcapa elástica (dz) [m]",
-    options=[2.0, 1.0, 0.5, 0.25, 0.10, 0.05],
-    value=0.10,
-    on_change=reset_calculo
-)
+integracion = st.sidebar.radio("Integración Ec. Elástica", ["Subcapas fijas", "Adaptativa (Gauss-Legendre)"],
+                               on_change=reset_calculo, horizontal=True)
+if integracion == "Subcapas fijas":
+    tol_ec = None
+    dz_sub = st.sidebar.select_slider(
+        "Tamaño de subcapa elástica (dz) [m]",
+        options=[2.0, 1.0, 0.5, 0.25, 0.10, 0.05],
+        value=0.10,
+        on_change=reset_calculo
+    )
+else:
+    dz_sub = 0.25
+    tol_ec = st.sidebar.select_slider(
+        "Tolerancia relativa",
+        options=[1e-2, 1e-3, 1e-4, 1e-5, 1e-6],
+        value=1e-4,
+        format_func=lambda x: f"{x:.0e}",
+        on_change=reset_calculo
+    )
 
 # ══════════════════════════════════════════════════════════════════════════
 # BOTÓN CALCULAR (THE DUMMY LOAD ALGORITHM)
@@ -435,7 +323,7 @@ st.sidebar.markdown("---")
 if st.sidebar.button("🚀 Calcular Presión Admisible", type="primary", use_container_width=True):
     # 1. Calculamos usando la carga de referencia
     tot_st_ref, df_st = calcular_steinbrenner(P_REF, B, L, st.session_state.df_terreno, z_max_calc)
-    tot_ec_ref, df_ec = calcular_ec68(        P_REF, B, L, st.session_state.df_terreno, z_max_calc, dz_sub)
+    tot_ec_ref, df_ec = calcular_ec68(        P_REF, B, L, st.session_state.df_terreno, z_max_calc, dz_sub, tol_ec)
 
     # 2. Factores de Escala (Linealidad)
     # Convertimos tot (metros) a milímetros para la proporción
@@ -456,6 +344,7 @@ if st.sidebar.button("🚀 Calcular Presión Admisible", type="primary", use_con
     df_ec['Δσy med [kPa]'] *= scale_ec
     df_ec['Δεz med [-]']   *= scale_ec
     df_ec['Δs [mm]']       *= scale_ec
+    if tol_ec is not None: df_ec['Error est. [mm]'] *= scale_ec
 
     st.session_state.p_adm_st = p_adm_st
     st.session_state.p_adm_ec = p_adm_ec
@@ -481,11 +370,8 @@ if st.session_state.calculo_realizado:
     p_plot = min(p_adm_st, p_adm_ec)
 
     z_vals = np.linspace(0.05, z_max * 1.5, 200) 
-    sz_v,sx_v,sy_v,sv0_v = [],[],[],[]
-    for z in z_vals:
-        sz,sx,sy = holl_centro(p_plot, B, L, z)
-        sz_v.append(sz); sx_v.append(sx); sy_v.append(sy)
-        sv0_v.append(sigma_v0(z, st.session_state.df_terreno, NF)*0.20)
+    sz_v,sx_v,sy_v = holl_centro(p_plot, B, L, z_vals)
+    sv0_v = sigma_v0(z_vals, st.session_state.df_terreno, NF)*0.20
         
     fig_b, ax_b = plt.subplots(figsize=(5, 7))
     ax_b.plot(sz_v, z_vals, label=r"$\Delta\sigma_z$", color='red', lw=2)
@@ -605,12 +491,8 @@ elif modo == "📉 Bulbo Límite":
             st.info(f"Profundidad de integración estática:\n **{factor_b}B = {z_max:.2f} m**")
         with col2:
             z_vals = np.linspace(0.05, z_gr, 200)
-            sz_v,sx_v,sy_v,sv0_v = [],[],[],[]
-            for z in z_vals:
-                sz,sx,sy = holl_centro(p_plot, B, L, z)
-                sv = sigma_v0(z, st.session_state.df_terreno, NF)
-                sz_v.append(sz); sx_v.append(sx); sy_v.append(sy)
-                sv0_v.append(sv * 0.2)
+            sz_v,sx_v,sy_v = holl_centro(p_plot, B, L, z_vals)
+            sv0_v = sigma_v0(z_vals, st.session_state.df_terreno, NF) * 0.2
 
             fig, ax = plt.subplots(figsize=(9, 7))
             ax.plot(sz_v,   z_vals, label=r"Vertical $\Delta\sigma_z$",           color='red',         lw=2)
@@ -631,6 +513,46 @@ elif modo == "📉 Bulbo Límite":
             ax.spines[['top','right']].set_visible(False)
             st.pyplot(fig); plt.close(fig)
 
+elif modo == "📈 Ábacos de Diseño":
+    st.header("Ábacos de Presión Admisible (B, L/B, s_adm)")
+    txt_integracion = f"subcapa **dz = {dz_sub} m**" if tol_ec is None else f"integración adaptativa **tol = {tol_ec:.0e}**"
+    st.markdown(f"Estratigrafía actual, bulbo **{factor_bulbo}B** y {txt_integracion} (panel izquierdo). "
+                "Cada geometría se resuelve una vez; los asientos admisibles salen por escalado lineal.")
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        B_min, B_max = st.slider("Rango de B [m]:", 0.5, 10.0, (1.0, 4.0), 0.25)
+        paso_B = st.number_input("Paso de B [m]", min_value=0.05, value=0.25, step=0.05)
+    with c2:
+        relaciones_LB = st.multiselect("Relaciones L/B:", [1.0, 1.5, 2.0, 3.0, 5.0, 10.0], default=[1.0, 2.0, 5.0])
+    with c3:
+        txt_s = st.text_input("Asientos admisibles [mm] (separados por comas):", "15, 25, 50")
+        metodo_abaco = st.radio("Método:", list(COLUMNAS_ABACO.keys()), horizontal=True)
+
+    try:
+        s_adm_lista = tuple(float(v) for v in txt_s.replace(";", ",").split(",") if v.strip())
+    except ValueError:
+        s_adm_lista = ()
+        st.error("⚠️ Revisa la lista de asientos admisibles.")
+
+    B_lista = tuple(np.round(np.arange(B_min, B_max + paso_B/2, paso_B), 4))
+    if s_adm_lista and relaciones_LB and B_lista:
+        df_abaco = _abaco(st.session_state.df_terreno, B_lista, tuple(sorted(relaciones_LB)), s_adm_lista, factor_bulbo, dz_sub, tol_ec, NF)
+        if df_abaco["Bulbo truncado"].any():
+            st.warning(f"⚠️ Para B ≥ {df_abaco.loc[df_abaco['Bulbo truncado'], 'B [m]'].min():.2f} m el bulbo supera los estratos definidos: presiones SOBREESTIMADAS.")
+        profundas = df_abaco["z_i EC7 [m]"] > df_abaco["z_max [m]"] + 1e-6
+        if profundas.any():
+            st.info(f"ℹ️ En {int(profundas.sum())} de {len(df_abaco)} celdas la profundidad de influencia EC7 (Δσz = 0.20σ'v0) "
+                    f"supera el bulbo de integración {factor_bulbo}B (columna 'z_i EC7 [m]' del Excel).")
+        st.image(_figura_abaco(df_abaco, metodo_abaco, factor_bulbo), use_container_width=True)
+        st.dataframe(matriz_abaco(df_abaco, COLUMNAS_ABACO[metodo_abaco]).round(1), use_container_width=True)
+        st.download_button("📥 Descargar matriz del ábaco (Excel)", data=_abaco_xlsx(df_abaco),
+                           file_name=f"abaco_presion_admisible_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+                           mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        st.download_button("🖼️ Descargar ábaco (PNG)", data=_figura_abaco(df_abaco, metodo_abaco, factor_bulbo),
+                           file_name=f"abaco_{metodo_abaco.replace(' ', '_').replace('.', '')}.png", mime="image/png")
+    else:
+        st.info("Selecciona al menos un valor de B, L/B y asiento admisible.")
+
 elif modo == "📖 Fundamento Teórico y Algoritmo":
     st.header("Fundamento Teórico y Algoritmo de Diseño")
 
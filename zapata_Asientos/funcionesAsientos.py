@@ -0,0 +1,448 @@
+# =============================================================================
+# LIBRERÍA: funcionesAsientos.py
+# Propósito: Motores de cálculo de asientos de zapatas rectangulares compartidos por
+#            app_asientos_7.py (asiento para una carga) y carga_asientos_2.py (carga admisible)
+# =============================================================================
+
+# Listado de funciones (actualizar según se añaden funciones)
+
+    # holl_esquina / holl_centro, tensiones inducidas bajo la esquina / el centro de un rectángulo BxL (Holl), vectorizadas en z, B y L
+    # phi1 / phi2 / s_z, factores de influencia y asiento de Steinbrenner bajo la esquina
+    # calcular_steinbrenner, asiento bajo el centro por capas (método 1)
+    # calcular_ec68, asiento por integración de deformaciones unitarias con subcapas (método 2)
+    # integrar_ec68_adaptativo, integración Gauss-Legendre adaptativa por capa con estimación de error
+    # sigma_v0, tensión vertical efectiva geostática a la profundidad z (escalar o array)
+    # tabla_sigma_v0, nodos (z, σ'v0) de la ley lineal a trozos para interpolar sin recorrer los estratos
+    # z_influencia_ec7, profundidad a la que Δσz baja al 20 % de σ'v0 (Brent)
+    # z_influencia_ec7_malla, z_influencia_ec7 para arrays de (p, B, L)
+    # tabla_estratos, techo/base y parámetros de cada estrato como arrays (lectura única del DataFrame)
+    # asiento_unitario_steinbrenner / asiento_unitario_ec68, asiento por kPa bajo el centro para arrays de (B, L)
+    # abaco_presion_admisible, presión admisible sobre la rejilla (B, L/B, s_adm) resolviendo cada geometría una vez
+    # matriz_abaco, tabla B × (L/B, s_adm) de un método para exportar
+
+import numpy as np
+import pandas as pd
+
+# ══════════════════════════════════════════════════════════════════════════
+# CONSTANTES
+# ══════════════════════════════════════════════════════════════════════════
+GAMMA_AGUA = 9.81  # kN/m³
+
+# ══════════════════════════════════════════════════════════════════════════
+# TENSIONES DE HOLL — BAJO EL CENTRO (compartido por ambos métodos)
+# ══════════════════════════════════════════════════════════════════════════
+def holl_esquina(p, B, L, z):
+    """Tensiones bajo la ESQUINA de una carga rectangular BxL (Solución de Holl).
+    Admite arrays de z, B y L (se combinan por broadcasting); en superficie (z ≈ 0) devuelve p, p/2, p/2."""
+    z = np.asarray(z, dtype=float)
+    superficie = z <= 1e-6
+    z = np.where(superficie, 1.0, z) # valor auxiliar para no dividir entre 0; se sustituye abajo
+    R1 = np.sqrt(L**2 + z**2)
+    R2 = np.sqrt(B**2 + z**2)
+    R3 = np.sqrt(L**2 + B**2 + z**2)
+    arc = np.arctan((B * L) / (z * R3))
+    sz = (p / (2*np.pi)) * (arc + B*L*(1/R1**2 + 1/R2**2)*(z/R3))
+    sx = (p / (2*np.pi)) * (arc - (B*L*z)/(R1**2*R3))
+    sy = (p / (2*np.pi)) * (arc - (B*L*z)/(R2**2*R3))
+    sz = np.where(superficie, p, sz)
+    sx = np.where(superficie, p / 2.0, sx)
+    sy = np.where(superficie, p / 2.0, sy)
+    return sz[()], sx[()], sy[()]
+
+def holl_centro(p, B, L, z):
+    """Tensiones bajo el CENTRO: superposición ×4 de cuadrantes B/2 × L/2."""
+    sz, sx, sy = holl_esquina(p, np.divide(B, 2.0), np.divide(L, 2.0), z)
+    return 4*sz, 4*sx, 4*sy
+
+# ══════════════════════════════════════════════════════════════════════════
+# MÉTODO 1 — STEINBRENNER (φ1, φ2, s(z) analítico)
+# ══════════════════════════════════════════════════════════════════════════
+def phi1(m, n):
+    # La expresión general con m = 0 coincide con la particular (√(1+n²)+n y √(n²) = n), sin singularidad
+    m = np.asarray(m, dtype=float)
+    t1 = np.log((np.sqrt(1+m**2+n**2)+n)/np.sqrt(1+m**2))
+    t2 = n*np.log((np.sqrt(1+m**2+n**2)+1)/np.sqrt(n**2+m**2))
+    return ((1/np.pi)*(t1+t2))[()]
+
+def phi2(m, n):
+    m = np.asarray(m, dtype=float)
+    nulo = m == 0
+    m_aux = np.where(nulo, 1.0, m)
+    valor = (m_aux/np.pi)*np.arctan(n/(m_aux*np.sqrt(1+m_aux**2+n**2)))
+    return np.where(nulo, 0.0, valor)[()]
+
+def s_z(p, B, E, nu, z, L):
+    """Asiento teórico acumulado desde superficie hasta z (Steinbrenner). Admite arrays de z, B y L."""
+    n = np.divide(L, B)
+    m = np.divide(z, B)  # <-- CORREGIDO: m es simplemente z dividido por el ancho del área cargada
+    corchete = (1-nu**2)*phi1(m,n) - (1-nu-2*nu**2)*phi2(m,n)
+    return (p*B/E)*corchete
+
+def calcular_steinbrenner(p, B, L, df, z_max):
+    """
+    Método 1 — Steinbrenner BAJO EL CENTRO de la cimentación.
+    s_z() da el asiento bajo la ESQUINA de BxL. Para el CENTRO:
+        s_centro(z) = 4 × s_z(p, B/2, E, nu, z, L/2)
+    Igual que la superposición usada por holl_centro().
+    """
+    total = 0.0
+    resultados = []
+    z_actual = 0.0
+    n_factor = L / B   # = (L/2)/(B/2): la esbeltez del cuadrante es idéntica
+
+    for _, row in df.iterrows():
+        if z_actual >= z_max:
+            break
+        h_i   = float(row["Espesor (m)"])
+        E_i   = float(row["E (kPa)"])
+        nu_i  = float(row["nu"])
+        nombre= str(row["Descripción"])
+
+        z_techo = z_actual
+        z_base  = min(z_actual + h_i, z_max)
+
+        # m relativo al cuadrante B/2 (m_cuad = z/(B/2) = 2z/B)
+        m_t = z_techo / (B/2)  # <-- CORREGIDO
+        m_b = z_base  / (B/2)  # <-- CORREGIDO
+        
+        # Asiento CENTRO = 4 × esquina del cuadrante B/2 × L/2
+        s_t = 4 * s_z(p, B/2, E_i, nu_i, z_techo, L/2)
+        s_b = 4 * s_z(p, B/2, E_i, nu_i, z_base,  L/2)
+        ds  = s_t - s_b
+        total += ds
+
+        resultados.append({
+            "Capa":               nombre,
+            "z Techo [m]":        round(z_techo, 3),
+            "z Base [m]":         round(z_base,  3),
+            "m_techo":            round(m_t, 4),
+            "φ1_techo":           round(phi1(m_t, n_factor), 4),
+            "φ2_techo":           round(phi2(m_t, n_factor), 4),
+            "s_techo [mm]":       s_t*1000,
+            "m_base":             round(m_b, 4),
+            "φ1_base":            round(phi1(m_b, n_factor), 4),
+            "φ2_base":            round(phi2(m_b, n_factor), 4),
+            "s_base [mm]":        s_b*1000,
+            "Δs [mm]":            ds*1000,
+        })
+        z_actual = z_base
+
+    return total, pd.DataFrame(resultados)
+
+# ══════════════════════════════════════════════════════════════════════════
+# MÉTODO 2 — (integración directa de deformaciones unitarias)
+# ══════════════════════════════════════════════════════════════════════════
+def calcular_ec68(p, B, L, df, z_max, dz_sub=0.25, tol=None):
+    """
+    Método 2 — Ec. 68:  s = Σ [ h/E · (Δσz - ν(Δσx+Δσy)) ]_i
+    Cada estrato se subdivide en subcapas de dz_sub metros para mejorar
+    la precisión de la integración numérica (regla del punto medio).
+    Con tol (relativa, p. ej. 1e-4) se integra cada estrato con Gauss-Legendre
+    adaptativo (integrar_ec68_adaptativo) y dz_sub no se usa; la tabla añade
+    las evaluaciones de Holl y el error estimado de cada capa.
+    La tabla de resultados muestra valores AGREGADOS por capa original.
+    """
+    capas = []
+    z_actual = 0.0
+
+    for _, row in df.iterrows():
+        if z_actual >= z_max:
+            break
+        h_i    = float(row["Espesor (m)"])
+        z_techo = z_actual
+        z_base  = min(z_actual + h_i, z_max)
+        h_ef    = z_base - z_techo
+
+        # Número de subcapas (al menos 1)
+        n_sub  = max(1, int(np.ceil(h_ef / dz_sub)))
+        capas.append((str(row["Descripción"]), float(row["E (kPa)"]), float(row["nu"]), z_techo, z_base, h_ef, n_sub, h_ef / n_sub))
+        z_actual = z_base
+
+    if not capas:
+        return 0.0, pd.DataFrame([])
+
+    if tol is not None:
+        E_c, nu_c, z_t, z_b, h_c = (np.array([c[k] for c in capas]) for k in (1, 2, 3, 4, 5))
+        integral, error, evaluaciones, n_subs = integrar_ec68_adaptativo(p, B, L, z_t, z_b, E_c, nu_c, tol)
+        # Promedios representativos de la capa: integral / espesor (solo para mostrar)
+        h_div = np.where(h_c > 0, h_c, 1.0)
+        ds_capa = integral[3]
+        sz_medio, sx_medio, sy_medio, ez_medio = integral / h_div
+    else:
+        # Puntos medios de todas las subcapas y una sola evaluación de Holl
+        n_subs = np.array([c[6] for c in capas])
+        dz     = np.repeat([c[7] for c in capas], n_subs)
+        E_sub  = np.repeat([c[1] for c in capas], n_subs)
+        nu_sub = np.repeat([c[2] for c in capas], n_subs)
+        inicio = np.cumsum(n_subs) - n_subs
+        k_sub  = np.arange(n_subs.sum()) - np.repeat(inicio, n_subs)
+        z_mid  = np.repeat([c[3] for c in capas], n_subs) + (k_sub + 0.5) * dz
+
+        dsz, dsx, dsy = holl_centro(p, B, L, z_mid)
+        dep_z = (dsz - nu_sub*(dsx+dsy)) / E_sub
+
+        # Suma por capa original (regla del punto medio) y promedios representativos (solo para mostrar)
+        ds_capa  = np.add.reduceat(dep_z * dz, inicio)
+        sz_medio = np.add.reduceat(dsz, inicio) / n_subs
+        sx_medio = np.add.reduceat(dsx, inicio) / n_subs
+        sy_medio = np.add.reduceat(dsy, inicio) / n_subs
+        ez_medio = np.add.reduceat(dep_z, inicio) / n_subs
+
+    resultados = []
+    for i, (nombre, _, _, z_techo, z_base, h_ef, _, _) in enumerate(capas):
+        fila = {
+            "Capa":          nombre,
+            "z Techo [m]":   round(z_techo,  3),
+            "z Base [m]":    round(z_base,   3),
+            "h_ef [m]":      round(h_ef,     3),
+            "Sub-capas":      int(n_subs[i]),
+            "Δσz med [kPa]": sz_medio[i],
+            "Δσx med [kPa]": sx_medio[i],
+            "Δσy med [kPa]": sy_medio[i],
+            "Δεz med [-]":   ez_medio[i],
+            "Δs [mm]":        ds_capa[i]*1000,
+        }
+        if tol is not None:
+            fila["Evaluaciones"]    = int(evaluaciones[i])
+            fila["Error est. [mm]"] = error[i]*1000
+        resultados.append(fila)
+
+    return float(ds_capa.sum()), pd.DataFrame(resultados)
+
+# ══════════════════════════════════════════════════════════════════════════
+# MÉTODO 2 — INTEGRACIÓN ADAPTATIVA (Gauss-Legendre con bisección)
+# ══════════════════════════════════════════════════════════════════════════
+GL_X, GL_W = np.polynomial.legendre.leggauss(5) # nodos y pesos en [-1, 1]
+
+def _gauss_ec68(p, B, L, a, b, E, nu):
+    # Integrales de (Δσz, Δσx, Δσy, Δεz) en [a, b] para cada intervalo; una llamada a Holl para todos
+    c = (a + b) / 2.0
+    r = (b - a) / 2.0
+    z = c[:, None] + r[:, None] * GL_X
+    dsz, dsx, dsy = holl_centro(p, B[:, None], L[:, None], z)
+    dep_z = (dsz - nu[:, None]*(dsx+dsy)) / E[:, None]
+    return (np.stack([dsz, dsx, dsy, dep_z]) @ GL_W) * r
+
+def integrar_ec68_adaptativo(p, B, L, a, b, E, nu, tol=1e-4, max_niveles=30):
+    """
+    Integra Δσz, Δσx, Δσy y Δεz entre a y b para cada intervalo (capa o capa × geometría).
+    Cada intervalo se compara con sus dos mitades (Gauss-Legendre de 5 puntos) y se biseca
+    mientras |mitades - entero| > tol·|mitades| en el asiento. Todos los intervalos pendientes
+    se evalúan juntos en cada pasada.
+    Devuelve (integral (4, n), error estimado del asiento (n), evaluaciones de Holl (n), subintervalos (n)).
+    """
+    a, b, E, nu, B, L = (np.array(v, dtype=float).ravel() for v in np.broadcast_arrays(a, b, E, nu, B, L))
+    n = a.size
+    integral = np.zeros((4, n))
+    error = np.zeros(n)
+    evaluaciones = np.full(n, GL_X.size)
+    intervalos = np.zeros(n, dtype=int)
+
+    dueno = np.arange(n)
+    entero = _gauss_ec68(p, B, L, a, b, E, nu)
+    for nivel in range(max_niveles + 1):
+        if dueno.size == 0:
+            break
+        m = (a + b) / 2.0
+        izq = _gauss_ec68(p, B[dueno], L[dueno], a, m, E[dueno], nu[dueno])
+        der = _gauss_ec68(p, B[dueno], L[dueno], m, b, E[dueno], nu[dueno])
+        np.add.at(evaluaciones, dueno, 2 * GL_X.size)
+        mitades = izq + der
+        err = np.abs(mitades[3] - entero[3])
+        ok = (err <= tol * np.abs(mitades[3]) + 1e-15) | (nivel == max_niveles)
+
+        np.add.at(integral.T, dueno[ok], mitades[:, ok].T)
+        np.add.at(error, dueno[ok], err[ok])
+        np.add.at(intervalos, dueno[ok], 2)
+
+        # Los intervalos no aceptados se sustituyen por sus dos mitades
+        sig = ~ok
+        dueno = np.repeat(dueno[sig], 2)
+        a = np.column_stack([a[sig], m[sig]]).ravel()
+        b = np.column_stack([m[sig], b[sig]]).ravel()
+        entero = np.stack([izq[:, sig], der[:, sig]], axis=-1).reshape(4, -1)
+
+    return integral, error, evaluaciones, intervalos
+
+# ══════════════════════════════════════════════════════════════════════════
+# TENSIÓN EFECTIVA Y ZONA DE INFLUENCIA
+# ══════════════════════════════════════════════════════════════════════════
+def sigma_v0(z, df, NF):
+    # Admite un array de profundidades: se recorren los estratos una sola vez
+    z = np.asarray(z, dtype=float)
+    sv = np.zeros_like(z); z_act = 0.0
+    for _, row in df.iterrows():
+        h  = float(row["Espesor (m)"])
+        g  = float(row["Peso Esp. (kN/m³)"])
+        gs = float(row["Peso Esp. Sat (kN/m³)"])
+        zt = z_act; zb = z_act + h
+        ze = np.clip(z, zt, zb)
+        z_sec_b = np.minimum(ze, NF)
+        sv += g*np.maximum(z_sec_b-zt, 0.0)
+        z_sat_t = max(zt, NF)
+        sv += (gs-GAMMA_AGUA)*np.maximum(ze-z_sat_t, 0.0)
+        z_act = zb
+    return sv[()]
+
+def tabla_sigma_v0(df, NF):
+    # σ'v0 es lineal a trozos con quiebros en los contactos y en el NF: basta tabularla en esos nodos
+    # y consultarla con np.interp (fuera del terreno se mantiene el valor de la base, como sigma_v0)
+    estratos = tabla_estratos(df)
+    z_nodos = np.unique(np.concatenate(([0.0], estratos["base"], [NF] if 0.0 < NF < estratos["base"][-1] else [])))
+    return z_nodos, sigma_v0(z_nodos, df, NF)
+
+def _brent(f, a, b, fa, fb, xtol=1e-6, max_iter=100):
+    # Método de Brent (bisección + secante + interpolación cuadrática inversa); requiere fa·fb < 0
+    c, fc = a, fa
+    d = e = b - a
+    for _ in range(max_iter):
+        if fb * fc > 0:
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+        tol1 = 2 * np.finfo(float).eps * abs(b) + 0.5 * xtol
+        xm = 0.5 * (c - b)
+        if abs(xm) <= tol1 or fb == 0:
+            return b
+        if abs(e) >= tol1 and abs(fa) > abs(fb):
+            s_ = fb / fa
+            if a == c:
+                p_ = 2 * xm * s_; q_ = 1 - s_
+            else:
+                q_ = fa / fc; r_ = fb / fc
+                p_ = s_ * (2 * xm * q_ * (q_ - r_) - (b - a) * (r_ - 1))
+                q_ = (q_ - 1) * (r_ - 1) * (s_ - 1)
+            if p_ > 0: q_ = -q_
+            p_ = abs(p_)
+            if 2 * p_ < min(3 * xm * q_ - abs(tol1 * q_), abs(e * q_)):
+                e = d; d = p_ / q_
+            else:
+                d = xm; e = d
+        else:
+            d = xm; e = d
+        a, fa = b, fb
+        b += d if abs(d) > tol1 else (tol1 if xm > 0 else -tol1)
+        fb = f(b)
+    return b
+
+def z_influencia_ec7(p, B, L, df, NF, tabla=None, xtol=1e-4):
+    # Raíz de Δσz(z) - 0.20·σ'v0(z) en [0.05, espesor total] (Brent sobre la tabla de σ'v0).
+    # Δσz decrece y σ'v0 crece con z, luego hay a lo sumo un cambio de signo.
+    z_nodos, sv_nodos = tabla_sigma_v0(df, NF) if tabla is None else tabla
+    et = float(z_nodos[-1])
+    f = lambda z: holl_centro(p, B, L, z)[0] - 0.20 * np.interp(z, z_nodos, sv_nodos)
+    z0 = 0.05
+    if z0 >= et: return et
+    f0, f1 = f(z0), f(et)
+    if f0 <= 0 and np.interp(z0, z_nodos, sv_nodos) > 0: return z0
+    if f1 > 0: return et
+    return float(_brent(f, z0, et, f0, f1, xtol))
+
+def z_influencia_ec7_malla(p, B, L, df, NF, tabla=None, xtol=1e-4):
+    """Versión vectorizada de z_influencia_ec7 para arrays de p, B y L (bisección simultánea)."""
+    z_nodos, sv_nodos = tabla_sigma_v0(df, NF) if tabla is None else tabla
+    et = float(z_nodos[-1])
+    p, B, L = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (p, B, L)))
+    f = lambda z: holl_centro(p, B, L, z)[0] - 0.20 * np.interp(z, z_nodos, sv_nodos)
+    z0 = min(0.05, et)
+    a = np.full(p.shape, z0); b = np.full(p.shape, et)
+    en_superficie = (f(a) <= 0) & (np.interp(z0, z_nodos, sv_nodos) > 0)
+    sin_raiz = f(b) > 0
+    for _ in range(max(1, int(np.ceil(np.log2(max(et - z0, xtol) / xtol))))):
+        m = 0.5 * (a + b)
+        positivo = f(m) > 0
+        a = np.where(positivo, m, a)
+        b = np.where(positivo, b, m)
+    z_i = np.where(en_superficie, z0, np.where(sin_raiz, et, 0.5 * (a + b)))
+    return z_i[()]
+
+# ══════════════════════════════════════════════════════════════════════════
+# ÁBACOS DE DISEÑO — PRESIÓN ADMISIBLE (B, L/B, s_adm)
+# ══════════════════════════════════════════════════════════════════════════
+def tabla_estratos(df):
+    h = pd.to_numeric(df["Espesor (m)"]).to_numpy(dtype=float)
+    base = np.cumsum(h)
+    return {
+        "techo":     base - h,
+        "base":      base,
+        "E":         pd.to_numeric(df["E (kPa)"]).to_numpy(dtype=float),
+        "nu":        pd.to_numeric(df["nu"]).to_numpy(dtype=float),
+        "gamma":     pd.to_numeric(df["Peso Esp. (kN/m³)"]).to_numpy(dtype=float),
+        "gamma_sat": pd.to_numeric(df["Peso Esp. Sat (kN/m³)"]).to_numpy(dtype=float),
+    }
+
+def asiento_unitario_steinbrenner(B, L, estratos, z_max):
+    """Asiento bajo el centro [m] para p = 1 kPa (mismo cálculo que calcular_steinbrenner). B, L y z_max: arrays."""
+    B, L, z_max = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (B, L, z_max)))
+    total = np.zeros(B.shape)
+    for techo, base, E_i, nu_i in zip(estratos["techo"], estratos["base"], estratos["E"], estratos["nu"]):
+        z_techo = np.minimum(techo, z_max)
+        z_base  = np.minimum(base, z_max)
+        total += 4 * (s_z(1.0, B/2, E_i, nu_i, z_techo, L/2) - s_z(1.0, B/2, E_i, nu_i, z_base, L/2))
+    return total
+
+def asiento_unitario_ec68(B, L, estratos, z_max, dz_sub=0.25, tol=None):
+    """Asiento bajo el centro [m] para p = 1 kPa (mismo cálculo que calcular_ec68). B, L y z_max: arrays."""
+    B, L, z_max = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (B, L, z_max)))
+    forma = B.shape
+    B, L, z_max = B.ravel(), L.ravel(), z_max.ravel()
+    total = np.zeros(B.shape)
+    if tol is not None:
+        # Un intervalo por geometría × estrato con espesor efectivo; integración adaptativa conjunta
+        z_t = np.minimum(estratos["techo"][None, :], z_max[:, None])
+        z_b = np.minimum(estratos["base"][None, :], z_max[:, None])
+        g, c = np.nonzero(z_b > z_t)
+        integral = integrar_ec68_adaptativo(1.0, B[g], L[g], z_t[g, c], z_b[g, c], estratos["E"][c], estratos["nu"][c], tol)[0]
+        np.add.at(total, g, integral[3])
+        return total.reshape(forma)
+    for techo, base, E_i, nu_i in zip(estratos["techo"], estratos["base"], estratos["E"], estratos["nu"]):
+        z_techo = np.minimum(techo, z_max)
+        h_ef    = np.minimum(base, z_max) - z_techo
+        n_sub   = np.maximum(1, np.ceil(h_ef / dz_sub)).astype(int)
+        dz      = h_ef / n_sub
+        # Subcapas de todas las geometrías en una matriz rellena (geometría × subcapa) con máscara
+        k = np.arange(n_sub.max())
+        activa = k < n_sub[:, None]
+        z_mid = z_techo[:, None] + (k + 0.5) * dz[:, None]
+        dsz, dsx, dsy = holl_centro(1.0, B[:, None], L[:, None], np.where(activa, z_mid, 1.0))
+        dep_z = (dsz - nu_i*(dsx+dsy)) / E_i
+        total += np.where(activa, dep_z, 0.0).sum(axis=1) * dz
+    return total.reshape(forma)
+
+def abaco_presion_admisible(df, B_arr, relaciones_LB, s_adm_arr, factor_bulbo=1.5, dz_sub=0.25, tol=None, NF=None):
+    # Comportamiento elástico lineal: s = p · s_unitario, luego p_adm = s_adm / s_unitario.
+    # Cada geometría (B, L/B) se resuelve una sola vez y todos los s_adm salen por escalado.
+    estratos = tabla_estratos(df)
+    espesor_total = float(estratos["base"][-1]) if len(estratos["base"]) else 0.0
+    B_g, LB_g = np.meshgrid(np.asarray(B_arr, dtype=float), np.asarray(relaciones_LB, dtype=float), indexing='ij')
+    B_g, LB_g = B_g.ravel(), LB_g.ravel()
+    L_g = B_g * LB_g
+    z_max = factor_bulbo * np.minimum(B_g, L_g)
+
+    s_st = asiento_unitario_steinbrenner(B_g, L_g, estratos, z_max)
+    s_ec = asiento_unitario_ec68(B_g, L_g, estratos, z_max, dz_sub, tol)
+
+    s_adm = np.asarray(s_adm_arr, dtype=float)
+    n_g, n_s = B_g.size, s_adm.size
+    p_st = s_adm[None, :] / 1000 / s_st[:, None]
+    p_ec = s_adm[None, :] / 1000 / s_ec[:, None]
+    df_abaco = pd.DataFrame({
+        "B [m]":                    np.repeat(B_g, n_s),
+        "L/B":                      np.repeat(LB_g, n_s),
+        "L [m]":                    np.repeat(L_g, n_s),
+        "z_max [m]":                np.repeat(z_max, n_s),
+        "Bulbo truncado":           np.repeat(z_max > espesor_total, n_s),
+        "s_adm [mm]":               np.tile(s_adm, n_g),
+        "p_adm Steinbrenner [kPa]": p_st.ravel(),
+        "p_adm Ec. Elástica [kPa]": p_ec.ravel(),
+    })
+    if NF is not None:
+        # Profundidad de influencia EC7 para la presión admisible más restrictiva de cada celda
+        z_i = z_influencia_ec7_malla(np.minimum(p_st, p_ec), B_g[:, None], L_g[:, None], df, NF)
+        df_abaco["z_i EC7 [m]"] = z_i.ravel()
+    return df_abaco
+
+def matriz_abaco(df_abaco, columna="p_adm Steinbrenner [kPa]"):
+    return df_abaco.pivot_table(index="B [m]", columns=["L/B", "s_adm [mm]"], values=columna)